@@ -0,0 +1,130 @@
+"""
+Benchmark of the fuzzy matching indexes against scoring every rule, for each method of the
+:code:`fuzzy_match_replace` task.
+
+Run from the root of the repository:
+
+    python -m benchmarks.fuzzy_methods [rule count] [value count]
+
+Each index is checked to give the same results as scoring every rule.
+"""
+
+import random
+import string
+import sys
+import time
+
+from dataunifier.tasks.FuzzyMatchReplaceTask import FuzzyMatchReplaceTask, E_JACCARD, E_LEVENSHTEIN, E_TFIDF, \
+    E_PASSTHROUGH, _create_rules
+
+DEFAULT_RULE_COUNT = 100000
+DEFAULT_VALUE_COUNT = 200
+MINIMUM_SCORE = 0.6
+
+
+def get_code(rng):
+    """
+    Get a random code of three letters followed by three to five digits.
+    """
+
+    return "".join([rng.choice(string.ascii_uppercase) for _ in range(3)]) + \
+        "".join([rng.choice(string.digits) for _ in range(rng.randint(3, 5))])
+
+
+def get_name(rng, words):
+    """
+    Get a random name of two to four of the given words.
+    """
+
+    return " ".join([rng.choice(words) for _ in range(rng.randint(2, 4))])
+
+
+def get_typo(rng, value):
+    """
+    Get a copy of a value with one character replaced by a random letter or digit.
+    """
+
+    i = rng.randrange(len(value))
+    return value[:i] + rng.choice(string.ascii_uppercase + string.digits) + value[i + 1:]
+
+
+def get_task(method, strings):
+    """
+    Get a :code:`fuzzy_match_replace` task with one rule per string, using a fuzzy matching method.
+    """
+
+    rules = _create_rules([(value, str(i)) for i, value in enumerate(strings)], method, 3)
+    return FuzzyMatchReplaceTask("benchmark", None, ["field"], ["field"], method, rules, MINIMUM_SCORE, E_PASSTHROUGH)
+
+
+def scan(rules, value):
+    """
+    Find the rule that matches a value best by scoring every rule, as the index should.
+    """
+
+    best = None
+    highest_score = 0.0
+    for i, rule in enumerate(rules):
+        score = rule.evaluate(value)
+        if score > highest_score:
+            best = i
+            highest_score = score
+    return best, highest_score
+
+
+def get_query(method, rules, value):
+    """
+    Get what the index of a fuzzy matching method is searched with for a value.
+    """
+
+    if method == E_JACCARD:
+        return rules[0].ngramify(value)
+    if method == E_TFIDF:
+        return rules[0].vectorise(value)
+    return value
+
+
+def run(method, strings, values):
+    """
+    Benchmark and check the index of a fuzzy matching method, and print the timings.
+    """
+
+    started = time.time()
+    task = get_task(method, strings)
+    build_time = time.time() - started
+    queries = [get_query(method, task.rules, value) for value in values]
+    started = time.time()
+    results = [task.index.find(query, MINIMUM_SCORE) for query in queries]
+    index_time = time.time() - started
+    started = time.time()
+    expected = [scan(task.rules, value) for value in values]
+    scan_time = time.time() - started
+    for value, result, correct in zip(values, results, expected):
+        if correct[0] is not None and correct[1] >= MINIMUM_SCORE:
+            assert result == correct, (method, value, result, correct)
+        else:
+            assert result[0] is None or result[1] < MINIMUM_SCORE, (method, value, result, correct)
+    print("%-12s %7d rules  index built in %6.2fs  %8.3f ms/value with index  %8.3f ms/value scanning  (x%.0f)" % (
+        method, len(strings), build_time, 1000 * index_time / len(values), 1000 * scan_time / len(values),
+        scan_time / index_time
+    ))
+
+
+def main():
+    """
+    Run the benchmark for every fuzzy matching method.
+    """
+
+    rule_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RULE_COUNT
+    value_count = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_VALUE_COUNT
+    rng = random.Random(0)
+    codes = [get_code(rng) for _ in range(rule_count)]
+    words = ["".join([rng.choice(string.ascii_uppercase) for _ in range(rng.randint(3, 9))]) for _ in range(5000)]
+    names = [get_name(rng, words) for _ in range(rule_count)]
+    for method, strings in [(E_JACCARD, names), (E_LEVENSHTEIN, codes), (E_TFIDF, names)]:
+        values = [get_typo(rng, value) for value in rng.sample(strings, value_count)]
+        run(method, strings, values)
+
+
+if __name__ == '__main__':
+    main()
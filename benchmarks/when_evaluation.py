@@ -0,0 +1,137 @@
+"""
+Benchmark of evaluating a tree of :code:`when` objects by calling :code:`evaluate` on each node, against the
+function it is compiled into.
+
+Run from the root of the repository:
+
+    python -m benchmarks.when_evaluation [row count]
+
+The compiled function is checked to give the same results as walking the tree.
+"""
+
+import random
+import sys
+import time
+
+from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.config.classes import Fileset, InputFile
+from dataunifier.parse.classes import ParseRowContext, ParseIteratorContext, ParseInputFileContext, \
+    ParseFilesetContext, TestBogusDictWriter
+from dataunifier.parse.positional import get_slots
+from dataunifier.when import And, Or, Not, WhenFieldMatchesRegex
+from dataunifier.when.codegen import compile_when
+
+DEFAULT_ROW_COUNT = 200000
+FIELDS = ["status", "name", "id", "grade", "country"]
+
+
+def get_when():
+    """
+    Get the tree of :code:`when` objects to benchmark.
+    """
+
+    return Or([
+        And([
+            WhenFieldMatchesRegex("status", ["valid", "active"]),
+            WhenFieldMatchesRegex("name", [".+"]),
+            Not(WhenFieldMatchesRegex("grade", ["[DE]"]))
+        ]),
+        And([
+            Not(WhenFieldMatchesRegex("id", ["-1"])),
+            Or([WhenFieldMatchesRegex("country", ["SG", "MY"]), WhenFieldMatchesRegex("grade", ["A"])])
+        ])
+    ])
+
+
+def walk(when, row_ctxt):
+    """
+    Evaluate a tree of :code:`when` objects by calling :code:`evaluate` on each leaf.
+    """
+
+    if isinstance(when, And):
+        for inner in when.when_list:
+            if not walk(inner, row_ctxt):
+                return False
+        return True
+    if isinstance(when, Or):
+        for inner in when.when_list:
+            if walk(inner, row_ctxt):
+                return True
+        return False
+    if isinstance(when, Not):
+        return not walk(when.when, row_ctxt)
+    return when.evaluate(row_ctxt)
+
+
+def get_row_ctxt(rowdict):
+    """
+    Get a row context containing a rowdict.
+    """
+
+    fileset = Fileset("fileset", FIELDS, [InputFile("inputFile", ["regex"], None)], [])
+    return ParseRowContext(
+        ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer"),
+                    fileset
+                ),
+                fileset.input_files[0]
+            ),
+            "filepath", None, []
+        ), 1, rowdict
+    )
+
+
+def get_rowdict(rng):
+    """
+    Get a random rowdict.
+    """
+
+    return {
+        "status": rng.choice(["valid", "active", "expired", ""]),
+        "name": rng.choice(["", "Alice", "Bob"]),
+        "id": rng.choice(["-1", "1", "2", "3"]),
+        "grade": rng.choice("ABCDE"),
+        "country": rng.choice(["SG", "MY", "ID", "TH"])
+    }
+
+
+def measure(function, arguments):
+    """
+    Call a function with each tuple of arguments, and measure how long it took.
+    """
+
+    started = time.time()
+    results = [function(*argument) for argument in arguments]
+    return results, time.time() - started
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROW_COUNT
+    rng = random.Random(0)
+    when = get_when()
+    rowdicts = [get_rowdict(rng) for _ in range(row_count)]
+    row_ctxt = get_row_ctxt(rowdicts[0])
+    row_ctxts = [row_ctxt.with_updated_rowdict(rowdict) for rowdict in rowdicts]
+    value_lists = [[rowdict[field] for field in FIELDS] for rowdict in rowdicts]
+    expected, walk_time = measure(walk, [(when, row_ctxt) for row_ctxt in row_ctxts])
+    evaluate = compile_when(when, None)
+    results, rowdict_time = measure(evaluate, [(row_ctxt.rowdict, row_ctxt) for row_ctxt in row_ctxts])
+    assert results == expected
+    evaluate = compile_when(when, get_slots(FIELDS))
+    results, values_time = measure(evaluate, list(zip(value_lists, row_ctxts)))
+    assert results == expected
+    for label, elapsed in [
+        ("tree walk", walk_time), ("compiled, rowdicts", rowdict_time), ("compiled, lists of values", values_time)
+    ]:
+        print("%-26s %8.3f us/row  (x%.1f)" % (label, 1000000 * elapsed / row_count, walk_time / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""
+Python API for :code:`dataunifier`. See :code:`Playbook`.
+"""
+
+from dataunifier.playbook import Playbook
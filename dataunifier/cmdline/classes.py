@@ -8,7 +8,8 @@ class CommandLineContext:
     Context class containing command line arguments.
     """
 
-    def __init__(self, input_dir, output_file_path, force, config_file_path):
+    def __init__(self, input_dir, output_file_path, force, config_file_path, partition_field=None,
+                 stdin_input_file=None, watch=False, cache_dir=None, explain=False, adaptive_sample_size=None):
         """
         Create a :code:`CommandLineContext` object.
 
@@ -16,12 +17,27 @@ class CommandLineContext:
         :param str output_file_path: The output file path.
         :param bool force: Indicates whether to forcefully overwrite the output file if it exists.
         :param str config_file_path: The configuration file path.
+        :param Optional[str] partition_field: The field whose values the output should be partitioned by, if any.
+        :param Optional[str] stdin_input_file: The name of the input file whose data should be read from
+                                               :code:`stdin`, if any.
+        :param bool watch: Indicates whether to keep watching the input directory for new files after parsing.
+        :param Optional[str] cache_dir: The directory to cache parsed configurations in, if any.
+        :param bool explain: Indicates whether to only show how the task lists are optimised, without processing any
+                             input files.
+        :param Optional[int] adaptive_sample_size: The number of rows to sample before reordering the operands of
+                                                   conditions, or None if they are evaluated in the configured order.
         """
 
         self.input_dir = input_dir
         self.output_file_path = output_file_path
         self.force = force
         self.config_file_path = config_file_path
+        self.partition_field = partition_field
+        self.stdin_input_file = stdin_input_file
+        self.watch = watch
+        self.cache_dir = cache_dir
+        self.explain = explain
+        self.adaptive_sample_size = adaptive_sample_size
 
     def __eq__(self, other):
         if other is None:
@@ -32,7 +48,13 @@ class CommandLineContext:
             self.input_dir == other.input_dir,
             self.output_file_path == other.output_file_path,
             self.force == other.force,
-            self.config_file_path == other.config_file_path
+            self.config_file_path == other.config_file_path,
+            self.partition_field == other.partition_field,
+            self.stdin_input_file == other.stdin_input_file,
+            self.watch == other.watch,
+            self.cache_dir == other.cache_dir,
+            self.explain == other.explain,
+            self.adaptive_sample_size == other.adaptive_sample_size
         ])
 
     def __hash__(self):
@@ -6,10 +6,12 @@ import os
 
 from dataunifier.cmdline.classes import CommandLineContext
 from dataunifier.cmdline.constants import INPUT_DIR_OPTION_STUB, DEFAULT_INPUT_DIR, OUTPUT_OPTION_STUB, \
-    DEFAULT_OUTPUT_FILE_PATH, FORCE_OPTION
+    DEFAULT_OUTPUT_FILE_PATH, FORCE_OPTION, PARTITION_BY_OPTION_STUB, STDIN_AS_OPTION_STUB, STDOUT_OUTPUT_FILE_PATH, \
+    WATCH_OPTION, CACHE_DIR_OPTION_STUB, EXPLAIN_OPTION, ADAPTIVE_CONDITIONS_OPTION, ADAPTIVE_CONDITIONS_OPTION_STUB, \
+    DEFAULT_ADAPTIVE_SAMPLE_SIZE
 from dataunifier.common.exceptions import SyntaxException, NoSuchDirectoryException, CommandLineException, \
     NoSuchFileException
-from dataunifier.utils import fileio
+from dataunifier.utils import fileio, partition
 
 
 def extract_options(args):
@@ -55,6 +57,93 @@ def get_output_file(options):
     return DEFAULT_OUTPUT_FILE_PATH
 
 
+def get_partition_field(options):
+    """
+    Get the field to partition the output by from the command line options, or None if none is specified.
+
+    :param set[str] | list[str] options: Collection of command line options.
+    :return: The name of the field to partition the output by.
+    :rtype: Optional[str]
+    """
+
+    for option in options:
+        if option.startswith(PARTITION_BY_OPTION_STUB):
+            return option[len(PARTITION_BY_OPTION_STUB):]
+    return None
+
+
+def get_stdin_input_file(options):
+    """
+    Get the name of the input file whose data should be read from :code:`stdin` from the command line options, or
+    None if none is specified.
+
+    :param set[str] | list[str] options: Collection of command line options.
+    :return: The name of the input file.
+    :rtype: Optional[str]
+    """
+
+    for option in options:
+        if option.startswith(STDIN_AS_OPTION_STUB):
+            return option[len(STDIN_AS_OPTION_STUB):]
+    return None
+
+
+def get_cache_dir(options):
+    """
+    Get the path to the configuration cache directory from the command line options, or None if none is specified.
+
+    :param set[str] | list[str] options: Collection of command line options.
+    :return: The cache directory path.
+    :rtype: Optional[str]
+    """
+
+    for option in options:
+        if option.startswith(CACHE_DIR_OPTION_STUB):
+            return option[len(CACHE_DIR_OPTION_STUB):]
+    return None
+
+
+def get_adaptive_sample_size(options):
+    """
+    Get the number of rows to sample before reordering the operands of conditions from the command line options, or
+    None if conditions are not to be reordered.
+
+    :param set[str] | list[str] options: Collection of command line options.
+    :return: The number of rows.
+    :rtype: Optional[int]
+    :raises: CommandLineException if the number of rows is not an integer more than 0.
+    """
+
+    for option in options:
+        if option == ADAPTIVE_CONDITIONS_OPTION:
+            return DEFAULT_ADAPTIVE_SAMPLE_SIZE
+        if option.startswith(ADAPTIVE_CONDITIONS_OPTION_STUB):
+            value = option[len(ADAPTIVE_CONDITIONS_OPTION_STUB):]
+            try:
+                sample_size = int(value)
+                if sample_size <= 0:
+                    raise ValueError
+                return sample_size
+            except ValueError:
+                raise CommandLineException('Invalid number of rows to sample for "%s": "%s". Must be an integer more '
+                                           'than 0.' % (ADAPTIVE_CONDITIONS_OPTION, value))
+    return None
+
+
+def get_partition_dir(output_file_path):
+    """
+    Get the path to the directory that partitioned output files are written to.
+
+    The directory is the output file path without its extension, e.g., :code:`output.csv` becomes :code:`output`.
+
+    :param str output_file_path: The output file path.
+    :return: The partition directory path.
+    :rtype: str
+    """
+
+    return os.path.splitext(fileio.strip_trailing_sep(output_file_path))[0]
+
+
 def validate_input_dir(input_dir):
     """
     Validate the input directory path provided in the command line arguments.
@@ -69,7 +158,27 @@ def validate_input_dir(input_dir):
         raise CommandLineException('Could not find input directory "%s".' % input_dir)
 
 
-def validate_output_file_path(output_file_path, force):
+def confirm_overwrite(file_paths, force, can_prompt):
+    """
+    Check if any of a list of output files already exists, and if so, prompt the user to confirm overwrite.
+
+    :param list[str] file_paths: The output file paths.
+    :param bool force: Indicates whether to force an overwrite.
+    :param bool can_prompt: Indicates whether the user can be prompted. This is not the case when input is read from
+                            :code:`stdin`, as the prompt would consume the input data.
+    :raises: CommandLineException if a file exists, the overwrite is not forced, and the user cannot be prompted.
+    :raises: AbortException if the user aborts.
+    """
+
+    if not force and not can_prompt:
+        exists = [file_path for file_path in file_paths if os.path.isfile(file_path)]
+        if exists:
+            raise CommandLineException('Output file "%s" already exists. Set the %s option to overwrite it when '
+                                       'reading from stdin.' % (exists[0], FORCE_OPTION))
+    fileio.check_file_existence_and_confirm_overwrite(file_paths, force)
+
+
+def validate_output_file_path(output_file_path, force, can_prompt=True):
     """
     Validate the output file path provided in the command line arguments.
 
@@ -77,7 +186,9 @@ def validate_output_file_path(output_file_path, force):
 
     :param str output_file_path: The output file path.
     :param bool force: Indicates whether to force an overwrite.
-    :raises: CommandLineException if the output directory does not exist.
+    :param bool can_prompt: Indicates whether the user can be prompted to confirm overwrite.
+    :raises: CommandLineException if the output directory does not exist, or if the file exists, the overwrite is
+             not forced, and the user cannot be prompted.
     :raises: AbortException if the user aborts.
     """
 
@@ -87,7 +198,49 @@ def validate_output_file_path(output_file_path, force):
         fileio.check_dir_existence(output_file_dir)
     except NoSuchDirectoryException:
         raise CommandLineException('Directory for output file "%s" does not exist.' % output_file_dir)
-    fileio.check_file_existence_and_confirm_overwrite([output_file_path], force)
+    confirm_overwrite([output_file_path], force, can_prompt)
+
+
+def validate_partition_dir(partition_dir, partition_field, input_dir, force, can_prompt=True):
+    """
+    Validate the directory that partitioned output files will be written to.
+
+    Responsible for prompting the user to confirm overwrite if the directory already contains partition files of the
+    partition field.
+
+    :param str partition_dir: The partition directory path.
+    :param str partition_field: The field to partition the output by.
+    :param str input_dir: The input directory path.
+    :param bool force: Indicates whether to force an overwrite.
+    :param bool can_prompt: Indicates whether the user can be prompted to confirm overwrite.
+    :raises: CommandLineException if the parent directory does not exist, if the path exists but is not a
+             directory, if the directory is the input directory or inside it, or if partition files exist, the
+             overwrite is not forced, and the user cannot be prompted.
+    :raises: AbortException if the user aborts.
+    """
+
+    parent_dir_raw = os.path.dirname(partition_dir)
+    parent_dir = "." if parent_dir_raw == "" else parent_dir_raw
+    try:
+        fileio.check_dir_existence(parent_dir)
+    except NoSuchDirectoryException:
+        raise CommandLineException('Directory for output directory "%s" does not exist.' % parent_dir)
+    real_input_dir = os.path.realpath(input_dir)
+    real_partition_dir = os.path.realpath(partition_dir)
+    if os.path.commonpath([real_input_dir, real_partition_dir]) == real_input_dir:
+        raise CommandLineException('Output directory "%s" cannot be the input directory or inside it.' % (
+            partition_dir
+        ))
+    if not os.path.exists(partition_dir):
+        return
+    try:
+        fileio.check_dir_existence(partition_dir)
+    except NoSuchDirectoryException:
+        raise CommandLineException('Output path "%s" exists but is not a directory.' % partition_dir)
+    confirm_overwrite(
+        fileio.get_file_paths_by_pattern(partition_dir, partition.get_partition_file_pattern(partition_field)),
+        force, can_prompt
+    )
 
 
 def validate_config_file_path(config_file_path):
@@ -119,8 +272,29 @@ def get_context(sys_argv):
     input_dir = fileio.strip_trailing_sep(get_input_directory(options))
     output_file_path = get_output_file(options)
     force = FORCE_OPTION in options
+    partition_field = get_partition_field(options)
+    stdin_input_file = get_stdin_input_file(options)
+    watch = WATCH_OPTION in options
+    cache_dir = get_cache_dir(options)
+    explain = EXPLAIN_OPTION in options
+    adaptive_sample_size = get_adaptive_sample_size(options)
     config_file_path = args[1]
     validate_input_dir(input_dir)
-    validate_output_file_path(output_file_path, force)
+    if watch and stdin_input_file is not None:
+        raise CommandLineException("Cannot watch the input directory when reading from stdin.")
+    if not explain:
+        if output_file_path == STDOUT_OUTPUT_FILE_PATH:
+            if partition_field is not None:
+                raise CommandLineException("Cannot partition the output when writing to stdout.")
+        elif partition_field is None:
+            validate_output_file_path(output_file_path, force, stdin_input_file is None)
+        else:
+            validate_partition_dir(
+                get_partition_dir(output_file_path), partition_field, input_dir, force, stdin_input_file is None
+            )
     validate_config_file_path(config_file_path)
-    return CommandLineContext(input_dir, output_file_path, force, config_file_path)
+    return CommandLineContext(
+        input_dir, output_file_path, force, config_file_path,
+        partition_field=partition_field, stdin_input_file=stdin_input_file, watch=watch,
+        cache_dir=cache_dir, explain=explain, adaptive_sample_size=adaptive_sample_size
+    )
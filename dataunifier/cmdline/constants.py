@@ -3,9 +3,19 @@ Constants pertaining to the parsing of command line arguments.
 """
 
 FORCE_OPTION = "-f"
+WATCH_OPTION = "--watch"
 INPUT_DIR_OPTION_STUB = "--input-dir="
 OUTPUT_OPTION_STUB = "--output="
+PARTITION_BY_OPTION_STUB = "--partition-by="
+STDIN_AS_OPTION_STUB = "--stdin-as="
+CACHE_DIR_OPTION_STUB = "--cache-dir="
+EXPLAIN_OPTION = "--explain"
+ADAPTIVE_CONDITIONS_OPTION = "--adaptive-conditions"
+ADAPTIVE_CONDITIONS_OPTION_STUB = "--adaptive-conditions="
+
+STDOUT_OUTPUT_FILE_PATH = "-"
 
 DEFAULT_INPUT_DIR = "."
 DEFAULT_OUTPUT_FILE_PATH = "output.csv"
 DEFAULT_CONFIG_FILE_PATH = "config.yaml"
+DEFAULT_ADAPTIVE_SAMPLE_SIZE = 1000
@@ -6,6 +6,7 @@ import string
 
 DEFAULT_TIMEZONE = "Asia/Singapore"
 DEFAULT_ENCODING = "utf8"
+STDIN_FILE_PATH = "<stdin>"
 
 NO_SUCH_FIELD_EXCEPTION_PREFIX = "FIELD ERROR"
 SYNTAX_EXCEPTION_PREFIX = "SYNTAX ERROR"
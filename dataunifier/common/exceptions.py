@@ -215,3 +215,21 @@ class DiscardRecordException(Exception):
     """
     Exception for triggering a record to be discarded.
     """
+
+
+class DuplicateKeyException(Exception):
+    """
+    Exception for situation where a key occurs more than once where keys are supposed to be unique.
+
+    For internal use. Not for displaying on console.
+    """
+
+    def __init__(self, key: str):
+        """
+        Create a :code:`DuplicateKeyException`.
+
+        :param key: The duplicate key.
+        """
+
+        super(DuplicateKeyException, self).__init__()
+        self.key = key
@@ -0,0 +1,136 @@
+"""
+Module for caching parsed configurations on disk.
+
+A parsed configuration is stored together with fingerprints of everything it was built from: the playbook, every
+imported file, every lookup file and the listing of every directory searched for lookup files. A cached configuration
+is only used if all of these are unchanged.
+"""
+
+import hashlib
+import os
+import pickle
+
+from dataunifier.config.classes import ConfigContext
+from dataunifier.utils import display, fileio
+
+
+CACHE_FORMAT_VERSION = 1
+CACHE_FILE_EXTENSION = "pickle"
+
+
+def __get_code_fingerprint():
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entries = []
+    for directory, subdirectories, file_names in os.walk(package_dir):
+        subdirectories.sort()
+        for file_name in sorted(file_names):
+            if fileio.get_extension(file_name) == "py":
+                stat = os.stat(os.path.join(directory, file_name))
+                entries.append((os.path.relpath(os.path.join(directory, file_name), package_dir), stat.st_size,
+                                stat.st_mtime_ns))
+    return hashlib.sha1(repr(entries).encode()).hexdigest()
+
+
+def get_cache_file_path(command_line_ctxt):
+    """
+    Get the path of the cache file for a configuration.
+
+    The cache file is specific to the configuration file, the input directory (which may be referred to in the
+    configuration through the :code:`%INPUT_DIR%` placeholder) and the working directory (which relative paths in
+    the configuration are resolved against).
+
+    :param CommandLineContext command_line_ctxt: The command line context.
+    :return: The path of the cache file.
+    :rtype: str
+    """
+
+    key = repr((
+        CACHE_FORMAT_VERSION,
+        os.path.abspath(command_line_ctxt.config_file_path),
+        command_line_ctxt.input_dir,
+        os.path.abspath(command_line_ctxt.input_dir),
+        os.getcwd(),
+        command_line_ctxt.adaptive_sample_size
+    ))
+    return os.path.join(
+        command_line_ctxt.cache_dir, "%s.%s" % (hashlib.sha1(key.encode()).hexdigest(), CACHE_FILE_EXTENSION)
+    )
+
+
+def __get_fingerprint(kind, path, previous=None):
+    if kind == fileio.RECORDED_DIRECTORY:
+        return tuple(sorted(os.listdir(path)))
+    return fileio.get_file_fingerprint(path, previous)
+
+
+def __is_unchanged(dependencies):
+    for kind, path, fingerprint in dependencies:
+        try:
+            current = __get_fingerprint(kind, path, fingerprint)
+        except OSError:
+            return False
+        if kind == fileio.RECORDED_DIRECTORY:
+            if current != fingerprint:
+                return False
+        elif current[2] != fingerprint[2]:
+            return False
+    return True
+
+
+def load(command_line_ctxt):
+    """
+    Load a cached configuration, if there is one and it is still up to date.
+
+    :param CommandLineContext command_line_ctxt: The command line context.
+    :return: The cached configuration, or None if there is no usable cached configuration.
+    :rtype: Optional[ConfigContext]
+    """
+
+    cache_file_path = get_cache_file_path(command_line_ctxt)
+    if not os.path.isfile(cache_file_path):
+        return None
+    try:
+        with open(cache_file_path, "rb") as f:
+            cached = pickle.load(f)
+    except Exception:  # pylint: disable=broad-except
+        display.stdout('Ignoring unreadable configuration cache file "%s".' % cache_file_path)
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_FORMAT_VERSION \
+            or cached.get("code") != __get_code_fingerprint():
+        return None
+    if not __is_unchanged(cached["dependencies"]):
+        return None
+    display.stdout('Using cached configuration from "%s".' % cache_file_path)
+    return ConfigContext(command_line_ctxt, cached["fields"], cached["filesets"])
+
+
+def save(command_line_ctxt, config_ctxt, recorded_reads):
+    """
+    Save a configuration to the cache.
+
+    Failure to save is not an error: a warning is shown, and the configuration is simply not cached.
+
+    :param CommandLineContext command_line_ctxt: The command line context.
+    :param ConfigContext config_ctxt: The configuration to save.
+    :param list[(str, str)] recorded_reads: The files and directories the configuration was built from, as recorded
+                                            by :code:`fileio.stop_recording_reads`.
+    """
+
+    cache_file_path = get_cache_file_path(command_line_ctxt)
+    temp_file_path = "%s.%d.tmp" % (cache_file_path, os.getpid())
+    try:
+        cached = {
+            "version": CACHE_FORMAT_VERSION,
+            "code": __get_code_fingerprint(),
+            "dependencies": [(kind, path, __get_fingerprint(kind, path)) for kind, path in recorded_reads],
+            "fields": config_ctxt.fields,
+            "filesets": config_ctxt.filesets
+        }
+        os.makedirs(command_line_ctxt.cache_dir, exist_ok=True)
+        with open(temp_file_path, "wb") as f:
+            pickle.dump(cached, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file_path, cache_file_path)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+        display.warn('Could not save configuration to cache file "%s": %s' % (cache_file_path, e))
+        if os.path.isfile(temp_file_path):
+            os.remove(temp_file_path)
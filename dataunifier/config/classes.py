@@ -29,7 +29,13 @@ class YamlPathContext(CommandLineContext):
             command_line_context.input_dir,
             command_line_context.output_file_path,
             command_line_context.force,
-            command_line_context.config_file_path
+            command_line_context.config_file_path,
+            partition_field=command_line_context.partition_field,
+            stdin_input_file=command_line_context.stdin_input_file,
+            watch=command_line_context.watch,
+            cache_dir=command_line_context.cache_dir,
+            explain=command_line_context.explain,
+            adaptive_sample_size=command_line_context.adaptive_sample_size
         )
         self.parent = command_line_context
         self.current_file = current_file
@@ -138,7 +144,8 @@ class TaskParsingContext(YamlPathContext):
                  task_name: str,
                  task_type: str,
                  when,
-                 previous_task):
+                 previous_task,
+                 lookup_registry=None):
         """
         Create a :code:`TaskParsingContext` object.
 
@@ -148,6 +155,8 @@ class TaskParsingContext(YamlPathContext):
         :param str task_type: The task type.
         :param AbstractWhen when: The "when" object for the task.
         :param AbstractTask previous_task: The previous task, or None if this is the first task.
+        :param Optional[LookupRegistry] lookup_registry: The registry to request lookup tables from, or None if
+                                                         lookup tables should be loaded by the task itself.
         """
 
         super(TaskParsingContext, self).__init__(
@@ -161,6 +170,7 @@ class TaskParsingContext(YamlPathContext):
         self.task_type = task_type
         self.when = when
         self.previous_task = previous_task
+        self.lookup_registry = lookup_registry
 
     def __eq__(self, other):
         if other is None:
@@ -252,7 +262,7 @@ class Fileset:
     Contains information about a set of files to parse, and the tasks to apply to all of them.
     """
 
-    def __init__(self, name, fields, input_files, tasks):
+    def __init__(self, name, fields, input_files, tasks, plan=None):
         """
         Create a :code:`Fileset` object.
 
@@ -260,12 +270,15 @@ class Fileset:
         :param list[str] fields: The resulting list of fields that should be outputted after all the tasks are complete.
         :param list[InputFile] input_files: The input files to be parsed.
         :param list[AbstractTask] tasks: The tasks to apply to the input files.
+        :param Optional[PositionalPlan] plan: The compiled form of the tasks, if rows can be represented as lists of
+                                              values, or None to run the tasks on rowdicts.
         """
 
         self.name = name
         self.fields = fields
         self.input_files = input_files
         self.tasks = tasks
+        self.plan = plan
 
     def __str__(self):
         return "Fileset(%s, %s, %s, %s)" % (self.name, self.fields, self.input_files, self.tasks)
@@ -306,7 +319,13 @@ class ConfigContext(CommandLineContext):
             command_line_context.input_dir,
             command_line_context.output_file_path,
             command_line_context.force,
-            command_line_context.config_file_path
+            command_line_context.config_file_path,
+            partition_field=command_line_context.partition_field,
+            stdin_input_file=command_line_context.stdin_input_file,
+            watch=command_line_context.watch,
+            cache_dir=command_line_context.cache_dir,
+            explain=command_line_context.explain,
+            adaptive_sample_size=command_line_context.adaptive_sample_size
         )
         self.parent = command_line_context
         self.fields = fields
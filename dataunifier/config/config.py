@@ -4,11 +4,13 @@ Module for parsing configuration files.
 
 import functools
 
-from dataunifier.config import keys, taskrouter, whenrouter
+from dataunifier.config import cache, keys, optimiser, taskrouter, whenrouter
 from dataunifier.config.classes import ConfigContext, Fileset, InputFile, Sheet, TaskParsingContext, WhenParsingContext
 from dataunifier.common.exceptions import ConfigException, NoSuchTaskException
+from dataunifier.parse import positional
 from dataunifier.tasks.BlockTask import BlockTask
-from dataunifier.utils import regex, confighelper, display
+from dataunifier.utils import regex, confighelper, display, fileio
+from dataunifier.utils.lookupregistry import LookupRegistry
 
 
 def __parse_sheet_dict(sheet_spec_ctxt):
@@ -68,7 +70,7 @@ def __get_when_parsing_context(task_dict_ctxt):
     return WhenParsingContext(when_ctxt, when_ctxt.current_file, when_ctxt.key_path, 0)
 
 
-def __get_block_task(name, when, task_dict_ctxt, previous_task):
+def __get_block_task(name, when, task_dict_ctxt, previous_task, lookup_registry):
     block_list_ctxt = confighelper.get_dict_list(task_dict_ctxt, BlockTask.get_task_type_string(), True)
     task_dict_ctxt_list = block_list_ctxt.value
     if not task_dict_ctxt_list:
@@ -79,7 +81,7 @@ def __get_block_task(name, when, task_dict_ctxt, previous_task):
     inner_previous_task = previous_task
     task_list = []
     for inner_task_dict_ctxt in task_dict_ctxt_list:
-        task = __parse_task_dict(inner_task_dict_ctxt, inner_previous_task)
+        task = __parse_task_dict(inner_task_dict_ctxt, inner_previous_task, lookup_registry)
         if not task.is_conditional():
             msg = f'{task.get_task_type_string()} tasks cannot be put inside a task block, because ' \
                   f'they cannot be used with "when".' \
@@ -90,16 +92,16 @@ def __get_block_task(name, when, task_dict_ctxt, previous_task):
     return BlockTask(name, when, task_list)
 
 
-def __parse_task_dict(task_dict_ctxt, previous_task):
+def __parse_task_dict(task_dict_ctxt, previous_task, lookup_registry):
     name_ctxt = confighelper.get_literal(task_dict_ctxt, keys.NAME, True)
     name = name_ctxt.value
     when_parsing_ctxt = __get_when_parsing_context(task_dict_ctxt)
     when = whenrouter.get_when(when_parsing_ctxt) if when_parsing_ctxt else None
     task_type = __get_task_type(task_dict_ctxt, name)
     if task_type == BlockTask.get_task_type_string():
-        return __get_block_task(name, when, task_dict_ctxt, previous_task)
+        return __get_block_task(name, when, task_dict_ctxt, previous_task, lookup_registry)
     inner_task_dict_ctxt = confighelper.get_dict(task_dict_ctxt, task_type, True)
-    task_parsing_ctxt = TaskParsingContext(inner_task_dict_ctxt, name, task_type, when, previous_task)
+    task_parsing_ctxt = TaskParsingContext(inner_task_dict_ctxt, name, task_type, when, previous_task, lookup_registry)
     try:
         return taskrouter.get_task(task_parsing_ctxt)
     except NoSuchTaskException as e:
@@ -109,18 +111,37 @@ def __parse_task_dict(task_dict_ctxt, previous_task):
         raise ConfigException(msg)
 
 
-def __parse_task_dict_list(task_dict_list_ctxt):
+def __parse_task_dict_list(task_dict_list_ctxt, lookup_registry):
     output = []
     task_dict_ctxt_list = task_dict_list_ctxt.value
     previous_task = None
     for task_dict_ctxt in task_dict_ctxt_list:
-        task = __parse_task_dict(task_dict_ctxt, previous_task)
+        task = __parse_task_dict(task_dict_ctxt, previous_task, lookup_registry)
         previous_task = task
         output.append(task)
     return output
 
 
-def __parse_fileset_dict(fileset_dict_ctxt):
+def __explain(name, tasks, optimised_tasks, notes):
+    display.stdout('Fileset "%s":' % name)
+    display.stdout("  Tasks as configured:")
+    for line in optimiser.describe(tasks):
+        display.stdout("    %s" % line)
+    display.stdout("  Tasks as run:")
+    for line in optimiser.describe(optimised_tasks):
+        display.stdout("    %s" % line)
+    for note in notes or ["No optimisations."]:
+        display.stdout("  %s" % note)
+
+
+def __intern_whens(tasks, when_interner):
+    for task in tasks:
+        task.when = when_interner.intern(task.when)
+        if isinstance(task, BlockTask):
+            __intern_whens(task.task_list, when_interner)
+
+
+def __parse_fileset_dict(fileset_dict_ctxt, lookup_registry, when_interner):
     valid_keys = {keys.NAME, keys.INPUT_FILES, keys.TASKS}
     confighelper.check_invalid_keys(fileset_dict_ctxt, valid_keys)
     name_ctxt = confighelper.get_literal(fileset_dict_ctxt, keys.NAME, True)
@@ -128,19 +149,29 @@ def __parse_fileset_dict(fileset_dict_ctxt):
     input_files_dict_list_ctxt = confighelper.get_dict_list(fileset_dict_ctxt, keys.INPUT_FILES, False)
     input_files = __parse_input_file_dict_list(input_files_dict_list_ctxt) if input_files_dict_list_ctxt else None
     task_dict_list_ctxt = confighelper.get_dict_list(fileset_dict_ctxt, keys.TASKS, True)
-    tasks = __parse_task_dict_list(task_dict_list_ctxt)
+    tasks = __parse_task_dict_list(task_dict_list_ctxt, lookup_registry)
     if not tasks:
         msg = 'Task list for fileset "%s" is empty. You must specify at least one task. (File "%s")' % (
             name, fileset_dict_ctxt.current_file
         )
         raise ConfigException(msg)
+    __intern_whens(tasks, when_interner)
+    optimised_tasks, notes = optimiser.optimise(tasks)
+    if fileset_dict_ctxt.explain:
+        __explain(name, tasks, optimised_tasks, notes)
+    tasks = optimised_tasks
     fields = tasks[-1].get_resulting_fields()
-    return Fileset(name, fields, input_files, tasks)
+    return Fileset(name, fields, input_files, tasks, positional.get_plan(tasks))
 
 
-def __parse_fileset_dict_list(fileset_dict_list_ctxt):
+def __parse_fileset_dict_list(fileset_dict_list_ctxt, lookup_registry):
     fileset_dict_ctxt_list = fileset_dict_list_ctxt.value
-    return [__parse_fileset_dict(fileset_dict_ctxt) for fileset_dict_ctxt in fileset_dict_ctxt_list]
+    # Conditions repeated across tasks, and across filesets, are shared.
+    when_interner = whenrouter.WhenInterner(fileset_dict_list_ctxt.adaptive_sample_size)
+    return [
+        __parse_fileset_dict(fileset_dict_ctxt, lookup_registry, when_interner)
+        for fileset_dict_ctxt in fileset_dict_ctxt_list
+    ]
 
 
 def get_fields(filesets):
@@ -166,25 +197,97 @@ def get_fields(filesets):
     return resulting_fields
 
 
+def __get_tasks(tasks):
+    for task in tasks:
+        yield task
+        if isinstance(task, BlockTask):
+            yield from __get_tasks(task.task_list)
+
+
+def get_condition_summary(filesets):
+    """
+    Get the order chosen for the conditions of every :code:`and` and :code:`or` condition that was reordered while
+    the rows were read (see :code:`whenrouter.WhenInterner`), with their statistics, for display on console when the
+    run is done. A condition shared by several tasks is reported once, under the first of them.
+
+    :param list[Fileset] filesets: Collection of FileSets.
+    :return: Lines of text, or an empty list if no conditions were to be reordered.
+    :rtype: list[str]
+    """
+
+    lines = []
+    seen = set()
+    for fileset in filesets:
+        for task in __get_tasks(fileset.tasks):
+            for when in whenrouter.get_adaptive_whens(task.when):
+                if id(when) in seen:
+                    continue
+                seen.add(id(when))
+                lines.extend(when.adaptive.get_summary('task "%s"' % task.name, when.when_list))
+    return lines
+
+
+def close_tasks(filesets):
+    """
+    Release the resources that the tasks of filesets acquired while transforming rows, e.g., worker processes.
+
+    :param list[Fileset] filesets: Collection of FileSets.
+    """
+
+    for fileset in filesets:
+        for task in fileset.tasks:
+            task.close()
+
+
 def __parse_config_dict(config_dict_ctxt):
     valid_keys = {keys.FILESETS}
     confighelper.check_invalid_keys(config_dict_ctxt, valid_keys)
     fileset_dict_list_ctxt = confighelper.get_dict_list(config_dict_ctxt, keys.FILESETS, True)
-    filesets = __parse_fileset_dict_list(fileset_dict_list_ctxt)
-    fields = get_fields(filesets)
+    lookup_registry = LookupRegistry()
+    # Lookup files are read in the background as soon as a task requests them, while the rest of the configuration is
+    # parsed, optimised and validated.
+    lookup_registry.start()
+    try:
+        filesets = __parse_fileset_dict_list(fileset_dict_list_ctxt, lookup_registry)
+        fields = get_fields(filesets)
+    except BaseException:
+        lookup_registry.cancel()
+        raise
+    lookup_registry.wait()
     return ConfigContext(config_dict_ctxt.parent, fields, filesets)
 
 
+def __parse_config_file(command_line_ctxt):
+    # Files imported in many places are only read and parsed once.
+    fileio.start_caching_reads()
+    try:
+        return __parse_config_dict(confighelper.parse_config_file(command_line_ctxt))
+    finally:
+        fileio.stop_caching_reads()
+
+
 def get_context(command_line_ctxt):
     """
     Get the :code:`ConfigContext` object that encapsulates the information specified in the command line arguments
     and the configuration file.
 
+    If a cache directory is specified, a cached configuration is used if everything it was built from is unchanged,
+    and the configuration is cached otherwise.
+
     :param CommandLineContext command_line_ctxt: The underlying context object containing command line arguments.
     :return: The context object that includes configuration information.
     :rtype: ConfigContext
     """
     display.stdout('Using configuration file "%s".' % command_line_ctxt.config_file_path)
-    config_dict_ctxt = confighelper.parse_config_file(command_line_ctxt)
-    config_ctxt = __parse_config_dict(config_dict_ctxt)
+    if command_line_ctxt.cache_dir is None or command_line_ctxt.explain:
+        return __parse_config_file(command_line_ctxt)
+    cached_config_ctxt = cache.load(command_line_ctxt)
+    if cached_config_ctxt is not None:
+        return cached_config_ctxt
+    fileio.start_recording_reads()
+    try:
+        config_ctxt = __parse_config_file(command_line_ctxt)
+    finally:
+        recorded_reads = fileio.stop_recording_reads()
+    cache.save(command_line_ctxt, config_ctxt, recorded_reads)
     return config_ctxt
@@ -0,0 +1,209 @@
+"""
+Module for optimising the task list of a fileset after it has been parsed.
+
+The optimisations never change the output, or the error raised for a row:
+
+- Consecutive :code:`replace` tasks on the same fields are fused into one, with the replacement tables composed.
+- An :code:`uppercase` or :code:`lowercase` task followed by a :code:`replace` task on the same fields is fused into
+  the :code:`replace` task, which converts the case before looking values up.
+- Tasks whose only effect is to write fields that are overwritten by :code:`set_field_value`, or dropped by
+  :code:`discard_fields` or :code:`map_fields`, before anything reads them, are removed.
+
+Only tasks without :code:`when` are optimised. A fused task takes the name of the task that would have raised an
+error for a row, so that the error names a task in the playbook; tasks that may both raise one are not fused.
+"""
+
+from dataunifier.tasks.DiscardFieldsTask import DiscardFieldsTask
+from dataunifier.tasks.LowercaseTask import LowercaseTask
+from dataunifier.tasks.MapFieldsTask import MapFieldsTask
+from dataunifier.tasks.ReplaceTask import ReplaceTask, ReplaceRule, E_FAIL, E_BLANK, E_PASSTHROUGH, C_UPPER, \
+    C_LOWER
+from dataunifier.tasks.SetFieldValueTask import SetFieldValueTask
+from dataunifier.tasks.UppercaseTask import UppercaseTask
+
+
+class _UnrecognisedValue(Exception):
+    def __init__(self, task, value):
+        super(_UnrecognisedValue, self).__init__()
+        self.task = task
+        self.value = value
+
+
+def __replace(task, value):
+    # Same as ReplaceTask, after any case conversion.
+    if task.allow_blank and not value:
+        return value
+    if value in task.d:
+        return task.d[value]
+    if task.on_unmatched == E_PASSTHROUGH:
+        return value
+    if task.on_unmatched == E_BLANK:
+        return ""
+    raise _UnrecognisedValue(task, value)
+
+
+def __apply(task, value):
+    # Returns the replacement, or the exception that would be raised.
+    try:
+        return __replace(task, value)
+    except _UnrecognisedValue as e:
+        return e
+
+
+def __compose(first, second, value):
+    outcome = __apply(first, value)
+    return outcome if isinstance(outcome, _UnrecognisedValue) else __apply(second, outcome)
+
+
+def __get_fused_name(first, second, failing_task):
+    # A row error names the task it was raised by, so the fused task takes the name of the only task that may raise
+    # one. Returns None if either task may. Without known resulting fields, the first task may fail because a field
+    # is missing.
+    raising_tasks = [task for task in (first, second) if task is failing_task or (
+        task is first and first.get_resulting_fields() is None
+    )]
+    if len(raising_tasks) > 1:
+        return None
+    return (raising_tasks or [second])[0].name
+
+
+def __fuse_replace_tasks(first, second):
+    # Returns None if the result cannot be expressed as a single ReplaceTask. First, find the outcome for any value
+    # that is neither blank nor in either table.
+    if first.on_unmatched == E_FAIL:
+        default = _UnrecognisedValue(first, None)
+    elif first.on_unmatched == E_BLANK:
+        # The first task blanks the value, which the second task then handles like any blank value.
+        default = __apply(second, "")
+        if default != "":
+            return None
+    else:
+        default = _UnrecognisedValue(second, None) if second.on_unmatched == E_FAIL else second.on_unmatched
+    if isinstance(default, _UnrecognisedValue):
+        on_unmatched, failing_task = E_FAIL, default.task
+    else:
+        on_unmatched, failing_task = (E_BLANK if default == "" else default), None
+    name = __get_fused_name(first, second, failing_task)
+    if name is None:
+        return None
+    table = {}
+    for value in list(dict.fromkeys([*first.d, *second.d, "", None])):
+        outcome = __compose(first, second, value)
+        if not isinstance(outcome, _UnrecognisedValue):
+            table[value] = outcome
+        elif outcome.task is not failing_task or outcome.value != value:
+            # The error would be raised by a different task, or with a different message.
+            return None
+    return ReplaceTask(
+        name, None, second.resulting_fields, second.fields, on_unmatched, False,
+        [ReplaceRule([value], replacement) for value, replacement in table.items()],
+        (failing_task or second).rules_file, first.case
+    )
+
+
+def __fuse(first, second):
+    if not (isinstance(first, (ReplaceTask, UppercaseTask, LowercaseTask)) and isinstance(second, ReplaceTask)):
+        return None
+    if first.when is not None or second.when is not None or first.fields != second.fields or second.case is not None:
+        return None
+    if isinstance(first, ReplaceTask):
+        return __fuse_replace_tasks(first, second)
+    name = __get_fused_name(first, second, second if second.on_unmatched == E_FAIL else None)
+    if name is None:
+        return None
+    return ReplaceTask(
+        name, None, second.resulting_fields, second.fields, second.on_unmatched,
+        second.allow_blank, [ReplaceRule([value], replacement) for value, replacement in second.d.items()],
+        second.rules_file, C_UPPER if isinstance(first, UppercaseTask) else C_LOWER
+    )
+
+
+def __get_written_fields(task):
+    # Returns None if the task may do anything but write to fields, e.g., fail.
+    if task.when is not None or task.get_resulting_fields() is None:
+        # Without known resulting fields, the task may fail because a field is missing.
+        return None
+    if isinstance(task, SetFieldValueTask):
+        return {task.field}
+    if isinstance(task, (UppercaseTask, LowercaseTask)):
+        return set(task.fields)
+    if isinstance(task, ReplaceTask) and task.on_unmatched != E_FAIL:
+        return set(task.fields)
+    return None
+
+
+def __find_overwriter(fields, later_tasks):
+    # Find the task that overwrites or drops the last of the fields, if none of them is read before then.
+    pending = set(fields)
+    for task in later_tasks:
+        if isinstance(task, DiscardFieldsTask):
+            pending -= task.field_set
+        elif isinstance(task, MapFieldsTask):
+            for field in task.fields:
+                for src_field in field.src_fields:
+                    if (src_field in pending) or (field.ignore_case and src_field in {f.lower() for f in pending}):
+                        return None
+            return task
+        elif task.when is not None:
+            return None
+        elif isinstance(task, SetFieldValueTask):
+            pending.discard(task.field)
+        elif isinstance(task, (UppercaseTask, LowercaseTask, ReplaceTask)):
+            if pending & set(task.fields):
+                return None
+        else:
+            return None
+        if not pending:
+            return task
+    return None
+
+
+def optimise(tasks):
+    """
+    Optimise a task list.
+
+    :param list[AbstractTask] tasks: The task list.
+    :return: The optimised task list, and a description of each optimisation made.
+    :rtype: (list[AbstractTask], list[str])
+    """
+
+    tasks = list(tasks)
+    notes = []
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(tasks) - 1):
+            fused = __fuse(tasks[i], tasks[i + 1])
+            if fused is not None:
+                notes.append('Fused %s task "%s" and %s task "%s".' % (
+                    tasks[i].get_task_type_string(), tasks[i].name, tasks[i + 1].get_task_type_string(),
+                    tasks[i + 1].name
+                ))
+                tasks[i:i + 2] = [fused]
+                changed = True
+                break
+        if changed:
+            continue
+        for i, task in enumerate(tasks):
+            written_fields = __get_written_fields(task)
+            overwriter = __find_overwriter(written_fields, tasks[i + 1:]) if written_fields else None
+            if overwriter is not None:
+                notes.append('Removed %s task "%s", whose output is overwritten or dropped by %s task "%s".' % (
+                    task.get_task_type_string(), task.name, overwriter.get_task_type_string(), overwriter.name
+                ))
+                del tasks[i]
+                changed = True
+                break
+    return tasks, notes
+
+
+def describe(tasks):
+    """
+    Describe a task list for display on console.
+
+    :param list[AbstractTask] tasks: The task list.
+    :return: One line per task.
+    :rtype: list[str]
+    """
+
+    return ['%d. %s "%s"' % (i, task.get_task_type_string(), task.name) for i, task in enumerate(tasks, 1)]
@@ -1,9 +1,73 @@
 """
 Module containing logic to produce the correct Task object from the configuration.
+
+Task classes are looked up by their task type string. Besides the built-in task types, task types can be added by
+third-party packages, which declare their task classes as entry points in the :code:`dataunifier.tasks` group, named
+after the task type string. A plugin is only imported when a configuration uses its task type.
 """
 
-from dataunifier.common.exceptions import NoSuchTaskException
+from dataunifier.common.exceptions import ConfigException, NoSuchTaskException
 from dataunifier.tasks import ALL_TASK_CLASSES
+from dataunifier.tasks.AbstractTask import AbstractRegularTask
+
+ENTRY_POINT_GROUP = "dataunifier.tasks"
+
+_task_classes = {task_class.get_task_type_string(): task_class for task_class in ALL_TASK_CLASSES}
+
+
+def register_task_class(task_class):
+    """
+    Make a task class available to configurations, under its task type string.
+
+    :param type task_class: The task class, a subclass of :code:`AbstractRegularTask`.
+    :raises: ValueError if another task class is already registered under the same task type string.
+    """
+
+    task_type = task_class.get_task_type_string()
+    registered = _task_classes.get(task_type)
+    if registered is not None and registered is not task_class:
+        raise ValueError('Task type "%s" is already registered for %s.' % (task_type, registered.__name__))
+    _task_classes[task_type] = task_class
+
+
+def __load_plugin(task_type):
+    from importlib import metadata  # pylint: disable=import-outside-toplevel
+    entry_points = [
+        entry_point for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP) if entry_point.name == task_type
+    ]
+    if not entry_points:
+        return None
+    entry_point = entry_points[0]
+    try:
+        task_class = entry_point.load()
+    except Exception as e:  # pylint: disable=broad-except
+        raise ConfigException('Could not load plugin "%s" for task type "%s": %s' % (entry_point.value, task_type, e))
+    if not (isinstance(task_class, type) and issubclass(task_class, AbstractRegularTask)) \
+            or task_class.get_task_type_string() != task_type:
+        raise ConfigException('Plugin "%s" for task type "%s" is not a task class for that task type.' % (
+            entry_point.value, task_type
+        ))
+    register_task_class(task_class)
+    return task_class
+
+
+def get_task_class(task_type):
+    """
+    Get the task class for a task type string, loading it from a plugin if necessary.
+
+    :param str task_type: The task type string.
+    :return: The task class.
+    :rtype: type
+    :raises: NoSuchTaskException if there is no such task type.
+    :raises: ConfigException if the plugin for the task type cannot be loaded.
+    """
+
+    task_class = _task_classes.get(task_type)
+    if task_class is None:
+        task_class = __load_plugin(task_type)
+    if task_class is None:
+        raise NoSuchTaskException(task_type)
+    return task_class
 
 
 def get_task(ctxt):
@@ -15,7 +79,4 @@ def get_task(ctxt):
     :rtype: AbstractTask
     """
 
-    for task_class in ALL_TASK_CLASSES:
-        if ctxt.task_type == task_class.get_task_type_string():
-            return task_class.create_from_config(ctxt)
-    raise NoSuchTaskException(ctxt.task_type)
+    return get_task_class(ctxt.task_type).create_from_config(ctxt)
@@ -1,16 +1,96 @@
 """
 Module containing logic to produce the correct When object from the configuration.
+
+"When" classes are looked up by their key set, together with any of their optional keys. Besides the built-in ones,
+"when" classes can be added by third-party packages, which declare them as entry points in the
+:code:`dataunifier.when` group. Plugins are only imported when a configuration contains a "when" object that no
+built-in class accepts.
 """
 
+import itertools
+
 from dataunifier.common.exceptions import ConfigException
 from dataunifier.config import constants
 from dataunifier.utils import confighelper
 from dataunifier.when import ALL_WHEN_CLASSES, And, Or, Not
+from dataunifier.when.Abstract import AbstractRegularWhen
+from dataunifier.when.codegen import WhenMemo, AdaptiveOrder
 
 K_AND = "and"
 K_OR = "or"
 K_NOT = "not"
 
+ENTRY_POINT_GROUP = "dataunifier.when"
+
+
+def _get_key_sets(when_class):
+    key_set = frozenset(when_class.get_key_set())
+    optional_keys = sorted(when_class.get_optional_key_set())
+    return [
+        key_set.union(keys) for count in range(len(optional_keys) + 1)
+        for keys in itertools.combinations(optional_keys, count)
+    ]
+
+
+_when_classes = {
+    key_set: when_class for when_class in ALL_WHEN_CLASSES for key_set in _get_key_sets(when_class)
+}
+_plugins_loaded = False
+
+
+def register_when_class(when_class):
+    """
+    Make a "when" class available to configurations, under its key set, with and without each of its optional keys.
+
+    :param type when_class: The "when" class, a subclass of :code:`AbstractWhen`.
+    :raises: ValueError if another "when" class is already registered under the same key set.
+    """
+
+    key_sets = _get_key_sets(when_class)
+    if key_sets[-1] & {K_AND, K_OR, K_NOT}:
+        raise ValueError('The keys "%s", "%s" and "%s" are reserved.' % (K_AND, K_OR, K_NOT))
+    for key_set in key_sets:
+        registered = _when_classes.get(key_set)
+        if registered is not None and registered is not when_class:
+            raise ValueError('Key set "%s" is already registered for %s.' % (
+                '", "'.join(sorted(key_set)), registered.__name__
+            ))
+    for key_set in key_sets:
+        _when_classes[key_set] = when_class
+
+
+def __load_plugins():
+    global _plugins_loaded  # pylint: disable=global-statement
+    _plugins_loaded = True
+    from importlib import metadata  # pylint: disable=import-outside-toplevel
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            when_class = entry_point.load()
+        except Exception as e:  # pylint: disable=broad-except
+            raise ConfigException('Could not load "when" plugin "%s": %s' % (entry_point.value, e))
+        if not (isinstance(when_class, type) and issubclass(when_class, AbstractRegularWhen)):
+            raise ConfigException('"When" plugin "%s" is not a "when" class.' % entry_point.value)
+        try:
+            register_when_class(when_class)
+        except ValueError as e:
+            raise ConfigException('Could not register "when" plugin "%s": %s' % (entry_point.value, e))
+
+
+def get_when_class(key_set):
+    """
+    Get the "when" class for a key set, loading plugins if necessary.
+
+    :param set[str] key_set: The keys of the "when" object.
+    :return: The "when" class, or None if there is none for the key set.
+    :rtype: Optional[type]
+    :raises: ConfigException if a plugin cannot be loaded.
+    """
+
+    key_set = frozenset(key_set)
+    if key_set not in _when_classes and not _plugins_loaded:
+        __load_plugins()
+    return _when_classes.get(key_set)
+
 
 def __check_depth(when_parsing_ctxt):
     if when_parsing_ctxt.depth > constants.MAX_WHEN_DEPTH:
@@ -61,9 +141,75 @@ def get_when(when_parsing_ctxt):
         return __get_or(when_parsing_ctxt)
     if when_parsing_ctxt.value.keys() == {K_NOT}:
         return __get_not(when_parsing_ctxt)
-    for cls in ALL_WHEN_CLASSES:
-        if when_parsing_ctxt.value.keys() == cls.get_key_set():
-            return cls.create_from_config(when_parsing_ctxt)
+    when_class = get_when_class(when_parsing_ctxt.value.keys())
+    if when_class is not None:
+        return when_class.create_from_config(when_parsing_ctxt)
     raise ConfigException('Could not interpret the "when" object at "%s". (File "%s")' % (
         when_parsing_ctxt.key_path, when_parsing_ctxt.current_file
     ))
+
+
+def get_adaptive_whens(when):
+    """
+    Get the :code:`and` and :code:`or` objects with an :code:`AdaptiveOrder` in a :code:`when` object, including the
+    :code:`when` object itself.
+
+    :param Optional[AbstractWhen] when: The :code:`when` object.
+    :return: The :code:`and` and :code:`or` objects, outermost first.
+    :rtype: list[And | Or]
+    """
+
+    if isinstance(when, (And, Or)):
+        found = [when] if when.adaptive is not None else []
+        return found + [inner for inner_when in when.when_list for inner in get_adaptive_whens(inner_when)]
+    if isinstance(when, Not):
+        return get_adaptive_whens(when.when)
+    return []
+
+
+class WhenInterner:
+    """
+    Replaces :code:`when` objects with an equal one seen before, including those inside :code:`and`, :code:`or` and
+    :code:`not`, so that a condition repeated across tasks is a single object. Such objects are given a
+    :code:`WhenMemo`, which lets the tasks after the first reuse its result while the fields it reads are unchanged.
+
+    If a number of rows to sample is given, :code:`and` and :code:`or` objects of more than one condition are also
+    given an :code:`AdaptiveOrder`, to reorder their conditions after that many rows.
+    """
+
+    def __init__(self, adaptive_sample_size=None):
+        """
+        Create an empty :code:`WhenInterner` object.
+
+        :param Optional[int] adaptive_sample_size: The number of rows to sample before reordering the conditions of
+                                                   :code:`and` and :code:`or` objects, or None if they are not
+                                                   reordered.
+        """
+
+        self.adaptive_sample_size = adaptive_sample_size
+        self.whens = {}
+
+    def intern(self, when):
+        """
+        Get the :code:`when` object equal to a :code:`when` object that was interned before, or intern it.
+
+        :param Optional[AbstractWhen] when: The :code:`when` object.
+        :return: The interned :code:`when` object, or None if :code:`when` is None.
+        :rtype: Optional[AbstractWhen]
+        """
+
+        if when is None:
+            return None
+        for interned in self.whens.get(type(when), []):
+            if interned == when:
+                if interned.memo is None and interned.get_fields():
+                    interned.memo = WhenMemo()
+                return interned
+        if isinstance(when, (And, Or)):
+            when.when_list = [self.intern(inner) for inner in when.when_list]
+            if self.adaptive_sample_size is not None and len(when.when_list) > 1:
+                when.adaptive = AdaptiveOrder(self.adaptive_sample_size, isinstance(when, Or))
+        elif isinstance(when, Not):
+            when.when = self.intern(when.when)
+        self.whens.setdefault(type(when), []).append(when)
+        return when
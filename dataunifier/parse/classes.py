@@ -3,6 +3,8 @@ Classes pertaining to parsing of input data files.
 """
 
 import csv
+import pickle
+import tempfile
 
 from dataunifier.cmdline.classes import CommandLineContext
 
@@ -80,7 +82,13 @@ class ParseFilesetContext(CommandLineContext):
             command_line_context.input_dir,
             command_line_context.output_file_path,
             command_line_context.force,
-            command_line_context.config_file_path
+            command_line_context.config_file_path,
+            partition_field=command_line_context.partition_field,
+            stdin_input_file=command_line_context.stdin_input_file,
+            watch=command_line_context.watch,
+            cache_dir=command_line_context.cache_dir,
+            explain=command_line_context.explain,
+            adaptive_sample_size=command_line_context.adaptive_sample_size
         )
         self.parent = command_line_context
         self.writer = writer
@@ -242,3 +250,138 @@ class ParseRowContext(ParseIteratorContext):
             self.row_number == other.row_number,
             self.rowdict == other.rowdict
         ])
+
+
+class SpooledWriter:
+    """
+    A writer that behaves like a :code:`DictWriter`, but stores written rowdicts in a temporary file so that they
+    can be written out to the real writer later.
+
+    Used when the rows of an input file are decoded once and handed to several input files at the same time: the
+    output for all but the input file currently being handled is held back until its turn comes.
+    """
+
+    def __init__(self):
+        """
+        Create a :code:`SpooledWriter` object.
+        """
+
+        self.file = tempfile.TemporaryFile()
+        self.exception = None
+
+    def writerow(self, rowdict):
+        """
+        Write a single rowdict.
+
+        :param dict rowdict: The rowdict to write.
+        """
+
+        pickle.dump(rowdict, self.file, pickle.HIGHEST_PROTOCOL)
+
+    def writerows(self, rowdicts):
+        """
+        Write multiple rowdicts.
+
+        :param list[dict] rowdicts: The rowdicts to write.
+        """
+
+        for rowdict in rowdicts:
+            self.writerow(rowdict)
+
+    def fail(self, exception):
+        """
+        Record an exception that stopped the production of rows, so that it can be raised again after the rows
+        produced before it have been written out.
+
+        :param Exception exception: The exception.
+        """
+
+        self.exception = exception
+
+    def close(self):
+        """
+        Discard the stored rowdicts.
+        """
+
+        self.file.close()
+
+    def replay(self, writer):
+        """
+        Write all stored rowdicts to another writer, then raise the recorded exception, if any.
+
+        The temporary file is closed afterwards.
+
+        :param csv.DictWriter writer: The writer to write the stored rowdicts to.
+        """
+
+        try:
+            self.file.seek(0)
+            while True:
+                try:
+                    rowdict = pickle.load(self.file)
+                except EOFError:
+                    break
+                writer.writerow(rowdict)
+        finally:
+            self.close()
+        if self.exception is not None:
+            raise self.exception
+
+
+class InputFileRead:
+    """
+    Represents the reading of one physical file on behalf of one :code:`InputFile`.
+
+    Reads of the same physical file (or of byte-identical copies of it) are linked together, so that the file is only
+    decoded once.
+    """
+
+    def __init__(self, input_file_ctxt, filepath):
+        """
+        Create an :code:`InputFileRead` object.
+
+        :param ParseInputFileContext input_file_ctxt: The context of the input file the read is for.
+        :param str filepath: The path of the file to read.
+        """
+
+        self.input_file_ctxt = input_file_ctxt
+        self.filepath = filepath
+        self.siblings = [self]
+        self.spool = None
+
+    def is_primary(self):
+        """
+        Indicates whether this read is the first of the reads of its physical file, i.e., the one that decodes the
+        file on behalf of all of them.
+
+        :return: True if this is the first read of the file, False otherwise.
+        :rtype: bool
+        """
+
+        return self.siblings[0] is self
+
+    def __str__(self):
+        return "InputFileRead(%s, %s)" % (self.input_file_ctxt.input_file.name, self.filepath)
+
+    def __repr__(self):
+        return str(self)
+
+
+class InputFileJob:
+    """
+    Contains the reads to perform for one :code:`InputFile`, or the exception raised when trying to locate its files.
+    """
+
+    def __init__(self, input_file_ctxt, reads, exception=None):
+        """
+        Create an :code:`InputFileJob` object.
+
+        :param ParseInputFileContext input_file_ctxt: The context of the input file.
+        :param list[InputFileRead] reads: The reads to perform, one per matching file.
+        :param Optional[Exception] exception: The exception raised when locating the files, if any. It is raised
+                                              when the job's turn comes, rather than when the job is created.
+        """
+
+        self.input_file_ctxt = input_file_ctxt
+        self.reads = reads
+        self.exception = exception
@@ -3,18 +3,21 @@ Module for performing actual parsing of input files, transformation, and writing
 """
 
 import csv
+import itertools
 import os
 import re
 
-import pandas as pd
-import xlrd
-
 from dataunifier.common import constants as commonconstants
 from dataunifier.common.exceptions import NoFileMatchingRegexException, InputFileException, \
     TransformationException, ParsingException, DiscardRecordException
-from dataunifier.parse.classes import ParseFilesetContext, ParseInputFileContext, ParseIteratorContext, ParseRowContext
+from dataunifier.parse import positional
+from dataunifier.parse.classes import ParseFilesetContext, ParseInputFileContext, ParseIteratorContext, \
+    ParseRowContext, SpooledWriter, InputFileRead, InputFileJob
 from dataunifier.utils import fileio, display
 
+# The number of rows handed to the tasks at a time, if any task prepares for many rows at once.
+CHUNK_SIZE = 1000
+
 
 def __get_file_paths(input_file_ctxt):
     input_file = input_file_ctxt.input_file
@@ -45,6 +48,14 @@ def __declare_parsing_file(iterator_ctxt):
     display.stdout(msg)
 
 
+def __declare_shared_reads(secondaries):
+    if secondaries:
+        display.stdout("Rows from this file will also be used for: %s" % ", ".join([
+            'input file "%s" (fileset "%s")' % (read.input_file_ctxt.input_file.name, read.input_file_ctxt.fileset.name)
+            for read in secondaries
+        ]))
+
+
 def __raise_transform_exception(row_ctxt, task, e):
     if row_ctxt.sheet:
         msg = 'When executing task "%s" on row %d of file "%s", sheet "%s": %s' % (
@@ -63,7 +74,28 @@ def __clean_value(value):
     return cleaned
 
 
-def __parse_row(row_ctxt):
+def __transform_row_values(row_ctxt, plan):
+    try:
+        rowdict = {k: __clean_value(v) for k, v in row_ctxt.rowdict.items()}
+        return positional.run(plan, row_ctxt, rowdict, __raise_transform_exception)
+    except DiscardRecordException:
+        return None
+
+
+def transform_row(row_ctxt):
+    """
+    Clean a single row and run all tasks of its fileset on it.
+
+    :param ParseRowContext row_ctxt: The context of the row to transform.
+    :return: The transformed rowdict, or None if the row was discarded.
+    :rtype: Optional[dict]
+    :raises: ParsingException if any task fails.
+    """
+
+    plan = row_ctxt.fileset.plan
+    if plan is not None:
+        values = __transform_row_values(row_ctxt, plan)
+        return None if values is None else plan.to_rowdict(values)
     try:
         tasks = row_ctxt.fileset.tasks
         working_row_ctxt = row_ctxt.with_updated_rowdict({k: __clean_value(v) for k, v in row_ctxt.rowdict.items()})
@@ -72,19 +104,70 @@ def __parse_row(row_ctxt):
                 working_row_ctxt = task.transform(working_row_ctxt)
             except TransformationException as e:
                 __raise_transform_exception(row_ctxt, task, e)
-        row_ctxt.writer.writerow(working_row_ctxt.rowdict)
+        return working_row_ctxt.rowdict
     except DiscardRecordException:
-        pass
+        return None
+
+
+def __write_values(writer, plan, values):
+    # A plain DictWriter with the same fields in the same order writes the values as they are, which is what it
+    # would do with the rowdict.
+    if type(writer) is csv.DictWriter and writer.fieldnames == plan.fields:  # pylint: disable=unidiomatic-typecheck
+        writer.writer.writerow(values)
+    else:
+        writer.writerow(plan.to_rowdict(values))
+
+
+def __parse_row(row_ctxt):
+    plan = row_ctxt.fileset.plan
+    if plan is not None:
+        values = __transform_row_values(row_ctxt, plan)
+        if values is not None:
+            __write_values(row_ctxt.writer, plan, values)
+        return
+    rowdict = transform_row(row_ctxt)
+    if rowdict is not None:
+        row_ctxt.writer.writerow(rowdict)
+
+
+def __parse_chunk(row_ctxts):
+    if len(row_ctxts) == 1:
+        __parse_row(row_ctxts[0])
+        return
+    fileset = row_ctxts[0].fileset
+    plan = fileset.plan
+    dict_tasks, steps = (fileset.tasks, []) if plan is None else (plan.dict_tasks, plan.steps)
+    rowdicts = [{k: __clean_value(v) for k, v in row_ctxt.rowdict.items()} for row_ctxt in row_ctxts]
+    writer = row_ctxts[0].writer
+    for values in positional.run_chunk(dict_tasks, steps, row_ctxts, rowdicts, __raise_transform_exception):
+        if values is None:
+            continue
+        if plan is None:
+            writer.writerow(values)
+        else:
+            __write_values(writer, plan, values)
+
+
+def __get_chunk_size(iterator_ctxts):
+    if any([task.is_chunked() for iterator_ctxt in iterator_ctxts for task in iterator_ctxt.fileset.tasks]):
+        return CHUNK_SIZE
+    return 1
+
+
+def __get_chunks(rowdicts, chunk_size):
+    # Lists of up to chunk_size rowdicts, each with its row number.
+    numbered_rowdicts = enumerate(rowdicts, 1)
+    chunk = list(itertools.islice(numbered_rowdicts, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(numbered_rowdicts, chunk_size))
 
 
 def __parse_iterator(iterator_ctxt, progress_bar=None):
-    counter = 1
-    for rowdict in iterator_ctxt.iterator:
-        row_ctxt = ParseRowContext(iterator_ctxt, counter, rowdict)
-        __parse_row(row_ctxt)
-        counter += 1
+    for chunk in __get_chunks(iterator_ctxt.iterator, __get_chunk_size([iterator_ctxt])):
+        __parse_chunk([ParseRowContext(iterator_ctxt, counter, rowdict) for counter, rowdict in chunk])
         if progress_bar:
-            progress_bar.increment()
+            progress_bar.increment(len(chunk))
 
 
 def __find_sheet(regex_list, sheet_names):
@@ -114,6 +197,9 @@ def __dataframe_to_rowdicts(dataframe):
 
 
 def __get_all_excel_sheets(input_file_path):
+    # pandas and xlrd take a long time to import, and are only needed for Excel files.
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+    import xlrd  # pylint: disable=import-outside-toplevel
     try:
         return pd.read_excel(input_file_path, sheet_name=None)
     except xlrd.biffh.XLRDError:
@@ -124,19 +210,28 @@ def __get_all_excel_sheets(input_file_path):
         )
 
 
-def __get_xls_iterator_list(input_file_ctxt, input_file_path):
-    dataframes = __get_all_excel_sheets(input_file_path)
+def __get_sheet_rowdicts(dataframes, sheet_name, rowdicts_cache):
+    if sheet_name not in rowdicts_cache:
+        rowdicts_cache[sheet_name] = __dataframe_to_rowdicts(dataframes[sheet_name])
+    return rowdicts_cache[sheet_name]
+
+
+def __get_xls_iterator_list(input_file_ctxt, input_file_path, dataframes, rowdicts_cache):
     if input_file_ctxt.input_file.sheets is None:
         return [
-            ParseIteratorContext(input_file_ctxt, input_file_path, sheet_name, __dataframe_to_rowdicts(df))
-            for sheet_name, df in dataframes.items()
+            ParseIteratorContext(
+                input_file_ctxt, input_file_path, sheet_name,
+                __get_sheet_rowdicts(dataframes, sheet_name, rowdicts_cache)
+            )
+            for sheet_name in dataframes.keys()
         ]
     output = []
     for sheet in input_file_ctxt.input_file.sheets:
         matching = __find_sheet(sheet.regex_list, dataframes.keys())
         if matching:
             output.append(ParseIteratorContext(
-                input_file_ctxt, input_file_path, matching, __dataframe_to_rowdicts(dataframes[matching])
+                input_file_ctxt, input_file_path, matching,
+                __get_sheet_rowdicts(dataframes, matching, rowdicts_cache)
             ))
         else:
             if sheet.mandatory:
@@ -147,50 +242,233 @@ def __get_xls_iterator_list(input_file_ctxt, input_file_path):
     return output
 
 
-def __parse_input_file(input_file_ctxt):
-    input_file_paths = __get_file_paths(input_file_ctxt)
-    for input_file_path in input_file_paths:
-        ext = fileio.get_extension(input_file_path)
-        if ext == "csv":
-            row_count = fileio.count_rows(input_file_path)
-            with open(input_file_path, "r", encoding=commonconstants.DEFAULT_ENCODING) as f:
-                iterator_ctxt = ParseIteratorContext(input_file_ctxt, input_file_path, None, csv.DictReader(f))
-                __declare_parsing_file(iterator_ctxt)
-                progress_bar = display.ProgressBar(row_count)
-                __parse_iterator(iterator_ctxt, progress_bar)
+def __get_read_input_file_ctxt(read):
+    if read.spool is None:
+        return read.input_file_ctxt
+    fileset_ctxt = read.input_file_ctxt.parent
+    spooled_fileset_ctxt = ParseFilesetContext(fileset_ctxt.parent, read.spool, fileset_ctxt.fileset)
+    return ParseInputFileContext(spooled_fileset_ctxt, read.input_file_ctxt.input_file)
+
+
+def __parse_csv_stream(read, secondaries, f, row_count):
+    reader = csv.DictReader(f)
+    iterator_ctxt = ParseIteratorContext(read.input_file_ctxt, read.filepath, None, reader)
+    secondary_iterator_ctxts = {
+        secondary: ParseIteratorContext(__get_read_input_file_ctxt(secondary), secondary.filepath, None, reader)
+        for secondary in secondaries
+    }
+    __declare_parsing_file(iterator_ctxt)
+    __declare_shared_reads(secondaries)
+    progress_bar = display.ProgressBar(row_count) if row_count is not None else None
+    chunk_size = __get_chunk_size([iterator_ctxt, *secondary_iterator_ctxts.values()])
+    for chunk in __get_chunks(reader, chunk_size):
+        __parse_chunk([ParseRowContext(iterator_ctxt, counter, rowdict) for counter, rowdict in chunk])
+        for secondary, secondary_iterator_ctxt in list(secondary_iterator_ctxts.items()):
+            try:
+                __parse_chunk([
+                    ParseRowContext(secondary_iterator_ctxt, counter, rowdict) for counter, rowdict in chunk
+                ])
+            except ParsingException as e:
+                secondary.spool.fail(e)
+                del secondary_iterator_ctxts[secondary]
+        if progress_bar:
+            progress_bar.increment(len(chunk))
+    if progress_bar:
+        progress_bar.close()
+
+
+def __parse_csv_reads(read, secondaries):
+    row_count = fileio.count_rows(read.filepath)
+    with open(read.filepath, "r", encoding=commonconstants.DEFAULT_ENCODING) as f:
+        __parse_csv_stream(read, secondaries, f, row_count)
+
+
+def __parse_stdin_reads(read, secondaries):
+    with fileio.open_stdin() as f:
+        __parse_csv_stream(read, secondaries, f, None)
+
+
+def __parse_xls_read(read, dataframes, rowdicts_cache, show_progress):
+    iterator_ctxt_list = __get_xls_iterator_list(
+        __get_read_input_file_ctxt(read), read.filepath, dataframes, rowdicts_cache
+    )
+    for iterator_ctxt in iterator_ctxt_list:
+        if show_progress:
+            __declare_parsing_file(iterator_ctxt)
+            progress_bar = display.ProgressBar(len(iterator_ctxt.iterator))
+            __parse_iterator(iterator_ctxt, progress_bar)
             progress_bar.close()
-        elif ext[0:3] == "xls":
-            iterator_ctxt_list = __get_xls_iterator_list(input_file_ctxt, input_file_path)
-            for iterator_ctxt in iterator_ctxt_list:
-                __declare_parsing_file(iterator_ctxt)
-                progress_bar = display.ProgressBar(len(iterator_ctxt.iterator))
-                __parse_iterator(iterator_ctxt, progress_bar)
-                progress_bar.close()
         else:
-            msg = 'File "%s" has an unsupported format: "%s". Only CSVs and Excel files are accepted. ' \
-                  '(Input File "%s")' % (
-                      input_file_path, ext, input_file_ctxt.input_file.name
-                  )
-            raise InputFileException(msg)
+            __parse_iterator(iterator_ctxt)
 
 
-def __parse_fileset(ctxt):
-    fileset = ctxt.fileset
-    display.stdout("Handling fileset: %s" % fileset.name)
-    input_files = fileset.input_files
-    for input_file in input_files:
-        input_file_ctxt = ParseInputFileContext(ctxt, input_file)
-        __parse_input_file(input_file_ctxt)
+def __parse_xls_reads(read, secondaries):
+    dataframes = __get_all_excel_sheets(read.filepath)
+    rowdicts_cache = {}
+    __parse_xls_read(read, dataframes, rowdicts_cache, True)
+    if secondaries:
+        display.stdout('Parsing file "%s" for other input files...' % read.filepath)
+        __declare_shared_reads(secondaries)
+    for secondary in secondaries:
+        try:
+            __parse_xls_read(secondary, dataframes, rowdicts_cache, False)
+        except (ParsingException, InputFileException) as e:
+            secondary.spool.fail(e)
+
+
+def __parse_primary_read(read):
+    secondaries = read.siblings[1:]
+    for secondary in secondaries:
+        secondary.spool = SpooledWriter()
+    if read.filepath == commonconstants.STDIN_FILE_PATH:
+        __parse_stdin_reads(read, secondaries)
+        return
+    ext = fileio.get_extension(read.filepath)
+    if ext == "csv":
+        __parse_csv_reads(read, secondaries)
+    elif ext[0:3] == "xls":
+        __parse_xls_reads(read, secondaries)
+    else:
+        msg = 'File "%s" has an unsupported format: "%s". Only CSVs and Excel files are accepted. ' \
+              '(Input File "%s")' % (
+                  read.filepath, ext, read.input_file_ctxt.input_file.name
+              )
+        raise InputFileException(msg)
+
+
+def __replay_read(read):
+    display.stdout('Writing rows of file "%s", which were already parsed together with file "%s".' % (
+        read.filepath, read.siblings[0].filepath
+    ))
+    read.spool.replay(read.input_file_ctxt.writer)
+
+
+def __run_job(job):
+    if job.exception is not None:
+        raise job.exception
+    for read in job.reads:
+        if read.is_primary():
+            __parse_primary_read(read)
+        else:
+            __replay_read(read)
+
+
+def __get_read_identity(read):
+    if read.filepath == commonconstants.STDIN_FILE_PATH:
+        return commonconstants.STDIN_FILE_PATH, None
+    return fileio.get_file_identity(read.filepath)
+
+
+def __get_read_keys(reads):
+    identities = [__get_read_identity(read) for read in reads]
+    paths_by_identity = {}
+    for read, identity in zip(reads, identities):
+        paths_by_identity.setdefault(identity, read.filepath)
+    identities_by_size = {}
+    for identity, path in paths_by_identity.items():
+        if path == commonconstants.STDIN_FILE_PATH:
+            continue
+        identities_by_size.setdefault(fileio.get_file_size(path), []).append(identity)
+    keys_by_identity = {identity: identity for identity in paths_by_identity}
+    for size, identity_list in identities_by_size.items():
+        if len(identity_list) > 1:
+            for identity in identity_list:
+                keys_by_identity[identity] = (size, fileio.get_file_digest(paths_by_identity[identity]))
+    return [
+        (fileio.get_extension(read.filepath), keys_by_identity[identity]) for read, identity in zip(reads, identities)
+    ]
+
+
+def __link_reads(reads):
+    """
+    Link together reads of the same physical file, or of files with identical content, so that each file is only
+    decoded once.
+    """
+
+    groups = {}
+    for read, key in zip(reads, __get_read_keys(reads)):
+        groups.setdefault(key, []).append(read)
+    for group in groups.values():
+        for read in group:
+            read.siblings = group
+
+
+def __get_matching_file_paths(input_file_ctxt, file_names):
+    for regex in input_file_ctxt.input_file.regex_list:
+        matching = [file_name for file_name in file_names if re.fullmatch(regex, file_name)]
+        if matching:
+            return [os.path.join(input_file_ctxt.input_dir, file_name) for file_name in matching]
+    return []
+
+
+def __get_jobs(fileset_ctxt, reads, file_names=None):
+    jobs = []
+    for input_file in fileset_ctxt.fileset.input_files or []:
+        input_file_ctxt = ParseInputFileContext(fileset_ctxt, input_file)
+        if file_names is not None:
+            file_paths = __get_matching_file_paths(input_file_ctxt, file_names)
+            if not file_paths:
+                continue
+        elif input_file.name == fileset_ctxt.stdin_input_file:
+            file_paths = [commonconstants.STDIN_FILE_PATH]
+        else:
+            try:
+                file_paths = __get_file_paths(input_file_ctxt)
+            except InputFileException as e:
+                jobs.append(InputFileJob(input_file_ctxt, [], e))
+                continue
+        file_reads = [InputFileRead(input_file_ctxt, path) for path in file_paths]
+        jobs.append(InputFileJob(input_file_ctxt, file_reads))
+        reads.extend(file_reads)
+    return jobs
+
+
+def __run_schedule(config_ctxt, writer, file_names=None):
+    reads = []
+    schedule = []
+    for fileset in config_ctxt.filesets:
+        fileset_ctxt = ParseFilesetContext(config_ctxt.parent, writer, fileset)
+        jobs = __get_jobs(fileset_ctxt, reads, file_names)
+        if jobs or file_names is None:
+            schedule.append((fileset_ctxt, jobs))
+    __link_reads(reads)
+    for fileset_ctxt, jobs in schedule:
+        display.stdout("Handling fileset: %s" % fileset_ctxt.fileset.name)
+        for job in jobs:
+            __run_job(job)
+    return [read.filepath for read in reads]
 
 
 def start(config_ctxt, writer):
     """
     Start the parsing, transformation and writing process for all files specified in the configuration.
 
+    All input files are located before any of them is parsed. A file that is matched by more than one input file
+    (across all filesets), or that has the same content as another matched file, is only decoded once; its rows are
+    handed to every input file that needs them, and the output is still written in the usual order.
+
     :param ConfigContext config_ctxt: The ConfigContext object representing the configuration.
     :param csv.DictWriter writer: The DictWriter to use to write.
+    :return: The paths of the files that were read.
+    :rtype: list[str]
     """
 
-    for fileset in config_ctxt.filesets:
-        fileset_ctxt = ParseFilesetContext(config_ctxt.parent, writer, fileset)
-        __parse_fileset(fileset_ctxt)
+    return __run_schedule(config_ctxt, writer)
+
+
+def parse_files(config_ctxt, writer, file_names):
+    """
+    Parse, transform and write specific files in the input directory, e.g., files that were added after
+    :code:`start` was called.
+
+    Each file is handled by every input file whose patterns it matches, as it would have been by :code:`start`.
+    Input files that match none of the files are skipped, rather than causing an error.
+
+    :param ConfigContext config_ctxt: The ConfigContext object representing the configuration.
+    :param csv.DictWriter writer: The DictWriter to use to write.
+    :param list[str] file_names: The names of the files in the input directory to parse.
+    :return: The paths of the files that were read.
+    :rtype: list[str]
+    """
+
+    return __run_schedule(config_ctxt, writer, file_names)
@@ -0,0 +1,236 @@
+"""
+Module for running the tasks of a fileset on rows that are represented as lists of values instead of rowdicts.
+
+The fields of a row are known in advance once a :code:`map_fields` task has run: every later task keeps them, or
+drops some of them in the case of :code:`discard_fields`. From that point on, each field name is resolved to a
+position once, when the fileset is loaded, and each row is carried as a plain list of values in that order, so tasks
+do not hash field names or copy rowdicts for every row.
+
+Tasks take part through :code:`AbstractTask.compile`. Tasks that do not support it are still run, by converting
+the row to a rowdict and back around them.
+"""
+
+from dataunifier.common.exceptions import TransformationException, DiscardRecordException
+from dataunifier.when import codegen
+
+
+class PositionalPlan:
+    """
+    The compiled form of the task list of a fileset.
+    """
+
+    def __init__(self, tasks, dict_tasks, steps, fields):
+        """
+        Create a :code:`PositionalPlan` object. Use :code:`get_plan` instead.
+
+        :param list[AbstractTask] tasks: The task list.
+        :param list[AbstractTask] dict_tasks: The tasks at the start of the task list, which are run on rowdicts.
+        :param list[(AbstractTask, Callable[[list | dict, ParseRowContext], list])] steps: The remaining tasks,
+            with their compiled steps.
+        :param list[str] fields: The fields of the lists of values produced by the last step.
+        """
+
+        self.tasks = tasks
+        self.dict_tasks = dict_tasks
+        self.steps = steps
+        self.fields = fields
+
+    def __reduce__(self):
+        # The compiled steps are closures, which cannot be pickled, so a cached configuration compiles them anew.
+        return get_plan, (self.tasks,)
+
+    def to_rowdict(self, values):
+        """
+        Convert a list of values produced by the plan to a rowdict.
+
+        :param list values: The list of values.
+        :return: The rowdict.
+        :rtype: dict
+        """
+
+        return dict(zip(self.fields, values))
+
+
+def get_slots(fields):
+    """
+    Get the position of each field in a list of values.
+
+    :param list[str] fields: The fields, in order, without duplicates.
+    :return: The position of each field.
+    :rtype: dict[str, int]
+    """
+
+    return {field: i for i, field in enumerate(fields)}
+
+
+def get_indices(fields, slots):
+    """
+    Get the positions of the fields a task works on.
+
+    :param list[str] fields: The fields. Duplicates are only included once.
+    :param Optional[dict[str, int]] slots: The position of each field in the rows the task receives, as passed to
+                                           :code:`AbstractTask.compile`.
+    :return: The positions, or None if the fields are not known in advance, or any of them is not in :code:`slots`.
+    :rtype: Optional[list[int]]
+    """
+
+    if slots is None or not all([field in slots for field in fields]):
+        return None
+    return list(dict.fromkeys([slots[field] for field in fields]))
+
+
+def with_when(when, slots, step):
+    """
+    Make a compiled step conditional.
+
+    :param Optional[AbstractWhen] when: The condition of the task, if any.
+    :param dict[str, int] slots: The position of each field in the rows the task receives.
+    :param Callable[[list, ParseRowContext], list] step: The compiled step.
+    :return: The compiled step, which only runs if the condition holds.
+    :rtype: Callable[[list, ParseRowContext], list]
+    """
+
+    if when is None:
+        return step
+    evaluate = codegen.compile_when(when, slots)
+
+    def conditional_step(values, row_ctxt):
+        if evaluate(values, row_ctxt):
+            return step(values, row_ctxt)
+        return values
+
+    return conditional_step
+
+
+def __adapt(task, fields):
+    resulting_fields = list(task.get_resulting_fields())
+
+    def step(values, row_ctxt):
+        rowdict = task.transform(row_ctxt.with_updated_rowdict(dict(zip(fields, values)))).rowdict
+        return [rowdict[field] for field in resulting_fields]
+
+    return step
+
+
+def __has_known_fields(tasks):
+    # From the first task that can produce a list of values, the fields must be known without duplicates.
+    started = False
+    for task in tasks:
+        started = started or task.compile(None) is not None
+        if started:
+            fields = task.get_resulting_fields()
+            if fields is None or len(set(fields)) != len(fields):
+                return False
+    return started
+
+
+def get_plan(tasks):
+    """
+    Compile the task list of a fileset, if possible.
+
+    :param list[AbstractTask] tasks: The task list.
+    :return: The plan, or None if the rows must be represented as rowdicts throughout, e.g., because there is no
+             :code:`map_fields` task, or because the resulting fields of some task are not known.
+    :rtype: Optional[PositionalPlan]
+    """
+
+    if not __has_known_fields(tasks):
+        return None
+    dict_tasks = []
+    steps = []
+    fields = None
+    for task in tasks:
+        if fields is None:
+            step = task.compile(None)
+            if step is None:
+                dict_tasks.append(task)
+                continue
+        else:
+            step = task.compile(get_slots(fields)) or __adapt(task, fields)
+        steps.append((task, step))
+        fields = list(task.get_resulting_fields())
+    return PositionalPlan(tasks, dict_tasks, steps, fields)
+
+
+def run(plan, row_ctxt, rowdict, on_error):
+    """
+    Run the tasks of a plan on a row.
+
+    :param PositionalPlan plan: The plan.
+    :param ParseRowContext row_ctxt: The context of the row.
+    :param dict rowdict: The cleaned rowdict.
+    :param Callable[[ParseRowContext, AbstractTask, TransformationException], None] on_error: Called if a task
+        fails. Expected to raise an exception.
+    :return: The transformed list of values.
+    :rtype: list
+    :raises: DiscardRecordException if the row is discarded.
+    """
+
+    working_row_ctxt = row_ctxt.with_updated_rowdict(rowdict)
+    for task in plan.dict_tasks:
+        try:
+            working_row_ctxt = task.transform(working_row_ctxt)
+        except TransformationException as e:
+            on_error(row_ctxt, task, e)
+    values = working_row_ctxt.rowdict
+    for task, step in plan.steps:
+        try:
+            values = step(values, working_row_ctxt)
+        except TransformationException as e:
+            on_error(row_ctxt, task, e)
+    return values
+
+
+def __prepare(task, states, slots):
+    if task.is_chunked():
+        task.prepare(states, slots)
+
+
+def run_chunk(dict_tasks, steps, row_ctxts, rowdicts, on_error):
+    """
+    Run tasks on a chunk of rows, one task at a time, so that tasks can prepare for all of the rows at once (see
+    :code:`AbstractTask.prepare`). The result for each row is the same as that of running the tasks on it alone.
+
+    :param list[AbstractTask] dict_tasks: The tasks to run on rowdicts, e.g., :code:`PositionalPlan.dict_tasks`, or
+                                          all tasks if there is no plan.
+    :param list[(AbstractTask, Callable[[list | dict, ParseRowContext], list])] steps: The compiled steps to run
+        after those, e.g., :code:`PositionalPlan.steps`.
+    :param list[ParseRowContext] row_ctxts: The contexts of the rows.
+    :param list[dict] rowdicts: The cleaned rowdicts.
+    :param Callable[[ParseRowContext, AbstractTask, TransformationException], None] on_error: Called if a task
+        fails on a row, once all rows before it have been yielded. Expected to raise an exception.
+    :return: For each row, in order, the transformed list of values (or rowdict, if there are no steps), or None if
+             the row was discarded.
+    :rtype: Iterator[Optional[list | dict]]
+    """
+
+    working_row_ctxts = [row_ctxt.with_updated_rowdict(rowdict) for row_ctxt, rowdict in zip(row_ctxts, rowdicts)]
+    failures = {}
+    live = list(range(len(row_ctxts)))
+    for task in dict_tasks:
+        __prepare(task, [working_row_ctxts[i].rowdict for i in live], None)
+        for i in live:
+            try:
+                working_row_ctxts[i] = task.transform(working_row_ctxts[i])
+            except TransformationException as e:
+                failures[i] = (task, e)
+            except DiscardRecordException:
+                failures[i] = None
+        live = [i for i in live if i not in failures]
+    values = [working_row_ctxt.rowdict for working_row_ctxt in working_row_ctxts]
+    slots = None
+    for task, step in steps:
+        __prepare(task, [values[i] for i in live], slots)
+        for i in live:
+            try:
+                values[i] = step(values[i], working_row_ctxts[i])
+            except TransformationException as e:
+                failures[i] = (task, e)
+            except DiscardRecordException:
+                failures[i] = None
+        live = [i for i in live if i not in failures]
+        slots = get_slots(task.get_resulting_fields())
+    for i, row_ctxt in enumerate(row_ctxts):
+        if failures.get(i) is not None:
+            on_error(row_ctxt, *failures[i])
+        yield None if i in failures else values[i]
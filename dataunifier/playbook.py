@@ -0,0 +1,164 @@
+"""
+In-process API for :code:`dataunifier`.
+
+A :code:`Playbook` is loaded once, including all lookup files and rule tables, and can then be used any number of
+times to transform rows or whole input directories, without going through the command line. Call :code:`close`, or
+use the playbook as a context manager, to release the resources its tasks acquired, e.g., worker processes.
+"""
+
+import csv
+
+from dataunifier.cmdline import cmdline
+from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.cmdline.constants import DEFAULT_INPUT_DIR
+from dataunifier.common.exceptions import ConfigException
+from dataunifier.config import config
+from dataunifier.config.classes import ConfigContext, InputFile
+from dataunifier.parse import parse
+from dataunifier.parse.classes import ParseFilesetContext, ParseInputFileContext, ParseIteratorContext, \
+    ParseRowContext
+
+
+DEFAULT_ROWS_SOURCE_NAME = "<rows>"
+
+
+class Playbook:
+    """
+    A loaded playbook, ready to be used to transform data.
+    """
+
+    @classmethod
+    def load(cls, config_file_path, input_dir=DEFAULT_INPUT_DIR):
+        """
+        Load a playbook file.
+
+        :param str config_file_path: The path of the playbook file.
+        :param str input_dir: The default input directory for :code:`run`.
+        :return: The loaded playbook.
+        :rtype: Playbook
+        :raises: CommandLineException if the playbook file does not exist.
+        :raises: ConfigException if the playbook is invalid.
+        """
+
+        cmdline.validate_config_file_path(config_file_path)
+        command_line_ctxt = CommandLineContext(input_dir, None, True, config_file_path)
+        return cls(config.get_context(command_line_ctxt))
+
+    def __init__(self, config_ctxt):
+        """
+        Create a :code:`Playbook` object from an already parsed configuration. Use :code:`load` to load a playbook
+        file instead.
+
+        :param ConfigContext config_ctxt: The parsed configuration.
+        """
+
+        self.config_ctxt = config_ctxt
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the resources that the tasks acquired while transforming rows, e.g., worker processes. The playbook
+        may still be used afterwards, and acquires them again if needed.
+        """
+
+        config.close_tasks(self.config_ctxt.filesets)
+
+    @property
+    def fields(self):
+        """
+        The fields of the output.
+
+        :rtype: list[str]
+        """
+
+        return self.config_ctxt.fields
+
+    def get_fileset(self, name=None):
+        """
+        Get a fileset of the playbook by name.
+
+        :param Optional[str] name: The name of the fileset. May be omitted if the playbook only has one fileset.
+        :return: The fileset.
+        :rtype: Fileset
+        :raises: ConfigException if there is no such fileset, or if no name is given and there is more than one.
+        """
+
+        filesets = self.config_ctxt.filesets
+        if name is None:
+            if len(filesets) == 1:
+                return filesets[0]
+            msg = 'Playbook "%s" has more than one fileset, so one must be specified: "%s"' % (
+                self.config_ctxt.config_file_path, '", "'.join([fileset.name for fileset in filesets])
+            )
+            raise ConfigException(msg)
+        for fileset in filesets:
+            if fileset.name == name:
+                return fileset
+        msg = 'Could not find fileset "%s" in playbook "%s".' % (name, self.config_ctxt.config_file_path)
+        raise ConfigException(msg)
+
+    def transform_rows(self, rows, fileset=None, source_name=DEFAULT_ROWS_SOURCE_NAME):
+        """
+        Transform rows using the tasks of a fileset.
+
+        Rows are transformed lazily, one at a time, as the result is iterated over, so that any number of rows can be
+        pushed through without holding them in memory.
+
+        :param Iterable[dict] rows: The rows to transform, as rowdicts with string values.
+        :param Optional[str] fileset: The name of the fileset whose tasks to use. May be omitted if the playbook only
+                                      has one fileset.
+        :param str source_name: The name to use for the rows in error messages, in place of a file name.
+        :return: The transformed rowdicts, as they would be written to the output file. Discarded rows are skipped.
+        :rtype: Iterator[dict]
+        :raises: ConfigException if the fileset cannot be found.
+        :raises: ParsingException if any task fails.
+        """
+
+        fileset_ctxt = ParseFilesetContext(self.config_ctxt.parent, None, self.get_fileset(fileset))
+        input_file_ctxt = ParseInputFileContext(fileset_ctxt, InputFile(source_name, [], None))
+        return self.__transform_rows(ParseIteratorContext(input_file_ctxt, source_name, None, rows))
+
+    @staticmethod
+    def __transform_rows(iterator_ctxt):
+        for counter, rowdict in enumerate(iterator_ctxt.iterator, 1):
+            transformed = parse.transform_row(ParseRowContext(iterator_ctxt, counter, rowdict))
+            if transformed is not None:
+                yield transformed
+
+    def run(self, input_dir, output):
+        """
+        Parse, transform and write all input files, like the command line does.
+
+        :param Optional[str] input_dir: The input directory, or None to use the one given to :code:`load`.
+        :param str | io.TextIOBase | csv.DictWriter output: The path of the output file, a text file object opened
+                                                           with :code:`newline=""`, or a :code:`DictWriter`-like
+                                                           object to write the rowdicts to.
+        :return: The paths of the input files that were read.
+        :rtype: list[str]
+        """
+
+        parent = self.config_ctxt.parent
+        command_line_ctxt = CommandLineContext(
+            parent.input_dir if input_dir is None else input_dir,
+            output if isinstance(output, str) else None,
+            True,
+            parent.config_file_path
+        )
+        config_ctxt = ConfigContext(command_line_ctxt, self.config_ctxt.fields, self.config_ctxt.filesets)
+        if isinstance(output, str):
+            with open(output, "w", newline="") as f:
+                return self.__write(config_ctxt, f)
+        if hasattr(output, "writerow"):
+            return parse.start(config_ctxt, output)
+        return self.__write(config_ctxt, output)
+
+    @staticmethod
+    def __write(config_ctxt, f):
+        writer = csv.DictWriter(f, config_ctxt.fields)
+        writer.writeheader()
+        return parse.start(config_ctxt, writer)
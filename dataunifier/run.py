@@ -6,14 +6,18 @@ import csv
 import sys
 import time
 
-from dataunifier.cmdline.constants import INPUT_DIR_OPTION_STUB, FORCE_OPTION, OUTPUT_OPTION_STUB
-from dataunifier.common.exceptions import ExceptionWithMessage, AbortException
+from dataunifier.cmdline.constants import INPUT_DIR_OPTION_STUB, FORCE_OPTION, OUTPUT_OPTION_STUB, \
+    PARTITION_BY_OPTION_STUB, STDIN_AS_OPTION_STUB, STDOUT_OUTPUT_FILE_PATH, WATCH_OPTION, CACHE_DIR_OPTION_STUB, \
+    EXPLAIN_OPTION, ADAPTIVE_CONDITIONS_OPTION
+from dataunifier.common.exceptions import ExceptionWithMessage, AbortException, CommandLineException
 from dataunifier.config import config
 from dataunifier.cmdline import cmdline
 from dataunifier.logging import logging
 from dataunifier.logging.constants import LOG_FILE_PATH_OPTION_STUB
 from dataunifier.parse import parse
-from dataunifier.utils import display
+from dataunifier.utils import display, fileio, partition
+from dataunifier.utils.partition import PartitionedDictWriter
+from dataunifier.watch import watch
 
 
 def print_usage():
@@ -25,9 +29,84 @@ def print_usage():
                    f"[{LOG_FILE_PATH_OPTION_STUB}<log file path>] "
                    f"[{INPUT_DIR_OPTION_STUB}<input directory path>] "
                    f"[{OUTPUT_OPTION_STUB}<output file path>] "
+                   f"[{PARTITION_BY_OPTION_STUB}<field>] "
+                   f"[{STDIN_AS_OPTION_STUB}<input file name>] "
+                   f"[{WATCH_OPTION}] "
+                   f"[{CACHE_DIR_OPTION_STUB}<cache directory path>] "
+                   f"[{EXPLAIN_OPTION}] "
+                   f"[{ADAPTIVE_CONDITIONS_OPTION}[=<number of rows>]] "
                    f"<path to playbook>")
 
 
+def validate_stdin_input_file(config_ctxt):
+    """
+    Validate that the input file to be read from :code:`stdin` (if any) is specified in the configuration.
+
+    :param ConfigContext config_ctxt: The configuration context.
+    :raises: CommandLineException if no input file with the given name exists.
+    """
+
+    if config_ctxt.stdin_input_file is None:
+        return
+    for fileset in config_ctxt.filesets:
+        for input_file in fileset.input_files or []:
+            if input_file.name == config_ctxt.stdin_input_file:
+                return
+    raise CommandLineException('Could not find an input file named "%s" to read from stdin.' % (
+        config_ctxt.stdin_input_file
+    ))
+
+
+def parse_all(config_ctxt, writer, flush):
+    """
+    Parse all input files, and if requested, keep watching the input directory for new files afterwards.
+
+    :param ConfigContext config_ctxt: The configuration context.
+    :param csv.DictWriter writer: The DictWriter to use to write.
+    :param Callable[[], None] flush: A function that flushes the output.
+    """
+
+    if config_ctxt.watch:
+        watch.start(config_ctxt, writer, flush)
+    else:
+        parse.start(config_ctxt, writer)
+
+
+def write(config_ctxt, f):
+    """
+    Parse all input files, writing the output as CSV to a file object.
+
+    :param ConfigContext config_ctxt: The configuration context.
+    :param io.TextIOBase f: The file object to write to.
+    """
+
+    writer = csv.DictWriter(f, config_ctxt.fields)
+    writer.writeheader()
+    parse_all(config_ctxt, writer, f.flush)
+
+
+def write_partitioned(config_ctxt):
+    """
+    Parse all input files, writing the output to one file per value of the partition field.
+
+    :param ConfigContext config_ctxt: The configuration context.
+    :raises: CommandLineException if the partition field is not one of the output fields.
+    """
+
+    if config_ctxt.partition_field not in config_ctxt.fields:
+        raise CommandLineException('Cannot partition output by field "%s", as it is not an output field.' % (
+            config_ctxt.partition_field
+        ))
+    partition_dir = cmdline.get_partition_dir(config_ctxt.output_file_path)
+    fileio.prepare_dir(partition_dir, partition.get_partition_file_pattern(config_ctxt.partition_field))
+    writer = PartitionedDictWriter(partition_dir, config_ctxt.fields, config_ctxt.partition_field)
+    try:
+        parse_all(config_ctxt, writer, writer.flush)
+    finally:
+        writer.close()
+    display.stdout('Wrote %d partition file(s) to directory "%s".' % (len(writer.get_file_paths()), partition_dir))
+
+
 def main(args):
     """
     Main function that contains the key execution steps.
@@ -38,17 +117,34 @@ def main(args):
     :param list[str] args: List of strings containing command line arguments.
     """
 
+    display.set_messages_to_stderr(cmdline.get_output_file(args) == STDOUT_OUTPUT_FILE_PATH)
     command_line_ctxt = cmdline.get_context(args)
     config_ctxt = config.get_context(command_line_ctxt)
+    if config_ctxt.explain:
+        return
+    validate_stdin_input_file(config_ctxt)
     output_file_path = config_ctxt.output_file_path
     start = time.time()
-    with open(output_file_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, config_ctxt.fields)
-        writer.writeheader()
-        parse.start(config_ctxt, writer)
+    try:
+        if config_ctxt.partition_field is not None:
+            write_partitioned(config_ctxt)
+        elif output_file_path == STDOUT_OUTPUT_FILE_PATH:
+            with fileio.open_stdout() as f:
+                write(config_ctxt, f)
+        else:
+            with open(output_file_path, "w", newline="") as f:
+                write(config_ctxt, f)
+    finally:
+        config.close_tasks(config_ctxt.filesets)
     end = time.time()
     dur = end - start
     display.stdout("Done. Took %.2f seconds." % dur)
+    for fileset in config_ctxt.filesets:
+        for task in fileset.tasks:
+            for line in task.get_summary():
+                display.stdout(line)
+    for line in config.get_condition_summary(config_ctxt.filesets):
+        display.stdout(line)
 
 
 def entry(args):
@@ -51,6 +51,46 @@ class AbstractTask(abc.ABC):
         :rtype: ParseRowContext
         """
 
+    def compile(self, slots):
+        """
+        Compile the task for rows that are represented as lists of values instead of rowdicts.
+
+        The compiled step is called with the list of values and the row context, and returns the transformed list of
+        values, which may be the same list, changed in place. It raises the same exceptions as :code:`transform`.
+
+        :param Optional[dict[str, int]] slots: The position of each field in the lists of values the task receives,
+                                               or None if the fields are not known in advance, in which case the
+                                               step receives the rowdict instead.
+        :return: The compiled step, or None if the task can only transform row context objects.
+        :rtype: Optional[Callable[[list | dict, ParseRowContext], list]]
+        """
+
+        return None
+
+    def is_chunked(self):
+        """
+        Indicates whether the task works faster if it can prepare for many rows at once, by way of :code:`prepare`.
+
+        :return: True if rows should be handed to the task in chunks, False otherwise.
+        :rtype: bool
+        """
+
+        return False
+
+    def prepare(self, rows, slots):
+        """
+        Prepare for transforming a chunk of rows, e.g., by working out the results for all of their values at once.
+        Only called if :code:`is_chunked` returns True, before the task transforms any of the rows.
+
+        The rows are as the task receives them, but the task may not be run on all of them, e.g., because of its
+        condition. It must not change them, and the result of transforming a row must be the same whether or not
+        :code:`prepare` was called.
+
+        :param list[list | dict] rows: The rows, as lists of values or rowdicts.
+        :param Optional[dict[str, int]] slots: The position of each field in the lists of values, or None if the rows
+                                               are rowdicts.
+        """
+
     @abc.abstractmethod
     def get_resulting_fields(self):
         """
@@ -60,6 +100,22 @@ class AbstractTask(abc.ABC):
         :rtype: list[str]
         """
 
+    def get_summary(self):
+        """
+        Get statistics about the work the task has done so far, for display on console when the run is done.
+
+        :return: Lines of text, or an empty list if there is nothing to report.
+        :rtype: list[str]
+        """
+
+        return []
+
+    def close(self):
+        """
+        Release resources that the task acquired while transforming rows, e.g., worker processes. Called when the run
+        is done. The task may still be used afterwards, and acquires them again if needed.
+        """
+
     def __eq__(self, other):
         if other is None:
             return False
@@ -51,5 +51,22 @@ class BlockTask(AbstractTask):
             output = task.transform(output)
         return output
 
+    def is_chunked(self):
+        return any([task.is_chunked() for task in self.task_list])
+
+    def prepare(self, rows, slots):
+        # Tasks in the block receive the rows as changed by the tasks before them, so this is only a good guess for
+        # all but the first task. Blocks only contain conditional tasks, which keep the fields as they are.
+        for task in self.task_list:
+            if task.is_chunked():
+                task.prepare(rows, slots)
+
     def get_resulting_fields(self):
         return self.task_list[-1].get_resulting_fields()
+
+    def get_summary(self):
+        return [line for task in self.task_list for line in task.get_summary()]
+
+    def close(self):
+        for task in self.task_list:
+            task.close()
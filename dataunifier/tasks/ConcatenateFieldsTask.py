@@ -3,6 +3,7 @@ ConcatenateFieldsTask module.
 """
 
 from dataunifier.common.exceptions import ConfigException, TransformationException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 from dataunifier.utils import confighelper
 
@@ -95,5 +96,18 @@ class ConcatenateFieldsTask(AbstractRegularTask):
         output[self.to_field] = concatenated_value
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        if positional.get_indices(self.fields + [self.to_field], slots) is None:
+            return None
+        indices = [slots[field] for field in self.fields]
+        to_index = slots[self.to_field]
+        with_string = self.with_string
+
+        def transform_values(values, row_ctxt):
+            values[to_index] = with_string.join([values[i] for i in indices])
+            return values
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
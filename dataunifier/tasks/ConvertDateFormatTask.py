@@ -4,8 +4,6 @@ ConvertDateFormatTask module.
 
 import datetime
 
-import pytz
-
 from dataunifier.common import constants as commonconstants
 from dataunifier.common.exceptions import ConfigException, TransformationException
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
@@ -68,6 +66,7 @@ class ConvertDateFormatTask(AbstractRegularTask):
         allow_blank = confighelper.get_boolean(task_parsing_context, K_ALLOW_BLANK, True).value
         timezone_ctxt = confighelper.get_literal(task_parsing_context, K_TIMEZONE, False)
         timezone = timezone_ctxt.value if timezone_ctxt else commonconstants.DEFAULT_TIMEZONE
+        import pytz  # pylint: disable=import-outside-toplevel
         try:
             task = ConvertDateFormatTask(
                 name, when, resulting_fields, fields, accepted_formats, target_format, allow_blank, timezone
@@ -92,6 +91,8 @@ class ConvertDateFormatTask(AbstractRegularTask):
         self.accepted_formats = accepted_formats
         self.target_format = target_format
         self.allow_blank = allow_blank
+        # pytz is only imported once a date task is created, to keep it out of startup.
+        import pytz  # pylint: disable=import-outside-toplevel
         self.timezone = pytz.timezone(timezone)
         super(ConvertDateFormatTask, self).__init__(name, when)
 
@@ -3,6 +3,7 @@ CopyFieldValueTask module.
 """
 
 from dataunifier.common.exceptions import ConfigException, TransformationException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 from dataunifier.utils import confighelper
 
@@ -97,5 +98,19 @@ class CopyFieldValueTask(AbstractRegularTask):
             output[field] = value
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        indices = positional.get_indices(self.to_fields, slots)
+        if indices is None or self.from_field not in slots:
+            return None
+        from_index = slots[self.from_field]
+
+        def transform_values(values, row_ctxt):
+            value = values[from_index]
+            for i in indices:
+                values[i] = value
+            return values
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
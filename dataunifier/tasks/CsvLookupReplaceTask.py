@@ -7,10 +7,12 @@ import os
 
 from dataunifier.common import constants as commonconstants
 from dataunifier.common.exceptions import TransformationException, ConfigException, NoSuchDirectoryException, \
-    NoFileMatchingRegexException
+    NoFileMatchingRegexException, DuplicateKeyException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
-from dataunifier.utils import confighelper, fileio, display
+from dataunifier.utils import confighelper, fileio, display, lookupindex
 from dataunifier.utils.display import ProgressBar
+from dataunifier.utils.lookupregistry import LookupRegistry
 
 K_CSV_LOOKUP_REPLACE = "csv_lookup_replace"
 K_FIELDS = "fields"
@@ -20,6 +22,7 @@ K_LOOKUP_COLUMN = "lookup_column"
 K_VALUE_COLUMN = "value_column"
 K_ON_UNMATCHED = "on_unmatched"
 K_DEDUPLICATE_BY = "deduplicate_by"
+K_INDEX_DIRECTORY = "index_directory"
 
 E_FAIL = "fail"
 E_PASSTHROUGH = "passthrough"
@@ -27,6 +30,8 @@ E_BLANK = "blank"
 E_LOWER_ROW_NUMBER = "lower_row_number"
 E_HIGHER_ROW_NUMBER = "higher_row_number"
 
+_MISSING = object()
+
 
 def _parse_on_unmatched(on_unmatched_ctxt):
     value = on_unmatched_ctxt.value
@@ -94,15 +99,12 @@ def _raise_duplicate_lookup_exception(task_parsing_context, file_path, column_na
     raise ConfigException(msg)
 
 
-def _get_lookup_dict(task_parsing_context, deduplicate_by):
-    task_name = task_parsing_context.task_name
-    lookup_col = confighelper.get_literal(task_parsing_context, K_LOOKUP_COLUMN, True).value
-    value_col = confighelper.get_literal(task_parsing_context, K_VALUE_COLUMN, True).value
-    file_path = _get_lookup_file_path(task_parsing_context)
+def _iterate_lookup_pairs(task_parsing_context, file_path, lookup_col, value_col):
     row_count = fileio.count_rows(file_path)
-    lookup_dict = {}
     with open(file_path, "r", encoding=commonconstants.DEFAULT_ENCODING) as f:
-        display.stdout('Parsing file "%s" for %s task "%s"' % (file_path, K_CSV_LOOKUP_REPLACE, task_name))
+        display.stdout('Parsing file "%s" for %s task "%s"' % (
+            file_path, K_CSV_LOOKUP_REPLACE, task_parsing_context.task_name
+        ))
         progress_bar = ProgressBar(row_count)
         reader = csv.DictReader(f)
         for rowdict in reader:
@@ -110,20 +112,72 @@ def _get_lookup_dict(task_parsing_context, deduplicate_by):
                 _raise_missing_column_exception(task_parsing_context, file_path, lookup_col)
             if value_col not in rowdict:
                 _raise_missing_column_exception(task_parsing_context, file_path, value_col)
-            lookup = rowdict[lookup_col]
-            value = rowdict[value_col]
-            if lookup in lookup_dict:
-                if deduplicate_by is None:
-                    _raise_duplicate_lookup_exception(task_parsing_context, file_path, lookup_col, lookup)
-                elif deduplicate_by == E_HIGHER_ROW_NUMBER:
-                    lookup_dict[lookup] = value
-            else:
-                lookup_dict[lookup] = value
+            yield rowdict[lookup_col], rowdict[value_col]
             progress_bar.increment()
         progress_bar.close()
+
+
+def _get_on_duplicate(deduplicate_by):
+    return {
+        None: None, E_LOWER_ROW_NUMBER: lookupindex.E_KEEP_FIRST, E_HIGHER_ROW_NUMBER: lookupindex.E_KEEP_LAST
+    }[deduplicate_by]
+
+
+def _get_lookup_dict(task_parsing_context, deduplicate_by):
+    lookup_col = confighelper.get_literal(task_parsing_context, K_LOOKUP_COLUMN, True).value
+    value_col = confighelper.get_literal(task_parsing_context, K_VALUE_COLUMN, True).value
+    file_path = _get_lookup_file_path(task_parsing_context)
+    lookup_registry = task_parsing_context.lookup_registry or LookupRegistry()
+    lookup_dict = lookup_registry.request_dict(
+        file_path, lookup_col, value_col, _get_on_duplicate(deduplicate_by),
+        '%s task "%s"' % (K_CSV_LOOKUP_REPLACE, task_parsing_context.task_name),
+        lambda column: _raise_missing_column_exception(task_parsing_context, file_path, column),
+        lambda value: _raise_duplicate_lookup_exception(task_parsing_context, file_path, lookup_col, value)
+    )
+    if task_parsing_context.lookup_registry is None:
+        lookup_registry.load()
     return lookup_dict
 
 
+def _get_index_directory(task_parsing_context):
+    index_dir_ctxt = confighelper.get_literal(task_parsing_context, K_INDEX_DIRECTORY, False)
+    if not index_dir_ctxt:
+        return None
+    return confighelper.handle_placeholder_values_and_clean(index_dir_ctxt, index_dir_ctxt.value)
+
+
+def _get_lookup_index(task_parsing_context, deduplicate_by, index_dir):
+    lookup_col = confighelper.get_literal(task_parsing_context, K_LOOKUP_COLUMN, True).value
+    value_col = confighelper.get_literal(task_parsing_context, K_VALUE_COLUMN, True).value
+    file_path = _get_lookup_file_path(task_parsing_context)
+    on_duplicate = _get_on_duplicate(deduplicate_by)
+    index_file_path = lookupindex.get_index_file_path(index_dir, file_path, lookup_col, value_col, on_duplicate)
+    indexed_fingerprint = lookupindex.get_source_fingerprint(index_file_path)
+    fingerprint = fileio.get_file_fingerprint(file_path, indexed_fingerprint)
+    if indexed_fingerprint is not None and fingerprint[2] == indexed_fingerprint[2]:
+        display.stdout('Using index "%s" of file "%s" for %s task "%s"' % (
+            index_file_path, file_path, K_CSV_LOOKUP_REPLACE, task_parsing_context.task_name
+        ))
+        return lookupindex.LookupIndex(index_file_path)
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        lookupindex.build(
+            index_file_path,
+            _iterate_lookup_pairs(task_parsing_context, file_path, lookup_col, value_col),
+            fingerprint,
+            on_duplicate
+        )
+    except DuplicateKeyException as e:
+        _raise_duplicate_lookup_exception(task_parsing_context, file_path, lookup_col, e.key)
+    except OSError as e:
+        msg = 'Could not write index for file "%s" to directory "%s" for %s task "%s": %s (File "%s")' % (
+            file_path, index_dir, K_CSV_LOOKUP_REPLACE, task_parsing_context.task_name, e,
+            task_parsing_context.current_file
+        )
+        raise ConfigException(msg)
+    return lookupindex.LookupIndex(index_file_path)
+
+
 def _validate_field_mapping(task, previous_task, current_file):
     if not (previous_task and previous_task.get_resulting_fields()):
         return
@@ -151,7 +205,8 @@ class CsvLookupReplaceTask(AbstractRegularTask):
     @classmethod
     def create_from_config(cls, task_parsing_context):
         valid_keys = {
-            K_FIELDS, K_DIRECTORY, K_FILENAME_REGEX, K_LOOKUP_COLUMN, K_VALUE_COLUMN, K_ON_UNMATCHED, K_DEDUPLICATE_BY
+            K_FIELDS, K_DIRECTORY, K_FILENAME_REGEX, K_LOOKUP_COLUMN, K_VALUE_COLUMN, K_ON_UNMATCHED, K_DEDUPLICATE_BY,
+            K_INDEX_DIRECTORY
         }
         confighelper.check_invalid_keys(task_parsing_context, valid_keys)
         name = task_parsing_context.task_name
@@ -161,7 +216,11 @@ class CsvLookupReplaceTask(AbstractRegularTask):
         fields_ctxt = confighelper.get_literal_list(task_parsing_context, K_FIELDS, True)
         fields = [ctxt.value for ctxt in fields_ctxt.value]
         deduplicate_by = _get_deduplicate_by(task_parsing_context)
-        lookup_dict = _get_lookup_dict(task_parsing_context, deduplicate_by)
+        index_dir = _get_index_directory(task_parsing_context)
+        if index_dir is None:
+            lookup_dict = _get_lookup_dict(task_parsing_context, deduplicate_by)
+        else:
+            lookup_dict = _get_lookup_index(task_parsing_context, deduplicate_by, index_dir)
         on_unmatched = _parse_on_unmatched(confighelper.get_literal(task_parsing_context, K_ON_UNMATCHED, True))
         task = CsvLookupReplaceTask(name, when, resulting_fields, fields, lookup_dict, on_unmatched)
         _validate_field_mapping(task, previous_task, task_parsing_context.current_file)
@@ -204,14 +263,19 @@ class CsvLookupReplaceTask(AbstractRegularTask):
     def __repr__(self):
         return str(self)
 
+    @staticmethod
+    def __fail(field, value):
+        raise TransformationException('Encountered unrecognised value in field "%s": "%s"' % (field, value))
+
     def __transform_individual(self, value):
-        if value not in self.lookup_dict:
+        replacement = self.lookup_dict.get(value, _MISSING)
+        if replacement is _MISSING:
             if self.on_unmatched == E_BLANK:
                 return ""
             if self.on_unmatched == E_PASSTHROUGH:
                 return value
             raise ValueError()
-        return self.lookup_dict[value]
+        return replacement
 
     def transform(self, row_ctxt):
         if self.when and not self.when.evaluate(row_ctxt):
@@ -224,10 +288,24 @@ class CsvLookupReplaceTask(AbstractRegularTask):
             try:
                 output[field] = self.__transform_individual(rowdict[field])
             except ValueError:
-                raise TransformationException('Encountered unrecognised value in field "%s": "%s"' % (
-                    field, rowdict[field]
-                ))
+                self.__fail(field, rowdict[field])
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        indices = positional.get_indices(self.fields, slots)
+        if indices is None:
+            return None
+        field_indices = list(zip(dict.fromkeys(self.fields), indices))
+
+        def transform_values(values, row_ctxt):
+            for field, i in field_indices:
+                try:
+                    values[i] = self.__transform_individual(values[i])
+                except ValueError:
+                    self.__fail(field, values[i])
+            return values
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
@@ -2,15 +2,14 @@
 CsvMatchTask module.
 """
 
-import csv
 import os
 
-from dataunifier.common import constants as commonconstants
 from dataunifier.common.exceptions import TransformationException, ConfigException, NoSuchDirectoryException, \
     NoFileMatchingRegexException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
-from dataunifier.utils import confighelper, fileio, display
-from dataunifier.utils.display import ProgressBar
+from dataunifier.utils import confighelper, fileio
+from dataunifier.utils.lookupregistry import LookupRegistry
 
 K_CSV_MATCH = "csv_match"
 K_FIELDS = "fields"
@@ -47,26 +46,23 @@ def _get_lookup_file_path(task_parsing_context):
         raise ConfigException(msg)
 
 
+def _raise_missing_column_exception(task_parsing_context, file_path, column_name):
+    msg = 'File "%s" does not contain lookup column "%s", required by %s task %s. (File "%s")' % (
+        file_path, column_name, K_CSV_MATCH, task_parsing_context.task_name, task_parsing_context.current_file
+    )
+    raise ConfigException(msg)
+
+
 def _get_lookup_set(task_parsing_context):
-    task_name = task_parsing_context.task_name
     lookup_column = confighelper.get_literal(task_parsing_context, K_LOOKUP_COLUMN, True).value
     file_path = _get_lookup_file_path(task_parsing_context)
-    row_count = fileio.count_rows(file_path)
-    lookup_set = set()
-    with open(file_path, "r", encoding=commonconstants.DEFAULT_ENCODING) as f:
-        display.stdout('Parsing file "%s" for %s task "%s"' % (file_path, K_CSV_MATCH, task_name))
-        progress_bar = ProgressBar(row_count)
-        reader = csv.DictReader(f)
-        for rowdict in reader:
-            if lookup_column not in rowdict:
-                msg = 'File "%s" does not contain lookup column "%s", required by %s task %s. (File "%s")' % (
-                    file_path, lookup_column, K_CSV_MATCH, task_parsing_context.task_name,
-                    task_parsing_context.current_file
-                )
-                raise ConfigException(msg)
-            lookup_set.add(rowdict[lookup_column])
-            progress_bar.increment()
-        progress_bar.close()
+    lookup_registry = task_parsing_context.lookup_registry or LookupRegistry()
+    lookup_set = lookup_registry.request_set(
+        file_path, lookup_column, '%s task "%s"' % (K_CSV_MATCH, task_parsing_context.task_name),
+        lambda column: _raise_missing_column_exception(task_parsing_context, file_path, column)
+    )
+    if task_parsing_context.lookup_registry is None:
+        lookup_registry.load()
     return lookup_set
 
 
@@ -158,5 +154,20 @@ class CsvMatchTask(AbstractRegularTask):
             output[field] = self.match_value if value in self.lookup_set else self.unmatch_value
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        indices = positional.get_indices(self.fields, slots)
+        if indices is None:
+            return None
+        lookup_set = self.lookup_set
+        match_value = self.match_value
+        unmatch_value = self.unmatch_value
+
+        def transform_values(values, row_ctxt):
+            for i in indices:
+                values[i] = match_value if values[i] in lookup_set else unmatch_value
+            return values
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
@@ -87,5 +87,11 @@ class DiscardFieldsTask(AbstractRegularTask):
         output = {k: v for k, v in rowdict.items() if k not in self.field_set}
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        if slots is None:
+            return None
+        indices = [i for field, i in slots.items() if field not in self.field_set]
+        return lambda values, row_ctxt: [values[i] for i in indices]
+
     def get_resulting_fields(self):
         return self.resulting_fields
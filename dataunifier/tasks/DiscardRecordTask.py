@@ -3,6 +3,7 @@ DiscardRecordTask module.
 """
 
 from dataunifier.common.exceptions import DiscardRecordException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 
 
@@ -58,5 +59,14 @@ class DiscardRecordTask(AbstractRegularTask):
             raise DiscardRecordException()
         return row_ctxt
 
+    def compile(self, slots):
+        if slots is None:
+            return None
+
+        def transform_values(values, row_ctxt):
+            raise DiscardRecordException()
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
@@ -3,10 +3,16 @@ FuzzyMatchReplaceTask module.
 """
 
 import abc
+import math
+from collections import Counter
 
 from dataunifier.common.exceptions import TransformationException, ConfigException
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 from dataunifier.utils import confighelper
+from dataunifier.utils.fuzzyindex import JaccardIndex, JaccardMatrix, LevenshteinIndex, CosineIndex, \
+    get_edit_distance, get_edit_score
+from dataunifier.utils.lrucache import LruCache
+from dataunifier.utils.workerpool import WorkerPool
 
 K_FUZZY_MATCH_REPLACE = "fuzzy_match_replace"
 K_FIELDS = "fields"
@@ -17,8 +23,12 @@ K_ON_UNMATCHED = "on_unmatched"
 K_STRING = "string"
 K_REPLACEMENT = "replacement"
 K_NGRAM_SIZE = "ngram_size"
+K_CACHE_SIZE = "cache_size"
+K_PROCESSES = "processes"
 
 E_JACCARD = "jaccard"
+E_LEVENSHTEIN = "levenshtein"
+E_TFIDF = "tfidf"
 
 E_FAIL = "fail"
 E_PASSTHROUGH = "passthrough"
@@ -26,6 +36,11 @@ E_BLANK = "blank"
 
 DEFAULT_NGRAM_SIZE = 3
 DEFAULT_MINIMUM_SCORE = 0.0
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_PROCESSES = 1
+
+# The number of rules from which values are matched in chunks, with NumPy, if it is installed.
+MATRIX_RULE_COUNT = 2000
 
 
 class AbstractRule(abc.ABC):
@@ -110,10 +125,132 @@ class JaccardRule(AbstractRule):
         return intersection / union
 
 
+class LevenshteinRule(AbstractRule):
+    """
+    A matching rule that uses the Levenshtein (edit) distance for matching strings.
+
+    The score is 1 minus the number of characters to insert, delete or substitute to turn one string into the other,
+    divided by the length of the longer string.
+    """
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+        if not isinstance(other, type(self)):
+            return False
+        return all([
+            self.string == other.string,
+            self.replacement == other.replacement
+        ])
+
+    def evaluate(self, string):
+        return get_edit_score(get_edit_distance(string, self.string), len(string), len(self.string))
+
+
+def _get_ngram_list(string, ngram_size):
+    if len(string) <= ngram_size:
+        return [string]
+    return [string[i:i + ngram_size] for i in range(len(string) - ngram_size + 1)]
+
+
+class IdfTable:
+    """
+    The inverse document frequency (IDF) of each n-gram across the strings of a list of rules, which is higher the
+    fewer strings contain the n-gram.
+    """
+
+    def __init__(self, ngram_lists):
+        """
+        Create an :code:`IdfTable` object.
+
+        :param list[list[str]] ngram_lists: The n-grams of each string.
+        """
+
+        self.document_count = len(ngram_lists)
+        counts = Counter([ngram for ngrams in ngram_lists for ngram in set(ngrams)])
+        self.weights = {ngram: self.__weigh(count) for ngram, count in counts.items()}
+        self.unseen_weight = self.__weigh(0)
+
+    def __weigh(self, count):
+        return math.log((1 + self.document_count) / (1 + count)) + 1
+
+    def get(self, ngram):
+        """
+        Get the IDF of an n-gram.
+
+        :param str ngram: The n-gram.
+        :return: The IDF, which is the highest possible if no string contains the n-gram.
+        :rtype: float
+        """
+
+        return self.weights.get(ngram, self.unseen_weight)
+
+
+class TfidfRule(AbstractRule):
+    """
+    A matching rule that uses the cosine similarity of TF-IDF vectors for matching strings.
+
+    The TF-IDF method works as such:
+    1. Break each string into n-grams of characters, and weigh each n-gram by the number of times it occurs in the
+       string (TF), times its IDF across the strings of all rules, so that n-grams common to many rules count less
+    2. The similarity score is the cosine of the angle between the vectors of weights of both strings.
+    """
+
+    def __init__(self, string, replacement, ngram_size, idf_table):
+        """
+        Create a :code:`TfidfRule`.
+
+        :param str string: The string to match against.
+        :param str replacement: The replacement string.
+        :param int ngram_size: The size of the n-grams to break the string into.
+        :param IdfTable idf_table: The IDF of each n-gram across the strings of all rules of the task.
+        """
+
+        super(TfidfRule, self).__init__(string, replacement)
+        self.ngram_size = ngram_size
+        self.idf_table = idf_table
+        self.weights = self.vectorise(string)
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+        if not isinstance(other, type(self)):
+            return False
+        return all([
+            self.string == other.string,
+            self.replacement == other.replacement,
+            self.ngram_size == other.ngram_size
+        ])
+
+    def vectorise(self, string):
+        """
+        Turn a string into its normalised vector of TF-IDF weights.
+
+        :param str string: The string to turn into a vector.
+        :return: The weight of each n-gram of the string.
+        :rtype: dict[str, float]
+        """
+
+        weights = {
+            ngram: count * self.idf_table.get(ngram)
+            for ngram, count in Counter(_get_ngram_list(string, self.ngram_size)).items()
+        }
+        norm = math.sqrt(sum([weight * weight for weight in weights.values()]))
+        return {ngram: weight / norm for ngram, weight in weights.items()}
+
+    def evaluate(self, string):
+        score = 0.0
+        for ngram, weight in self.vectorise(string).items():
+            rule_weight = self.weights.get(ngram)
+            if rule_weight is not None:
+                score += weight * rule_weight
+        return score
+
+
 def _get_method(task_parsing_context):
     method_ctxt = confighelper.get_literal(task_parsing_context, K_METHOD, False)
     method = method_ctxt.value if method_ctxt else E_JACCARD
-    accepted_values = [E_JACCARD]
+    accepted_values = [E_JACCARD, E_LEVENSHTEIN, E_TFIDF]
     if method not in accepted_values:
         raise ConfigException('Invalid value for key "%s": "%s". Accepted values are: "%s". (File "%s")' % (
             method_ctxt.key_path, method, '", "'.join(accepted_values), method_ctxt.current_file
@@ -121,7 +258,16 @@ def _get_method(task_parsing_context):
     return method
 
 
-def _get_rules(task_parsing_context, method):  # pylint: disable=unused-argument
+def _create_rules(pairs, method, ngram_size):
+    if method == E_LEVENSHTEIN:
+        return [LevenshteinRule(string, replacement) for string, replacement in pairs]
+    if method == E_TFIDF:
+        idf_table = IdfTable([_get_ngram_list(string, ngram_size) for string, _ in pairs])
+        return [TfidfRule(string, replacement, ngram_size, idf_table) for string, replacement in pairs]
+    return [JaccardRule(string, replacement, ngram_size) for string, replacement in pairs]
+
+
+def _get_rules(task_parsing_context, method):
     rules_ctxt = confighelper.get_dict_list(task_parsing_context, K_RULES, True)
     ngram_size_ctxt = confighelper.get_literal(task_parsing_context, K_NGRAM_SIZE, False)
     ngram_size_str = ngram_size_ctxt.value if ngram_size_ctxt else DEFAULT_NGRAM_SIZE
@@ -129,14 +275,14 @@ def _get_rules(task_parsing_context, method):  # pylint: disable=unused-argument
         ngram_size = int(ngram_size_str)
         if ngram_size < 1:
             raise ValueError
-        rules = []
+        pairs = []
         for rule_ctxt in rules_ctxt.value:
             string_ctxt = confighelper.get_literal_list(rule_ctxt, K_STRING, True)
             string_list = [ctxt.value for ctxt in string_ctxt.value]
             replacement = confighelper.get_literal(rule_ctxt, K_REPLACEMENT, True).value
             for string in string_list:
-                rules.append(JaccardRule(string, replacement, ngram_size))
-        return rules
+                pairs.append((string, replacement))
+        return _create_rules(pairs, method, ngram_size)
     except ValueError:
         raise ConfigException('Invalid %s: "%s". Must be an integer more than 0. (File "%s", Task "%s")' % (
             K_NGRAM_SIZE, ngram_size_str, ngram_size_ctxt.current_file, task_parsing_context.task_name
@@ -149,6 +295,36 @@ def _get_minimum_score(task_parsing_context):
     return minimum_score
 
 
+def _get_cache_size(task_parsing_context):
+    cache_size_ctxt = confighelper.get_literal(task_parsing_context, K_CACHE_SIZE, False)
+    if cache_size_ctxt is None:
+        return DEFAULT_CACHE_SIZE
+    try:
+        cache_size = int(cache_size_ctxt.value)
+        if cache_size < 0:
+            raise ValueError
+        return cache_size
+    except ValueError:
+        raise ConfigException('Invalid %s: "%s". Must be an integer not less than 0. (File "%s", Task "%s")' % (
+            K_CACHE_SIZE, cache_size_ctxt.value, cache_size_ctxt.current_file, task_parsing_context.task_name
+        ))
+
+
+def _get_processes(task_parsing_context):
+    processes_ctxt = confighelper.get_literal(task_parsing_context, K_PROCESSES, False)
+    if processes_ctxt is None:
+        return DEFAULT_PROCESSES
+    try:
+        processes = int(processes_ctxt.value)
+        if processes < 1:
+            raise ValueError
+        return processes
+    except ValueError:
+        raise ConfigException('Invalid %s: "%s". Must be an integer more than 0. (File "%s", Task "%s")' % (
+            K_PROCESSES, processes_ctxt.value, processes_ctxt.current_file, task_parsing_context.task_name
+        ))
+
+
 def _get_on_unmatched(task_parsing_ctxt):
     on_unmatched_ctxt = confighelper.get_literal(task_parsing_ctxt, K_ON_UNMATCHED, True)
     value = on_unmatched_ctxt.value
@@ -174,12 +350,27 @@ def _validate_field_mapping(task, previous_task, current_file):
             raise ConfigException(msg)
 
 
+# The task whose values a worker process matches.
+_worker_task = None
+
+
+def _set_worker_task(task):
+    global _worker_task  # pylint: disable=global-statement
+    _worker_task = task
+
+
+def _match_in_worker(values):
+    return _worker_task.match_values(values)
+
+
 class FuzzyMatchReplaceTask(AbstractRegularTask):
     """
     Task that replaces field values by evaluating how similar the value is to a predefined set of strings.
     """
 
     E_JACCARD = E_JACCARD
+    E_LEVENSHTEIN = E_LEVENSHTEIN
+    E_TFIDF = E_TFIDF
     E_FAIL = E_FAIL
     E_BLANK = E_BLANK
     E_PASSTHROUGH = E_PASSTHROUGH
@@ -189,7 +380,9 @@ class FuzzyMatchReplaceTask(AbstractRegularTask):
 
     @classmethod
     def create_from_config(cls, task_parsing_context):
-        valid_keys = {K_FIELDS, K_METHOD, K_RULES, K_MINIMUM_SCORE, K_ON_UNMATCHED, K_NGRAM_SIZE}
+        valid_keys = {
+            K_FIELDS, K_METHOD, K_RULES, K_MINIMUM_SCORE, K_ON_UNMATCHED, K_NGRAM_SIZE, K_CACHE_SIZE, K_PROCESSES
+        }
         confighelper.check_invalid_keys(task_parsing_context, valid_keys)
         name = task_parsing_context.task_name
         when = task_parsing_context.when
@@ -201,7 +394,11 @@ class FuzzyMatchReplaceTask(AbstractRegularTask):
         rules = _get_rules(task_parsing_context, method)
         minimum_score = _get_minimum_score(task_parsing_context)
         on_unmatched = _get_on_unmatched(task_parsing_context)
-        task = FuzzyMatchReplaceTask(name, when, resulting_fields, fields, method, rules, minimum_score, on_unmatched)
+        cache_size = _get_cache_size(task_parsing_context)
+        processes = _get_processes(task_parsing_context)
+        task = FuzzyMatchReplaceTask(
+            name, when, resulting_fields, fields, method, rules, minimum_score, on_unmatched, cache_size, processes
+        )
         _validate_field_mapping(task, previous_task, task_parsing_context.current_file)
         return task
 
@@ -213,7 +410,8 @@ class FuzzyMatchReplaceTask(AbstractRegularTask):
     def is_conditional(cls):
         return True
 
-    def __init__(self, name, when, resulting_fields, fields, method, rules, minimum_score, on_unmatched):
+    def __init__(self, name, when, resulting_fields, fields, method, rules, minimum_score, on_unmatched,
+                 cache_size=DEFAULT_CACHE_SIZE, processes=DEFAULT_PROCESSES):
         super(FuzzyMatchReplaceTask, self).__init__(name, when)
         self.resulting_fields = resulting_fields
         self.fields = fields
@@ -221,6 +419,12 @@ class FuzzyMatchReplaceTask(AbstractRegularTask):
         self.rules = rules
         self.minimum_score = minimum_score
         self.on_unmatched = on_unmatched
+        self.index = self.__build_index(method, rules)
+        self.cache = LruCache(cache_size)
+        self.matrix = self.__build_matrix(rules, self.index, cache_size)
+        self.processes = processes
+        # The results from the worker processes are handed to transform through the cache, so there must be one.
+        self.pool = WorkerPool(processes) if processes > 1 and cache_size > 0 else None
 
     def __eq__(self, other):
         if other is None:
@@ -235,18 +439,69 @@ class FuzzyMatchReplaceTask(AbstractRegularTask):
             self.method == other.method,
             self.rules == other.rules,
             self.minimum_score == other.minimum_score,
-            self.on_unmatched == other.on_unmatched
+            self.on_unmatched == other.on_unmatched,
+            self.cache.capacity == other.cache.capacity,
+            self.processes == other.processes
         ])
 
-    def __find_most_matching_rule(self, value):
-        most_matching_rule = None
+    @staticmethod
+    def __build_index(method, rules):
+        # Built when the configuration is loaded. Only rules of the same kind, and with the same n-gram size (and IDF
+        # table), can share an index.
+        if not rules:
+            return None
+        if method == E_JACCARD and all([isinstance(rule, JaccardRule) for rule in rules]) \
+                and len({rule.ngram_size for rule in rules}) == 1:
+            return JaccardIndex([rule.ngrams for rule in rules])
+        if method == E_LEVENSHTEIN and all([isinstance(rule, LevenshteinRule) for rule in rules]):
+            return LevenshteinIndex([rule.string for rule in rules])
+        if method == E_TFIDF and all([isinstance(rule, TfidfRule) for rule in rules]) \
+                and len({(rule.ngram_size, id(rule.idf_table)) for rule in rules}) == 1:
+            return CosineIndex([rule.weights for rule in rules])
+        return None
+
+    def __get_query(self, value):
+        # What the index is searched with.
+        if self.method == E_JACCARD:
+            return self.rules[0].ngramify(value)
+        if self.method == E_TFIDF:
+            return self.rules[0].vectorise(value)
+        return value
+
+    @staticmethod
+    def __build_matrix(rules, index, cache_size):
+        # The results for a chunk are handed to transform through the cache, so there must be one. Otherwise, or if
+        # NumPy is not installed, values are matched one at a time through the index.
+        if not isinstance(index, JaccardIndex) or len(rules) < MATRIX_RULE_COUNT or cache_size == 0:
+            return None
+        try:
+            return JaccardMatrix([rule.ngrams for rule in rules])
+        except ImportError:
+            return None
+
+    def __find_most_matching_rule_id(self, value):
+        if self.index is not None:
+            return self.index.find(self.__get_query(value), self.minimum_score)
+        most_matching_rule_id = None
         highest_score = 0.0
-        for rule in self.rules:
+        for i, rule in enumerate(self.rules):
             score = rule.evaluate(value)
             if score > highest_score:
                 highest_score = score
-                most_matching_rule = rule
-        return most_matching_rule, highest_score
+                most_matching_rule_id = i
+        return most_matching_rule_id, highest_score
+
+    def __find_most_matching_rule(self, value):
+        i, score = self.__find_most_matching_rule_id(value)
+        return (None, score) if i is None else (self.rules[i], score)
+
+    def __find_most_matching_rule_cached(self, value):
+        # Fuzzy matched fields tend to have few distinct values, so most values have been matched before.
+        result = self.cache.get(value)
+        if result is LruCache.MISSING:
+            result = self.__find_most_matching_rule(value)
+            self.cache.put(value, result)
+        return result
 
     def transform(self, row_ctxt):
         if self.when and not self.when.evaluate(row_ctxt):
@@ -257,7 +512,7 @@ class FuzzyMatchReplaceTask(AbstractRegularTask):
             if field not in rowdict:
                 raise TransformationException('Could not find field "%s".' % field)
             value = rowdict[field]
-            most_matching_rule, highest_score = self.__find_most_matching_rule(value)
+            most_matching_rule, highest_score = self.__find_most_matching_rule_cached(value)
             if most_matching_rule is None or highest_score < self.minimum_score:
                 if self.on_unmatched == E_FAIL:
                     raise TransformationException(
@@ -269,5 +524,50 @@ class FuzzyMatchReplaceTask(AbstractRegularTask):
                 output[field] = most_matching_rule.replacement
         return row_ctxt.with_updated_rowdict(output)
 
+    def match_values(self, values):
+        """
+        Find the most matching rule for each of a list of values, without using the cache.
+
+        :param list[str] values: The values.
+        :return: For each value, the position of the first rule with the highest score, and the score, or None and 0.0
+                 if no rule has a score above 0. Rules that cannot reach the minimum score may be ignored.
+        :rtype: list[(Optional[int], float)]
+        """
+
+        if self.matrix is not None:
+            return self.matrix.find_all([self.rules[0].ngramify(value) for value in values], self.minimum_score)
+        return [self.__find_most_matching_rule_id(value) for value in values]
+
+    def is_chunked(self):
+        return self.matrix is not None or self.pool is not None
+
+    def prepare(self, rows, slots):
+        if slots is None:
+            values = [row[field] for row in rows for field in self.fields if field in row]
+        else:
+            positions = [slots[field] for field in self.fields if field in slots]
+            values = [row[i] for row in rows for i in positions]
+        # Values that do not fit in the cache would be matched again anyway.
+        new_values = [value for value in dict.fromkeys(values) if value not in self.cache][:self.cache.capacity]
+        if self.pool is not None and len(new_values) > 1:
+            results = self.pool.map_slices(_match_in_worker, new_values, _set_worker_task, (self,))
+        else:
+            results = self.match_values(new_values)
+        for value, (i, score) in zip(new_values, results):
+            self.cache.put(value, (None, score) if i is None else (self.rules[i], score))
+
     def get_resulting_fields(self):
         return self.resulting_fields
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+    def get_summary(self):
+        lookups = self.cache.hits + self.cache.misses
+        if not lookups:
+            return []
+        return ['%s task "%s": %d of %d values found in cache (%.1f%%, cache size %d).' % (
+            K_FUZZY_MATCH_REPLACE, self.name, self.cache.hits, lookups, 100.0 * self.cache.hits / lookups,
+            self.cache.capacity
+        )]
@@ -3,6 +3,7 @@ LowercaseTask module.
 """
 
 from dataunifier.common.exceptions import ConfigException, TransformationException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 from dataunifier.utils import confighelper
 
@@ -88,5 +89,17 @@ class LowercaseTask(AbstractRegularTask):
             output[field] = rowdict[field].lower()
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        indices = positional.get_indices(self.fields, slots)
+        if indices is None:
+            return None
+
+        def transform_values(values, row_ctxt):
+            for i in indices:
+                values[i] = values[i].lower()
+            return values
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
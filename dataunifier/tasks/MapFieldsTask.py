@@ -146,6 +146,8 @@ class MapFieldsTask(AbstractRegularTask):
         super(MapFieldsTask, self).__init__(name, None)
         self.fields = fields
         self.resulting_fields = [field.target_field for field in self.fields]
+        self.ignore_case = any([field.ignore_case for field in self.fields])
+        self.__projection = None
 
     def __str__(self):
         return "MapFieldsTask(%s, %s, %s)" % (
@@ -157,32 +159,64 @@ class MapFieldsTask(AbstractRegularTask):
     def __repr__(self):
         return str(self)
 
-    def transform(self, row_ctxt):
-        if self.when and not self.when.evaluate(row_ctxt):
-            return row_ctxt
-        rowdict = row_ctxt.rowdict
-        rowdict_ignore_case = {k.lower(): v for k, v in rowdict.items()}
-        output = {}
+    def __resolve(self, header):
+        # Returns the source field of each resulting field, in order, or None for a field that is not mapped.
+        header_ignore_case = {k.lower(): k for k in header} if self.ignore_case else None
+        header_set = set(header)
+        sources = []
         for field in self.fields:
-            value = ""
+            source = None
             mapped = None
-            rowdict_to_use = rowdict_ignore_case if field.ignore_case else rowdict
+            header_to_use = header_ignore_case if field.ignore_case else header_set
             for src_field in field.src_fields:
-                if src_field in rowdict_to_use:
+                if src_field in header_to_use:
                     if mapped:
                         msg = 'Fields "%s" and "%s" both exist and are mapped to the same target field "%s"' % (
                             mapped, src_field, field.target_field
                         )
                         raise TransformationException(msg)
-                    value = rowdict_to_use[src_field]
+                    source = header_ignore_case[src_field] if field.ignore_case else src_field
                     mapped = src_field
             if not mapped and field.mandatory:
                 msg = 'Could not find any fields to map to target field "%s". Expected source fields: "%s"' % (
                     field.target_field, '", "'.join(field.src_fields)
                 )
                 raise TransformationException(msg)
-            output[field.target_field] = value
-        return row_ctxt.with_updated_rowdict(output)
+            sources.append(source)
+        return sources
+
+    def __get_projection(self, rowdict):
+        # The fields of an input file are the same for each of its rows, so they are only resolved when they change.
+        header = tuple(rowdict)
+        if self.__projection is None or self.__projection[0] != header:
+            try:
+                self.__projection = (header, self.__resolve(header), None)
+            except TransformationException as e:
+                self.__projection = (header, None, e.message)
+        _, sources, message = self.__projection
+        if message is not None:
+            raise TransformationException(message)
+        return sources
+
+    def __map(self, rowdict):
+        # Returns the values of the resulting fields, in order.
+        return ["" if source is None else rowdict[source] for source in self.__get_projection(rowdict)]
+
+    def transform(self, row_ctxt):
+        if self.when and not self.when.evaluate(row_ctxt):
+            return row_ctxt
+        return row_ctxt.with_updated_rowdict(dict(zip(self.resulting_fields, self.__map(row_ctxt.rowdict))))
+
+    def compile(self, slots):
+        if slots is None:
+            return lambda rowdict, row_ctxt: self.__map(rowdict)
+        try:
+            sources = self.__resolve(list(slots))
+        except TransformationException:
+            # Every row would fail, which is left to transform.
+            return None
+        indices = [None if source is None else slots[source] for source in sources]
+        return lambda values, row_ctxt: ["" if i is None else values[i] for i in indices]
 
     def get_resulting_fields(self):
         return self.resulting_fields
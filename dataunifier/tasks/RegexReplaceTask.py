@@ -7,6 +7,7 @@ import re
 from dataunifier.common.exceptions import ConfigException, TransformationException
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 from dataunifier.utils import confighelper
+from dataunifier.utils.regex import is_combinable, CombinedSearch
 
 K_REGEX_REPLACE = "regex_replace"
 K_FIELDS = "fields"
@@ -105,6 +106,33 @@ def _validate_field_mapping(task, previous_task, current_file):
             raise ConfigException(msg)
 
 
+def _get_search(candidates):
+    # A single candidate, or candidates that cannot be combined, are searched one by one.
+    if len(candidates) > 1:
+        try:
+            return [(CombinedSearch([pattern for _, pattern in candidates]), candidates)]
+        except re.error:
+            pass
+    return [(None, [candidate]) for candidate in candidates]
+
+
+def _get_searches(rules):
+    # Each run of combinable patterns, in rule order, is searched for at once. Every other pattern is searched for
+    # alone.
+    output = []
+    candidates = []
+    for rule in rules:
+        for pattern in rule.pattern_list:
+            if is_combinable(pattern):
+                candidates.append((rule, pattern))
+                continue
+            output.extend(_get_search(candidates))
+            output.append((None, [(rule, pattern)]))
+            candidates = []
+    output.extend(_get_search(candidates))
+    return output
+
+
 class RegexReplaceTask(AbstractRegularTask):
     """
     Task that replaces field values using regular expressions.
@@ -149,6 +177,7 @@ class RegexReplaceTask(AbstractRegularTask):
         self.allow_blank = allow_blank
         self.rules = rules
         self.rules_file = rules_file
+        self.searches = _get_searches(rules)
         super(RegexReplaceTask, self).__init__(name, when)
 
     def __str__(self):
@@ -177,10 +206,17 @@ class RegexReplaceTask(AbstractRegularTask):
         ])
 
     def __transform_individual(self, value):
-        for rule in self.rules:
-            for pattern in rule.pattern_list:
+        # Equivalent to searching for each pattern of each rule in turn, and substituting with the first one found.
+        for combined, candidates in self.searches:
+            if combined is None:
+                rule, pattern = candidates[0]
                 if pattern.search(value):
                     return pattern.sub(rule.replacement, value)
+                continue
+            found = combined.find(value)
+            if found is not None:
+                rule, pattern = candidates[found]
+                return pattern.sub(rule.replacement, value)
         raise ValueError()
 
     def transform(self, row_ctxt):
@@ -3,6 +3,7 @@ ReplaceTask module.
 """
 
 from dataunifier.common.exceptions import TransformationException, ConfigException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 from dataunifier.utils import confighelper
 
@@ -17,6 +18,11 @@ E_FAIL = "fail"
 E_PASSTHROUGH = "passthrough"
 E_BLANK = "blank"
 
+C_UPPER = "upper"
+C_LOWER = "lower"
+
+_CASE_CONVERSIONS = {None: None, C_UPPER: str.upper, C_LOWER: str.lower}
+
 
 class ReplaceRule:
     """
@@ -138,7 +144,23 @@ class ReplaceTask(AbstractRegularTask):
     def is_conditional(cls):
         return True
 
-    def __init__(self, name, when, resulting_fields, fields, on_unmatched, allow_blank, rules, rules_file):
+    def __init__(self, name, when, resulting_fields, fields, on_unmatched, allow_blank, rules, rules_file, case=None):
+        """
+        Create a :code:`ReplaceTask` object.
+
+        :param str name: The name of the task.
+        :param AbstractWhen when: The "when" object for the task.
+        :param list[str] resulting_fields: The resulting fields of the previous task.
+        :param list[str] fields: The fields to replace values in.
+        :param str on_unmatched: What to do with values not matched by any rule.
+        :param bool allow_blank: Whether to leave blank values as they are.
+        :param list[ReplaceRule] rules: The replacement rules.
+        :param str rules_file: The file the rules are in, for error messages.
+        :param Optional[str] case: :code:`C_UPPER` or :code:`C_LOWER` to convert values to upper or lower case
+                                   before replacing them, as if by a preceding :code:`uppercase` or :code:`lowercase`
+                                   task. Not configurable; used by the pipeline optimiser.
+        """
+
         super(ReplaceTask, self).__init__(name, when)
         self.resulting_fields = resulting_fields
         self.fields = fields
@@ -146,6 +168,8 @@ class ReplaceTask(AbstractRegularTask):
         self.allow_blank = allow_blank
         self.d = _create_dict_from_rules(rules)
         self.rules_file = rules_file
+        self.case = case
+        self.convert_case = _CASE_CONVERSIONS[case]
 
     def __eq__(self, other):
         if other is None:
@@ -160,16 +184,23 @@ class ReplaceTask(AbstractRegularTask):
             self.on_unmatched == other.on_unmatched,
             self.allow_blank == other.allow_blank,
             self.d == other.d,
-            self.rules_file == other.rules_file
+            self.rules_file == other.rules_file,
+            self.case == other.case
         ])
 
     def __str__(self):
         return f"ReplaceTask({self.name}, {self.when}, {self.resulting_fields}, {self.fields}, " \
-               f"{self.on_unmatched}, {self.allow_blank}, {self.d}, {self.rules_file})"
+               f"{self.on_unmatched}, {self.allow_blank}, {self.d}, {self.rules_file}, {self.case})"
 
     def __repr__(self):
         return str(self)
 
+    def __fail(self, field, value):
+        msg = 'Encountered unrecognised value in field "%s": "%s". (Rules in file "%s")' % (
+            field, value, self.rules_file
+        )
+        raise TransformationException(msg)
+
     def __transform_individual(self, value):
         if value in self.d:
             return self.d[value]
@@ -183,18 +214,46 @@ class ReplaceTask(AbstractRegularTask):
         for field in self.fields:
             if field not in rowdict:
                 raise TransformationException(f'Could not find field "{field}".')
-            if not(self.allow_blank and not rowdict[field]):
+            value = rowdict[field]
+            if self.convert_case is not None:
+                value = output[field] = self.convert_case(value)
+            if not(self.allow_blank and not value):
                 try:
-                    output[field] = self.__transform_individual(rowdict[field])
+                    output[field] = self.__transform_individual(value)
                 except ValueError:
                     if self.on_unmatched == E_FAIL:
-                        msg = 'Encountered unrecognised value in field "%s": "%s". (Rules in file "%s")' % (
-                            field, rowdict[field], self.rules_file
-                        )
-                        raise TransformationException(msg)
+                        self.__fail(field, value)
                     if self.on_unmatched == E_BLANK:
                         output[field] = ""
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        indices = positional.get_indices(self.fields, slots)
+        if indices is None:
+            return None
+        field_indices = list(zip(dict.fromkeys(self.fields), indices))
+        d = self.d
+        convert_case = self.convert_case
+        allow_blank = self.allow_blank
+        on_unmatched = self.on_unmatched
+
+        def transform_values(values, row_ctxt):
+            for field, i in field_indices:
+                value = values[i]
+                if convert_case is not None:
+                    value = values[i] = convert_case(value)
+                if allow_blank and not value:
+                    continue
+                try:
+                    values[i] = d[value]
+                except KeyError:
+                    if on_unmatched == E_FAIL:
+                        self.__fail(field, value)
+                    if on_unmatched == E_BLANK:
+                        values[i] = ""
+            return values
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
@@ -3,6 +3,7 @@ SetFieldValueTask module.
 """
 
 from dataunifier.common.exceptions import ConfigException, TransformationException
+from dataunifier.parse import positional
 from dataunifier.tasks.AbstractTask import AbstractRegularTask
 from dataunifier.utils import confighelper
 
@@ -88,5 +89,18 @@ class SetFieldValueTask(AbstractRegularTask):
         output[self.field] = self.value
         return row_ctxt.with_updated_rowdict(output)
 
+    def compile(self, slots):
+        indices = positional.get_indices([self.field], slots)
+        if indices is None:
+            return None
+        index = indices[0]
+        value = self.value
+
+        def transform_values(values, row_ctxt):
+            values[index] = value
+            return values
+
+        return positional.with_when(self.when, slots, transform_values)
+
     def get_resulting_fields(self):
         return self.resulting_fields
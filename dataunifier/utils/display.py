@@ -7,6 +7,33 @@ import sys
 from dataunifier.logging import logging
 
 
+_messages_to_stderr = False
+
+
+def set_messages_to_stderr(to_stderr=True):
+    """
+    Set whether messages and progress bars should be shown on :code:`stderr` instead of :code:`stdout`.
+
+    Used when :code:`stdout` is reserved for the output data.
+
+    :param bool to_stderr: True to show messages on :code:`stderr`, False to show them on :code:`stdout`.
+    """
+
+    global _messages_to_stderr  # pylint: disable=global-statement
+    _messages_to_stderr = to_stderr
+
+
+def get_message_stream():
+    """
+    Get the stream that messages and progress bars should be written to.
+
+    :return: :code:`sys.stderr` if messages have been set to go to :code:`stderr`, :code:`sys.stdout` otherwise.
+    :rtype: io.TextIOBase
+    """
+
+    return sys.stderr if _messages_to_stderr else sys.stdout
+
+
 class ProgressBar:
     """
     A class that, when instatiated, shows a progress bar on the console.
@@ -23,7 +50,7 @@ class ProgressBar:
         self.progress = 0
         self.previous_bar_length = 0
         bar = " " * 101  # pylint: disable=blacklisted-name
-        sys.stdout.write("[%s] 0/%d" % (bar, self.total))
+        get_message_stream().write("[%s] 0/%d" % (bar, self.total))
 
     def increment(self, value=1):
         """
@@ -41,7 +68,7 @@ class ProgressBar:
             space_length = 100 - bar_length
             bar = "=" * bar_length  # pylint: disable=blacklisted-name
             space = " " * space_length
-            sys.stdout.write("\r[%s>%s] %d/%d" % (bar, space, self.progress, self.total))
+            get_message_stream().write("\r[%s>%s] %d/%d" % (bar, space, self.progress, self.total))
         self.previous_bar_length = bar_length
 
     def close(self):
@@ -55,17 +82,17 @@ class ProgressBar:
         space_length = 100 - bar_length
         bar = "=" * bar_length  # pylint: disable=blacklisted-name
         space = " " * space_length
-        sys.stdout.write("\r[%s=%s] %d/%d DONE\n\n" % (bar, space, self.progress, self.total))
+        get_message_stream().write("\r[%s=%s] %d/%d DONE\n\n" % (bar, space, self.progress, self.total))
 
 
 def stdout(msg=""):
     """
-    Print a message to :code:`stdout`.
+    Print a message to :code:`stdout` (or :code:`stderr`, if messages have been set to go there).
 
     :param str msg: The message to print.
     """
 
-    print(msg)
+    print(msg, file=get_message_stream())
 
 
 def stderr(msg=""):
@@ -86,9 +113,9 @@ def warn(msg):
     """
 
     logging.warn(msg)
-    print("##### WARNING #####\n")
-    print("  %s\n" % msg)
-    print("###################")
+    print("##### WARNING #####\n", file=get_message_stream())
+    print("  %s\n" % msg, file=get_message_stream())
+    print("###################", file=get_message_stream())
 
 
 def error(msg):
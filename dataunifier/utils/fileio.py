@@ -3,8 +3,13 @@ Module that handles file inputs and outputs.
 """
 
 import csv
+import fnmatch
+import hashlib
+import io
 import os
 import re
+import sys
+from contextlib import contextmanager
 
 import yaml
 
@@ -15,6 +20,84 @@ from dataunifier.common.exceptions import AbortException, NoSuchDirectoryExcepti
 from dataunifier.utils import display
 
 
+RECORDED_FILE = "file"
+RECORDED_DIRECTORY = "directory"
+
+_recorded_reads = None
+_cached_reads = None
+
+# The libyaml-based loader is much faster, but is not available in every installation of PyYAML.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def start_recording_reads():
+    """
+    Start recording the files read and directories listed through this module, e.g., to find out which files the
+    configuration depends on.
+
+    Reading a YAML or text file, or counting the rows of a CSV file, records the file. Looking up files by regular
+    expression records the directory.
+    """
+
+    global _recorded_reads  # pylint: disable=global-statement
+    _recorded_reads = []
+
+
+def stop_recording_reads():
+    """
+    Stop recording reads, and get what was recorded since :code:`start_recording_reads` was called.
+
+    :return: The recorded reads as tuples of :code:`RECORDED_FILE` or :code:`RECORDED_DIRECTORY` and the path, in
+             the order they happened, without duplicates.
+    :rtype: list[(str, str)]
+    """
+
+    global _recorded_reads  # pylint: disable=global-statement
+    recorded = list(dict.fromkeys(_recorded_reads or []))
+    _recorded_reads = None
+    return recorded
+
+
+def _record_read(kind, path):
+    if _recorded_reads is not None:
+        _recorded_reads.append((kind, path))
+
+
+def start_caching_reads():
+    """
+    Start caching the content of the YAML and text files read through this module, so that a file referenced many
+    times is only read and parsed once.
+
+    Cached content is only used as long as the modification time and size of the file are unchanged. The same object
+    is returned every time, so it must not be modified.
+    """
+
+    global _cached_reads  # pylint: disable=global-statement
+    _cached_reads = {}
+
+
+def stop_caching_reads():
+    """
+    Stop caching reads, and discard the cached content.
+    """
+
+    global _cached_reads  # pylint: disable=global-statement
+    _cached_reads = None
+
+
+def __read_cached(kind, file_path, read):
+    if _cached_reads is None:
+        return read(file_path)
+    stat = os.stat(file_path)
+    key = (kind, os.path.realpath(file_path))
+    version = (stat.st_mtime_ns, stat.st_size)
+    if key in _cached_reads and _cached_reads[key][0] == version:
+        return _cached_reads[key][1]
+    content = read(file_path)
+    _cached_reads[key] = (version, content)
+    return content
+
+
 def get_file_names_by_regex(directory, regex):
     """
     Get the names of files in a directory that match a regular expression.
@@ -28,6 +111,7 @@ def get_file_names_by_regex(directory, regex):
 
     if not os.path.isdir(directory):
         raise NoSuchDirectoryException(directory)
+    _record_read(RECORDED_DIRECTORY, directory)
     files = os.listdir(directory)
     matching = [file for file in files if re.fullmatch(regex, file)]
     if not matching:
@@ -35,6 +119,18 @@ def get_file_names_by_regex(directory, regex):
     return matching
 
 
+def get_file_names(directory):
+    """
+    Get the names of the files in a directory.
+
+    :param str directory: The path of the directory.
+    :return: The list of names of files (not subdirectories) in the directory.
+    :rtype: list[str]
+    """
+
+    return [file for file in os.listdir(directory) if os.path.isfile(os.path.join(directory, file))]
+
+
 def check_file_existence(filepath):
     """
     Check whether a file exists.
@@ -104,6 +200,51 @@ def check_file_existence_and_confirm_overwrite(file_path_list, force=False):
             raise AbortException()
 
 
+def get_file_paths_by_pattern(directory, pattern):
+    """
+    Get the paths of the files in a directory whose names match a shell-style wildcard pattern.
+
+    :param str directory: The path of the directory.
+    :param str pattern: The pattern, e.g., :code:`region=*.csv`.
+    :return: The sorted list of paths of matching files (not subdirectories) in the directory.
+    :rtype: list[str]
+    """
+
+    return sorted([
+        os.path.join(directory, file) for file in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, file)) and fnmatch.fnmatchcase(file, pattern)
+    ])
+
+
+def prepare_dir(directory, pattern):
+    """
+    Make sure that a directory exists and contains no files whose names match a shell-style wildcard pattern,
+    creating it or deleting matching files as necessary.
+
+    Files in the directory that do not match the pattern are left alone.
+
+    :param str directory: The path of the directory.
+    :param str pattern: The pattern, e.g., :code:`region=*.csv`.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    for file_path in get_file_paths_by_pattern(directory, pattern):
+        os.remove(file_path)
+
+
+def __load_yaml_file(file_path):
+    try:
+        with open(file_path, "r") as f:
+            return yaml.load(f, Loader=_YAML_LOADER)
+    except yaml.YAMLError as e:
+        raise YamlParsingException(e)
+
+
+def __load_text_file(file_path):
+    with open(file_path, "r") as f:
+        return f.read()
+
+
 def read_yaml_file(file_path):
     """
     Parse a YAML file and produce a :code:`dict` representation of it.
@@ -115,11 +256,8 @@ def read_yaml_file(file_path):
     """
 
     check_file_existence(file_path)
-    try:
-        with open(file_path, "r") as f:
-            return yaml.safe_load(f)
-    except yaml.YAMLError as e:
-        raise YamlParsingException(e)
+    _record_read(RECORDED_FILE, file_path)
+    return __read_cached("yaml", file_path, __load_yaml_file)
 
 
 def read_text_file(file_path):
@@ -132,8 +270,21 @@ def read_text_file(file_path):
     """
 
     check_file_existence(file_path)
-    with open(file_path, "r") as f:
-        return f.read()
+    _record_read(RECORDED_FILE, file_path)
+    return __read_cached("text", file_path, __load_text_file)
+
+
+def open_csv_file(file_path):
+    """
+    Open a CSV file for reading, with the encoding used for all CSV files.
+
+    :param str file_path: The path to the file.
+    :return: The opened file, suitable for passing to :code:`csv.reader`.
+    :rtype: io.TextIOBase
+    """
+
+    _record_read(RECORDED_FILE, file_path)
+    return open(file_path, "r", encoding=commonconstants.DEFAULT_ENCODING, newline="")
 
 
 def get_extension(file_path):
@@ -159,9 +310,120 @@ def count_rows(file_path):
     :rtype: int
     """
 
+    _record_read(RECORDED_FILE, file_path)
     counter = 0
     with open(file_path, "r", encoding=commonconstants.DEFAULT_ENCODING) as f:
         reader = csv.DictReader(f)
         for _ in reader:
             counter += 1
     return counter
+
+
+def get_file_identity(file_path):
+    """
+    Get a value that identifies the physical file behind a path.
+
+    Two paths that refer to the same file (e.g., through symbolic links, hard links or relative path components)
+    produce the same identity.
+
+    :param str file_path: The path of the file.
+    :return: A hashable value identifying the file.
+    :rtype: tuple
+    """
+
+    stat = os.stat(file_path)
+    if stat.st_ino:
+        return stat.st_dev, stat.st_ino
+    return os.path.normcase(os.path.realpath(file_path)), None
+
+
+def get_file_size(file_path):
+    """
+    Get the size of a file in bytes.
+
+    :param str file_path: The path of the file.
+    :return: The size of the file.
+    :rtype: int
+    """
+
+    return os.path.getsize(file_path)
+
+
+def get_file_fingerprint(file_path, previous=None):
+    """
+    Get a fingerprint of a file, to tell whether its content has changed since an earlier fingerprint was taken.
+
+    The fingerprint consists of the size, the modification time and the digest of the content of the file. If an
+    earlier fingerprint with the same size and modification time is given, it is returned as is, to avoid reading
+    the file again. Either way, the file is recorded as read, as whatever the fingerprint is used for depends on it.
+
+    :param str file_path: The path of the file.
+    :param Optional[tuple] previous: An earlier fingerprint of the file, if any.
+    :return: The fingerprint. Fingerprints of files with the same content have the same last element.
+    :rtype: (int, int, str)
+    """
+
+    _record_read(RECORDED_FILE, file_path)
+    stat = os.stat(file_path)
+    if previous is not None and tuple(previous[:2]) == (stat.st_size, stat.st_mtime_ns):
+        return tuple(previous)
+    return stat.st_size, stat.st_mtime_ns, get_file_digest(file_path)
+
+
+def get_file_digest(file_path):
+    """
+    Compute a digest of the content of a file.
+
+    The file is read in blocks, so that large files do not have to be read into memory.
+
+    :param str file_path: The path of the file.
+    :return: The hexadecimal SHA-1 digest of the file content.
+    :rtype: str
+    """
+
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def __open_standard_stream(stream, mode):
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        yield stream
+        return
+    wrapper = io.TextIOWrapper(buffer, encoding=commonconstants.DEFAULT_ENCODING, newline="")
+    try:
+        yield wrapper
+    finally:
+        if mode == "w":
+            wrapper.flush()
+        wrapper.detach()
+
+
+def open_stdin():
+    """
+    Open :code:`stdin` for reading CSV data, in the same way that input files are opened.
+
+    To be used as a context manager. :code:`stdin` itself is left open afterwards.
+
+    :return: A context manager yielding a text stream.
+    :rtype: contextlib.AbstractContextManager
+    """
+
+    return __open_standard_stream(sys.stdin, "r")
+
+
+def open_stdout():
+    """
+    Open :code:`stdout` for writing CSV data, in the same way that the output file is opened.
+
+    To be used as a context manager. :code:`stdout` itself is left open afterwards.
+
+    :return: A context manager yielding a text stream.
+    :rtype: contextlib.AbstractContextManager
+    """
+
+    return __open_standard_stream(sys.stdout, "w")
@@ -0,0 +1,365 @@
+"""
+Module containing index structures for finding the fuzzy matching rule that is most similar to a value, without
+scoring the value against every rule.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+def _get_size_range(size, minimum_score):
+    # A rule with n n-grams scores at most min(size, n) / max(size, n) against a value with size n-grams. Rules that
+    # cannot reach the minimum score could never be accepted, so they need not be scored.
+    if not isinstance(minimum_score, (int, float)) or minimum_score <= 0 or size == 0:
+        return 0, float("inf")
+    low = max(int(size * minimum_score) - 1, 0)
+    while low < size and low / size < minimum_score:
+        low += 1
+    high = int(size / minimum_score) + 1
+    while high > size and size / high < minimum_score:
+        high -= 1
+    return low, high
+
+
+class JaccardIndex:
+    """
+    An inverted index from n-grams to the rules containing them, for the Jaccard method.
+
+    Only rules that share at least one n-gram with a value can have a score above 0, so only those are scored, using
+    the number of shared n-grams counted while going through the index. The result is the same as scoring every
+    rule in order and keeping the first one with the highest score above 0.
+    """
+
+    def __init__(self, ngram_sets):
+        """
+        Create a :code:`JaccardIndex` object.
+
+        :param list[set[str]] ngram_sets: The n-grams of each rule, in the order of the rules.
+        """
+
+        self.sizes = [len(ngrams) for ngrams in ngram_sets]
+        postings = {}
+        for i in sorted(range(len(ngram_sets)), key=lambda j: self.sizes[j]):
+            for ngram in ngram_sets[i]:
+                postings.setdefault(ngram, []).append(i)
+        # For each n-gram, the rules containing it, ordered by their number of n-grams, together with those numbers,
+        # so that rules that are too small or too large to reach a minimum score can be skipped.
+        self.postings = {
+            ngram: (rule_ids, [self.sizes[i] for i in rule_ids]) for ngram, rule_ids in postings.items()
+        }
+
+    def find(self, ngrams, minimum_score):
+        """
+        Find the rule that is most similar to a value.
+
+        :param set[str] ngrams: The n-grams of the value.
+        :param float minimum_score: The minimum score to be accepted. Rules that cannot reach it may be ignored.
+        :return: The position of the first rule with the highest score, and the score, or None and 0.0 if no rule
+                 has a score above 0 (or the minimum score).
+        :rtype: (Optional[int], float)
+        """
+
+        size = len(ngrams)
+        low, high = _get_size_range(size, minimum_score)
+        counts = {}
+        for ngram in ngrams:
+            posting = self.postings.get(ngram)
+            if posting is None:
+                continue
+            rule_ids, sizes = posting
+            for i in rule_ids[bisect_left(sizes, low):bisect_right(sizes, high)]:
+                counts[i] = counts.get(i, 0) + 1
+        best = None
+        highest_score = 0.0
+        for i, intersection in counts.items():
+            score = intersection / (size + self.sizes[i] - intersection)
+            if score > highest_score or (score == highest_score and best is not None and i < best):
+                best = i
+                highest_score = score
+        return best, highest_score
+
+
+class JaccardMatrix:
+    """
+    The n-grams of all rules as a sparse binary matrix, for scoring many values against all rules at once with NumPy,
+    for the Jaccard method.
+
+    The n-grams of a batch of values form another sparse binary matrix, and their product holds the number of
+    n-grams each value shares with each rule. It is computed from the non-zero entries only, without Python code per
+    pair of value and rule. The result for each value is the same as that of :code:`JaccardIndex.find`.
+    """
+
+    # The largest number of non-zero entries of the product to count at once, which bounds the memory used.
+    BATCH_SIZE = 1000000
+
+    def __init__(self, ngram_sets):
+        """
+        Create a :code:`JaccardMatrix` object.
+
+        :param list[set[str]] ngram_sets: The n-grams of each rule, in the order of the rules.
+        :raises: ImportError if NumPy is not installed.
+        """
+
+        # NumPy takes a while to import, and is only needed for large rule lists.
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        self.vocabulary = {}
+        ngram_ids = []
+        rule_ids = []
+        for i, ngrams in enumerate(ngram_sets):
+            for ngram in ngrams:
+                ngram_ids.append(self.vocabulary.setdefault(ngram, len(self.vocabulary)))
+                rule_ids.append(i)
+        self.sizes = np.array([len(ngrams) for ngrams in ngram_sets], dtype=np.int64)
+        self.max_size = int(self.sizes.max()) if len(ngram_sets) else 0
+        ngram_ids = np.array(ngram_ids, dtype=np.int64)
+        rule_ids = np.array(rule_ids, dtype=np.int64)
+        # The matrix in compressed sparse column form, with the rules containing each n-gram ordered by their number
+        # of n-grams, so that rules that are too small or too large to reach a minimum score can be skipped. The
+        # entries for n-gram k and rules with n n-grams are those where keys == k * (max_size + 1) + n.
+        keys = ngram_ids * (self.max_size + 1) + self.sizes[rule_ids]
+        order = np.lexsort((rule_ids, keys))
+        self.keys = keys[order]
+        self.rule_ids = rule_ids[order]
+
+    def __count_batch(self, value_ids, starts, ends, value_sizes, results):
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if not total:
+            return
+        # One entry per rule containing each n-gram of each value, i.e., per non-zero term of the product.
+        pair_starts = np.cumsum(lengths) - lengths
+        positions = np.arange(total) - np.repeat(pair_starts - starts, lengths)
+        rule_count = len(self.sizes)
+        keys, intersections = np.unique(
+            np.repeat(value_ids, lengths) * rule_count + self.rule_ids[positions], return_counts=True
+        )
+        pair_value_ids = keys // rule_count
+        pair_rule_ids = keys % rule_count
+        scores = intersections / (value_sizes[pair_value_ids] + self.sizes[pair_rule_ids] - intersections)
+        # The pairs are ordered by value, then rule. For each value, keep the highest score, and the first rule with
+        # it.
+        value_starts = np.flatnonzero(np.diff(pair_value_ids, prepend=-1))
+        highest_scores = np.maximum.reduceat(scores, value_starts)
+        candidates = np.flatnonzero(scores == np.repeat(highest_scores, np.diff(value_starts, append=len(scores))))
+        best = candidates[np.diff(pair_value_ids[candidates], prepend=-1) != 0]
+        for j, i, score in zip(pair_value_ids[best].tolist(), pair_rule_ids[best].tolist(), scores[best].tolist()):
+            results[j] = (i, score)
+
+    def find_all(self, ngram_sets, minimum_score):
+        """
+        Find the rule that is most similar to each of a list of values.
+
+        :param list[set[str]] ngram_sets: The n-grams of each value.
+        :param float minimum_score: The minimum score to be accepted. Rules that cannot reach it may be ignored.
+        :return: For each value, the position of the first rule with the highest score, and the score, or None and
+                 0.0 if no rule has a score above 0 (or the minimum score).
+        :rtype: list[(Optional[int], float)]
+        """
+
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        value_ids = []
+        low_keys = []
+        high_keys = []
+        for j, ngrams in enumerate(ngram_sets):
+            low, high = _get_size_range(len(ngrams), minimum_score)
+            low = min(low, self.max_size + 1)
+            high = min(high, self.max_size)
+            for ngram in ngrams:
+                ngram_id = self.vocabulary.get(ngram)
+                if ngram_id is not None:
+                    value_ids.append(j)
+                    low_keys.append(ngram_id * (self.max_size + 1) + low)
+                    high_keys.append(ngram_id * (self.max_size + 1) + high)
+        value_ids = np.array(value_ids, dtype=np.int64)
+        starts = np.searchsorted(self.keys, np.array(low_keys, dtype=np.int64), "left")
+        ends = np.maximum(np.searchsorted(self.keys, np.array(high_keys, dtype=np.int64), "right"), starts)
+        value_sizes = np.array([len(ngrams) for ngrams in ngram_sets], dtype=np.int64)
+        results = [(None, 0.0)] * len(ngram_sets)
+        # Values are counted in batches of about BATCH_SIZE entries. The n-grams of a value are never split across
+        # batches.
+        entry_counts = np.bincount(value_ids, ends - starts, len(ngram_sets))
+        batches = ((np.cumsum(entry_counts) - 1) // JaccardMatrix.BATCH_SIZE)[value_ids]
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(batches)) + 1, [len(value_ids)]])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            self.__count_batch(value_ids[start:end], starts[start:end], ends[start:end], value_sizes, results)
+        return results
+
+
+def get_edit_distance(string1, string2):
+    """
+    Get the Levenshtein distance between two strings, i.e., the smallest number of characters to insert, delete or
+    substitute to turn one into the other.
+
+    :param str string1: The first string.
+    :param str string2: The second string.
+    :return: The distance.
+    :rtype: int
+    """
+
+    if len(string1) < len(string2):
+        string1, string2 = string2, string1
+    previous = list(range(len(string2) + 1))
+    for i, char1 in enumerate(string1, 1):
+        current = [i]
+        for j, char2 in enumerate(string2, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char1 != char2)))
+        previous = current
+    return previous[-1]
+
+
+def get_edit_score(distance, length1, length2):
+    """
+    Turn the Levenshtein distance between two strings into a score between 0 and 1, where 1 means the strings are
+    equal and 0 means that no character is in place.
+
+    :param int distance: The distance.
+    :param int length1: The length of the first string.
+    :param int length2: The length of the second string.
+    :return: The score.
+    :rtype: float
+    """
+
+    longest = max(length1, length2)
+    return 1.0 - distance / longest if longest else 1.0
+
+
+def _get_edit_radius(length, score):
+    # A rule at distance d from a value of the given length is at least d - length characters long, so its score is
+    # at most 1 - d / (length + d). That is below the score if d > (1 - score) * length / score. A little is added so
+    # that rounding never discards a rule that reaches the score.
+    if not isinstance(score, (int, float)) or score <= 0:
+        return float("inf")
+    return (1 - score) * length / score + 1e-9
+
+
+class LevenshteinIndex:
+    """
+    A BK-tree of the rule strings, for the Levenshtein method.
+
+    Each node holds a string, and its children are keyed by their distance to it. As the distance is a metric, a
+    subtree whose key differs from the distance between the value and the node by more than some radius holds no
+    string within that radius of the value, and is skipped. The radius shrinks as better scoring rules are found.
+    The result is the same as scoring every rule in order and keeping the first one with the highest score above 0.
+    """
+
+    def __init__(self, strings):
+        """
+        Create a :code:`LevenshteinIndex` object.
+
+        :param list[str] strings: The string of each rule, in the order of the rules.
+        """
+
+        # Each node is [string, positions of the rules with the string, {distance: child node}].
+        self.root = None
+        for i, string in enumerate(strings):
+            self.__insert(string, i)
+        # Values are often equal to a rule string, which is then the first rule with the highest possible score.
+        self.exact = {}
+        for i, string in enumerate(strings):
+            self.exact.setdefault(string, i)
+
+    def __insert(self, string, i):
+        if self.root is None:
+            self.root = [string, [i], {}]
+            return
+        node = self.root
+        while True:
+            distance = get_edit_distance(string, node[0])
+            if distance == 0:
+                node[1].append(i)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [string, [i], {}]
+                return
+            node = child
+
+    def find(self, value, minimum_score):
+        """
+        Find the rule that is most similar to a value.
+
+        :param str value: The value.
+        :param float minimum_score: The minimum score to be accepted. Rules that cannot reach it may be ignored.
+        :return: The position of the first rule with the highest score, and the score, or None and 0.0 if no rule
+                 has a score above 0 (or the minimum score).
+        :rtype: (Optional[int], float)
+        """
+
+        if value in self.exact:
+            return self.exact[value], 1.0
+        best = None
+        highest_score = 0.0
+        radius = _get_edit_radius(len(value), minimum_score)
+        # Each entry is a node, and the smallest distance any string in its subtree can have to the value.
+        stack = [(self.root, 0)] if self.root is not None else []
+        while stack:
+            node, lower_bound = stack.pop()
+            if lower_bound > radius:
+                continue
+            string, rule_ids, children = node
+            distance = get_edit_distance(value, string)
+            score = get_edit_score(distance, len(value), len(string))
+            if score > highest_score or (score == highest_score and best is not None and rule_ids[0] < best):
+                best = rule_ids[0]
+                highest_score = score
+                radius = min(radius, _get_edit_radius(len(value), highest_score))
+            # The children that can be closest to the value are searched first, as they are the most likely to raise
+            # the highest score, which narrows the search.
+            stack.extend(sorted(
+                [(child, abs(key - distance)) for key, child in children.items()], key=lambda entry: -entry[1]
+            ))
+        return best, highest_score
+
+
+class CosineIndex:
+    """
+    An inverted index from n-grams to the rules containing them and their weights, for the TF-IDF method.
+
+    The score of a rule is the sum of the products of the weights of the n-grams it shares with a value, which are
+    added up while going through the index, so only rules sharing at least one n-gram with the value are touched. The
+    sums are formed in the same order as by :code:`TfidfRule.evaluate`, so the result is exactly the same as scoring
+    every rule in order and keeping the first one with the highest score above 0.
+    """
+
+    def __init__(self, weight_dicts):
+        """
+        Create a :code:`CosineIndex` object.
+
+        :param list[dict[str, float]] weight_dicts: The normalised weight of each n-gram of each rule, in the order
+                                                    of the rules.
+        """
+
+        postings = {}
+        for i, weights in enumerate(weight_dicts):
+            for ngram, weight in weights.items():
+                rule_ids, rule_weights = postings.setdefault(ngram, ([], []))
+                rule_ids.append(i)
+                rule_weights.append(weight)
+        self.postings = postings
+
+    def find(self, weights, minimum_score):  # pylint: disable=unused-argument
+        """
+        Find the rule that is most similar to a value.
+
+        :param dict[str, float] weights: The normalised weight of each n-gram of the value.
+        :param float minimum_score: The minimum score to be accepted. Not used, as every rule sharing an n-gram with
+                                    the value is scored.
+        :return: The position of the first rule with the highest score, and the score, or None and 0.0 if no rule
+                 has a score above 0.
+        :rtype: (Optional[int], float)
+        """
+
+        scores = {}
+        for ngram, weight in weights.items():
+            posting = self.postings.get(ngram)
+            if posting is None:
+                continue
+            for i, rule_weight in zip(*posting):
+                scores[i] = scores.get(i, 0.0) + weight * rule_weight
+        best = None
+        highest_score = 0.0
+        for i, score in scores.items():
+            if score > highest_score or (score == highest_score and best is not None and i < best):
+                best = i
+                highest_score = score
+        return best, highest_score
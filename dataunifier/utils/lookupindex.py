@@ -0,0 +1,217 @@
+"""
+Module for persistent, on-disk lookup indexes.
+
+A lookup index maps the values of one column of a CSV file to the values of another column, like a :code:`dict`,
+but is stored in a SQLite database file instead of memory. Lookups are B-tree probes against the memory-mapped file,
+so a lookup table of any size can be used without loading it. The index remembers a fingerprint of the CSV file it
+was built from, so that it can be rebuilt when the file changes.
+"""
+
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+from dataunifier.common.exceptions import DuplicateKeyException
+
+
+INDEX_FORMAT_VERSION = 1
+INDEX_FILE_EXTENSION = "sqlite"
+MMAP_SIZE = 1 << 40
+INSERT_BATCH_SIZE = 10000
+
+E_KEEP_FIRST = "keep_first"
+E_KEEP_LAST = "keep_last"
+
+_INSERT_STATEMENTS = {
+    None: "INSERT INTO lookup (key, value) VALUES (?, ?)",
+    E_KEEP_FIRST: "INSERT OR IGNORE INTO lookup (key, value) VALUES (?, ?)",
+    E_KEEP_LAST: "INSERT OR REPLACE INTO lookup (key, value) VALUES (?, ?)"
+}
+
+_MISSING = object()
+
+
+def _get_read_only_uri(index_file_path):
+    return "%s?mode=ro" % Path(os.path.abspath(index_file_path)).as_uri()
+
+
+def get_index_file_path(index_dir, source_file_path, key_column, value_column, on_duplicate):
+    """
+    Get the path of the index file for a pair of columns of a CSV file.
+
+    :param str index_dir: The directory to keep index files in.
+    :param str source_file_path: The path of the CSV file.
+    :param str key_column: The column to look up.
+    :param str value_column: The column containing the values to return.
+    :param Optional[str] on_duplicate: How duplicate keys are handled (see :code:`build`).
+    :return: The path of the index file.
+    :rtype: str
+    """
+
+    key = repr((INDEX_FORMAT_VERSION, os.path.abspath(source_file_path), key_column, value_column, on_duplicate))
+    return os.path.join(index_dir, "%s.%s" % (hashlib.sha1(key.encode()).hexdigest(), INDEX_FILE_EXTENSION))
+
+
+def get_source_fingerprint(index_file_path):
+    """
+    Get the fingerprint of the CSV file that an index was built from.
+
+    :param str index_file_path: The path of the index file.
+    :return: The fingerprint (see :code:`fileio.get_file_fingerprint`), or None if there is no usable index file.
+    :rtype: Optional[(int, int, str)]
+    """
+
+    if not os.path.isfile(index_file_path):
+        return None
+    try:
+        connection = sqlite3.connect(_get_read_only_uri(index_file_path), uri=True)
+        try:
+            row = connection.execute("SELECT version, size, mtime_ns, digest FROM meta").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    if row is None or row[0] != INDEX_FORMAT_VERSION:
+        return None
+    return row[1], row[2], row[3]
+
+
+def __insert_batch(connection, statement, batch):
+    try:
+        connection.executemany(statement, batch)
+        connection.commit()
+    except sqlite3.IntegrityError:
+        # Only reached when duplicates are not allowed; undo the batch and find the offending key for the error
+        # message.
+        connection.rollback()
+        for key, value in batch:
+            try:
+                connection.execute(statement, (key, value))
+            except sqlite3.IntegrityError:
+                raise DuplicateKeyException(key)
+
+
+def build(index_file_path, pairs, source_fingerprint, on_duplicate=None):
+    """
+    Build an index file.
+
+    The file is built under a temporary name and moved into place at the end, so that an interrupted build never
+    leaves a broken index behind.
+
+    :param str index_file_path: The path of the index file.
+    :param Iterable[(str, str)] pairs: The key-value pairs to put in the index, in order.
+    :param (int, int, str) source_fingerprint: The fingerprint of the CSV file the pairs come from.
+    :param Optional[str] on_duplicate: :code:`E_KEEP_FIRST` or :code:`E_KEEP_LAST` to keep the first or last value
+                                       of a duplicate key, or None to raise an exception.
+    :raises: DuplicateKeyException if a key occurs more than once and duplicates are not allowed.
+    """
+
+    temp_file_path = "%s.%d.tmp" % (index_file_path, os.getpid())
+    if os.path.isfile(temp_file_path):
+        os.remove(temp_file_path)
+    statement = _INSERT_STATEMENTS[on_duplicate]
+    connection = sqlite3.connect(temp_file_path)
+    try:
+        connection.execute("PRAGMA journal_mode = MEMORY")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("CREATE TABLE lookup (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+        connection.execute("CREATE TABLE meta (version INTEGER, size INTEGER, mtime_ns INTEGER, digest TEXT)")
+        batch = []
+        for pair in pairs:
+            batch.append(pair)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                __insert_batch(connection, statement, batch)
+                batch = []
+        __insert_batch(connection, statement, batch)
+        connection.execute("INSERT INTO meta VALUES (?, ?, ?, ?)", (INDEX_FORMAT_VERSION,) + tuple(source_fingerprint))
+        connection.commit()
+        connection.close()
+        os.replace(temp_file_path, index_file_path)
+    finally:
+        connection.close()
+        if os.path.isfile(temp_file_path):
+            os.remove(temp_file_path)
+
+
+class LookupIndex:
+    """
+    A read-only, :code:`dict`-like view of an index file.
+
+    The index file is opened lazily on first use, and again after unpickling.
+    """
+
+    def __init__(self, index_file_path):
+        """
+        Create a :code:`LookupIndex` object.
+
+        :param str index_file_path: The path of the index file.
+        """
+
+        self.index_file_path = index_file_path
+        self.connection = None
+
+    def __get_connection(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(
+                _get_read_only_uri(self.index_file_path), uri=True, check_same_thread=False
+            )
+            self.connection.execute("PRAGMA mmap_size = %d" % MMAP_SIZE)
+        return self.connection
+
+    def get(self, key, default=None):
+        """
+        Get the value for a key.
+
+        :param str key: The key.
+        :param any default: The value to return if the key is not in the index.
+        :return: The value, or the default.
+        :rtype: any
+        """
+
+        row = self.__get_connection().execute("SELECT value FROM lookup WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def close(self):
+        """
+        Close the index file. It is opened again if the index is used afterwards.
+        """
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return self.__get_connection().execute("SELECT COUNT(*) FROM lookup").fetchone()[0]
+
+    def __getstate__(self):
+        return {"index_file_path": self.index_file_path}
+
+    def __setstate__(self, state):
+        self.index_file_path = state["index_file_path"]
+        self.connection = None
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+        if not isinstance(other, type(self)):
+            return False
+        return self.index_file_path == other.index_file_path
+
+    def __hash__(self):
+        return hash(self.index_file_path)
+
+    def __str__(self):
+        return "LookupIndex(%s)" % self.index_file_path
+
+    def __repr__(self):
+        return str(self)
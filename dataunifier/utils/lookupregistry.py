@@ -0,0 +1,270 @@
+"""
+Module for sharing lookup tables between tasks.
+
+Several tasks, possibly in different filesets, often look things up in the same CSV file, using different columns.
+A :code:`LookupRegistry` collects the lookup tables that all tasks need while the configuration is being parsed, and
+then reads each CSV file once, building every lookup table that was requested from it in a single pass. Tasks that
+request the same lookup table share the same object, which must be treated as read-only.
+"""
+
+import abc
+import csv
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from dataunifier.utils import display, fileio
+from dataunifier.utils.display import ProgressBar
+from dataunifier.utils.lookupindex import E_KEEP_FIRST, E_KEEP_LAST
+
+
+MAX_LOADING_THREADS = 8
+
+
+class _LookupRequest(abc.ABC):
+    """
+    Abstract base class for a request for a lookup table to be filled in from the rows of a CSV file.
+    """
+
+    def __init__(self, columns, requester, on_missing_column, table):
+        self.columns = columns
+        self.requesters = [requester]
+        self.on_missing_column = on_missing_column
+        self.table = table
+        self.indices = None
+
+    def prepare(self, header):
+        """
+        Find the positions of the requested columns in the header of the CSV file.
+
+        :param list[str] header: The header row of the CSV file.
+        """
+
+        self.indices = []
+        for column in self.columns:
+            if column not in header:
+                self.on_missing_column(column)
+            # Like csv.DictReader, use the last column if there are several with the same name.
+            self.indices.append(len(header) - 1 - header[::-1].index(column))
+
+    @abc.abstractmethod
+    def add(self, row):
+        """
+        Add a row of the CSV file to the table.
+
+        :param list[Optional[str]] row: The row, padded with None to the width of the header.
+        """
+
+
+class _DictRequest(_LookupRequest):
+    def __init__(self, key_column, value_column, on_duplicate, requester, on_missing_column, on_duplicate_key):
+        super(_DictRequest, self).__init__([key_column, value_column], requester, on_missing_column, {})
+        self.on_duplicate = on_duplicate
+        self.on_duplicate_key = on_duplicate_key
+
+    def add(self, row):
+        key = row[self.indices[0]]
+        if self.on_duplicate == E_KEEP_LAST:
+            self.table[key] = row[self.indices[1]]
+        elif key not in self.table:
+            self.table[key] = row[self.indices[1]]
+        elif self.on_duplicate != E_KEEP_FIRST:
+            self.on_duplicate_key(key)
+
+
+class _SetRequest(_LookupRequest):
+    def __init__(self, column, requester, on_missing_column):
+        super(_SetRequest, self).__init__([column], requester, on_missing_column, set())
+
+    def add(self, row):
+        self.table.add(row[self.indices[0]])
+
+
+class _FileLoad:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.requests = []
+        self.begun = False
+
+
+class LookupRegistry:
+    """
+    A registry of the lookup tables needed by the tasks of a configuration.
+
+    Lookup tables are requested with :code:`request_dict` and :code:`request_set`, which return empty tables right
+    away. The tables are filled in when :code:`load` is called, or in the background between calls to :code:`start`
+    and :code:`wait`.
+
+    All tables requested from a CSV file are filled in with a single pass over the file, unless some of them are only
+    requested after reading the file has begun; those are filled in with another pass.
+    """
+
+    def __init__(self):
+        """
+        Create an empty :code:`LookupRegistry` object.
+        """
+
+        self.requests = {}
+        self.loads = OrderedDict()
+        self.queued = []
+        self.futures = []
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def __request(self, file_path, spec, create_request, requester):
+        key = os.path.normcase(os.path.abspath(file_path))
+        with self.lock:
+            request = self.requests.get((key, spec))
+            if request is not None:
+                request.requesters.append(requester)
+                return request.table
+            request = create_request()
+            self.requests[(key, spec)] = request
+            load = self.loads.get(key)
+            if load is None or load.begun:
+                load = _FileLoad(file_path)
+                self.loads[key] = load
+                if self.executor is None:
+                    self.queued.append(load)
+                else:
+                    self.futures.append(self.executor.submit(self.__run_load, load, False))
+            load.requests.append(request)
+        return request.table
+
+    def request_dict(self, file_path, key_column, value_column, on_duplicate, requester, on_missing_column,
+                     on_duplicate_key):
+        """
+        Request a :code:`dict` mapping the values of one column of a CSV file to the values of another column.
+
+        If the same table has already been requested, the same :code:`dict` is returned, and the error handlers of
+        the first request are used.
+
+        :param str file_path: The path of the CSV file.
+        :param str key_column: The column containing the keys.
+        :param str value_column: The column containing the values.
+        :param Optional[str] on_duplicate: :code:`E_KEEP_FIRST` or :code:`E_KEEP_LAST` to keep the first or last
+                                           value of a duplicate key, or None to call :code:`on_duplicate_key`.
+        :param str requester: Description of what requested the table, for display on console.
+        :param Callable[[str], None] on_missing_column: Called with the name of a column if the CSV file does not
+                                                        contain it. Expected to raise an exception.
+        :param Callable[[str], None] on_duplicate_key: Called with a key if it occurs more than once and duplicates
+                                                       are not allowed. Expected to raise an exception.
+        :return: The (as yet empty) table.
+        :rtype: dict[str, str]
+        """
+
+        return self.__request(
+            file_path,
+            ("dict", key_column, value_column, on_duplicate),
+            lambda: _DictRequest(key_column, value_column, on_duplicate, requester, on_missing_column,
+                                 on_duplicate_key),
+            requester
+        )
+
+    def request_set(self, file_path, column, requester, on_missing_column):
+        """
+        Request a :code:`set` of the values of a column of a CSV file.
+
+        If the same table has already been requested, the same :code:`set` is returned, and the error handler of
+        the first request is used.
+
+        :param str file_path: The path of the CSV file.
+        :param str column: The column.
+        :param str requester: Description of what requested the table, for display on console.
+        :param Callable[[str], None] on_missing_column: Called with the name of the column if the CSV file does not
+                                                        contain it. Expected to raise an exception.
+        :return: The (as yet empty) table.
+        :rtype: set[str]
+        """
+
+        return self.__request(
+            file_path, ("set", column), lambda: _SetRequest(column, requester, on_missing_column), requester
+        )
+
+    def start(self):
+        """
+        Start filling in all tables requested so far, and from then on, start filling in each table as soon as it is
+        requested. CSV files are read concurrently in background threads, without progress bars. Call :code:`wait`
+        to wait for them to be done, or :code:`cancel` if the tables are no longer needed.
+        """
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(MAX_LOADING_THREADS)
+        while self.queued:
+            self.futures.append(self.executor.submit(self.__run_load, self.queued.pop(0), False))
+
+    def wait(self):
+        """
+        Wait for all tables to be filled in. Tables requested afterwards are only filled in by calling :code:`load`,
+        or :code:`start` and :code:`wait`, again.
+
+        :raises: Whatever exception the error handlers of a request raised. If more than one did, the exception for
+                 the file requested first is raised.
+        """
+
+        try:
+            while self.queued:
+                self.__run_load(self.queued.pop(0), True)
+            while self.futures:
+                self.futures.pop(0).result()
+        finally:
+            self.__stop()
+
+    def cancel(self):
+        """
+        Stop filling in tables, e.g., because the configuration turned out to be invalid. Files that are already
+        being read are finished, but any exception raised while reading them is ignored.
+        """
+
+        self.queued = []
+        self.__stop()
+
+    def load(self):
+        """
+        Fill in all tables requested so far, and wait for them to be done. Tables requested afterwards are only
+        filled in by calling :code:`load` again.
+        """
+
+        if len(self.queued) > 1:
+            self.start()
+        self.wait()
+
+    def __stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        self.futures = []
+        self.loads = OrderedDict()
+
+    def __run_load(self, load, show_progress):
+        with self.lock:
+            load.begun = True
+            requests = list(load.requests)
+        self.__load_file(load.file_path, requests, show_progress)
+
+    @staticmethod
+    def __load_file(file_path, requests, show_progress):
+        requesters = []
+        for request in requests:
+            requesters.extend([requester for requester in request.requesters if requester not in requesters])
+        progress_bar = ProgressBar(fileio.count_rows(file_path)) if show_progress else None
+        with fileio.open_csv_file(file_path) as f:
+            display.stdout('Parsing file "%s" for %s' % (file_path, ", ".join(requesters)))
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is not None:
+                for request in requests:
+                    request.prepare(header)
+                width = len(header)
+                for row in reader:
+                    if not row:
+                        continue
+                    if len(row) < width:
+                        row += [None] * (width - len(row))
+                    for request in requests:
+                        request.add(row)
+                    if progress_bar:
+                        progress_bar.increment()
+        if progress_bar:
+            progress_bar.close()
@@ -0,0 +1,65 @@
+"""
+Module containing a bounded cache that discards the least recently used entries first.
+"""
+
+from collections import OrderedDict
+
+
+class LruCache:
+    """
+    A cache holding at most a fixed number of entries, which counts how often a key was found.
+    """
+
+    MISSING = object()
+
+    def __init__(self, capacity):
+        """
+        Create an empty :code:`LruCache` object.
+
+        :param int capacity: The maximum number of entries. If 0, nothing is cached.
+        """
+
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Get the value cached for a key, and mark it as the most recently used.
+
+        :param Hashable key: The key.
+        :return: The value, or :code:`LruCache.MISSING` if the key is not cached.
+        :rtype: object
+        """
+
+        value = self.entries.get(key, LruCache.MISSING)
+        if value is LruCache.MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Cache a value for a key, discarding the least recently used entry if the cache is full.
+
+        :param Hashable key: The key.
+        :param object value: The value.
+        """
+
+        if self.capacity <= 0:
+            return
+        self.entries[key] = value
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def __contains__(self, key):
+        # Does not count as a hit or miss, nor change the order of the entries.
+        return key in self.entries
+
+    def __reduce__(self):
+        # Entries and counts are not carried over, e.g., into a cached configuration, so that the counts are for
+        # the current run.
+        return LruCache, (self.capacity,)
@@ -0,0 +1,153 @@
+"""
+Module for writing output that is partitioned into one file per value of a field.
+"""
+
+import csv
+import os
+from collections import OrderedDict
+from urllib.parse import quote
+
+
+DEFAULT_MAX_OPEN_FILES = 64
+
+
+def get_partition_file_name(field, value):
+    """
+    Get the name of the file that the rows with a certain value in the partition field should be written to.
+
+    Characters that are not safe for use in file names on all operating systems are percent-encoded, so that distinct
+    values always result in distinct file names (up to letter case).
+
+    E.g., field :code:`region` and value :code:`APAC` results in :code:`region=APAC.csv`.
+
+    :param str field: The name of the partition field.
+    :param str value: The value of the partition field.
+    :return: The file name.
+    :rtype: str
+    """
+
+    return "%s=%s.csv" % (quote(field, safe=" "), quote(value, safe=" "))
+
+
+def get_partition_file_pattern(field):
+    """
+    Get a shell-style wildcard pattern that matches the names of all files that partitions of a field may be written
+    to.
+
+    E.g., field :code:`region` results in :code:`region=*.csv`.
+
+    :param str field: The name of the partition field.
+    :return: The pattern.
+    :rtype: str
+    """
+
+    return "%s=*.csv" % quote(field, safe=" ")
+
+
+class PartitionedDictWriter:
+    """
+    A writer that behaves like a :code:`DictWriter`, but routes each rowdict to a CSV file in a directory according
+    to the value of a partition field.
+
+    Only a bounded number of files is kept open at any time. When the limit is reached, the least recently used file
+    is closed, and reopened for appending if rows for it come up again.
+    """
+
+    def __init__(self, directory, fieldnames, partition_field, max_open_files=DEFAULT_MAX_OPEN_FILES):
+        """
+        Create a :code:`PartitionedDictWriter` object.
+
+        :param str directory: The path of the directory to write the partition files to. Must exist.
+        :param list[str] fieldnames: The fields of the output files.
+        :param str partition_field: The field whose values the rowdicts should be partitioned by.
+        :param int max_open_files: The maximum number of partition files to keep open at the same time.
+        """
+
+        self.directory = directory
+        self.fieldnames = fieldnames
+        self.partition_field = partition_field
+        self.max_open_files = max_open_files
+        self.file_paths = OrderedDict()
+        self.open_files = OrderedDict()
+        self.taken_names = set()
+
+    def writeheader(self):
+        """
+        Does nothing, since the header is written to each partition file when it is created.
+        """
+
+    def writerow(self, rowdict):
+        """
+        Write a single rowdict to the file of its partition.
+
+        :param dict rowdict: The rowdict to write.
+        """
+
+        value = rowdict.get(self.partition_field, "")
+        self.__get_writer("" if value is None else str(value)).writerow(rowdict)
+
+    def writerows(self, rowdicts):
+        """
+        Write multiple rowdicts.
+
+        :param list[dict] rowdicts: The rowdicts to write.
+        """
+
+        for rowdict in rowdicts:
+            self.writerow(rowdict)
+
+    def get_file_paths(self):
+        """
+        Get the paths of the partition files written so far.
+
+        :return: The paths, in the order the partitions were first encountered.
+        :rtype: list[str]
+        """
+
+        return list(self.file_paths.values())
+
+    def flush(self):
+        """
+        Flush all open partition files.
+        """
+
+        for f, _ in self.open_files.values():
+            f.flush()
+
+    def close(self):
+        """
+        Close all open partition files.
+        """
+
+        while self.open_files:
+            _, (f, _) = self.open_files.popitem(last=False)
+            f.close()
+
+    def __make_file_path(self, value):
+        file_name = get_partition_file_name(self.partition_field, value)
+        base, ext = os.path.splitext(file_name)
+        counter = 1
+        # Values that only differ in letter case must not share a file on case-insensitive file systems.
+        while file_name.casefold() in self.taken_names:
+            counter += 1
+            file_name = "%s (%d)%s" % (base, counter, ext)
+        self.taken_names.add(file_name.casefold())
+        return os.path.join(self.directory, file_name)
+
+    def __get_writer(self, value):
+        if value in self.open_files:
+            self.open_files.move_to_end(value)
+            return self.open_files[value][1]
+        if len(self.open_files) >= self.max_open_files:
+            _, (f, _) = self.open_files.popitem(last=False)
+            f.close()
+        if value in self.file_paths:
+            f = open(self.file_paths[value], "a", newline="")
+            writer = csv.DictWriter(f, self.fieldnames)
+        else:
+            self.file_paths[value] = self.__make_file_path(value)
+            f = open(self.file_paths[value], "w", newline="")
+            writer = csv.DictWriter(f, self.fieldnames)
+            writer.writeheader()
+        self.open_files[value] = (f, writer)
+        return writer
@@ -15,3 +15,70 @@ def regexify(string):
     """
 
     return "^%s$" % re.escape(string)
+
+
+# Refers to a group by number (a backreference or a conditional), or by name, which would clash or change meaning
+# when combined with other patterns.
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+_DEFAULT_FLAGS = re.compile("").flags
+_MARKER_PREFIX = "_combined_"
+
+
+def is_combinable(pattern):
+    """
+    Indicates whether a compiled pattern keeps its meaning when embedded in a larger regular expression, i.e., it has
+    no flags of its own and does not refer to its groups. Patterns may be reported as not combinable when they are.
+
+    :param re.Pattern pattern: The pattern.
+    :return: True if the pattern can be combined with others, False otherwise.
+    :rtype: bool
+    """
+
+    return pattern.flags == _DEFAULT_FLAGS and not _GROUP_REFERENCE.search(pattern.pattern)
+
+
+class CombinedSearch:
+    """
+    Patterns combined into one regular expression, to find which of them is the first in the list that can be found
+    in a string, like calling :code:`re.search` with each of them in turn, but with the string scanned by the regular
+    expression engine rather than once per pattern from Python.
+    """
+
+    def __init__(self, patterns):
+        """
+        Create a :code:`CombinedSearch` object.
+
+        :param list[re.Pattern] patterns: The patterns. All must be combinable (see :code:`is_combinable`).
+        :raises: re.error if the patterns cannot be combined, e.g., because they have groups with the same name.
+        """
+
+        # Each alternative is followed by an empty group that marks it as found, as that group is always the last to
+        # be closed.
+        self.pattern = re.compile("|".join([
+            "(?:%s)(?P<%s%d>)" % (pattern.pattern, _MARKER_PREFIX, i) for i, pattern in enumerate(patterns)
+        ]))
+        self.positions = {
+            self.pattern.groupindex["%s%d" % (_MARKER_PREFIX, i)]: i for i in range(len(patterns))
+        }
+
+    def find(self, string):
+        """
+        Find the first pattern that can be found in a string.
+
+        :param str string: The string.
+        :return: The position of the pattern in the list, or None if none of them can be found.
+        :rtype: Optional[int]
+        """
+
+        # The leftmost match is of the first pattern that can be found at that point. Patterns before it may still be
+        # found further on, so the search goes on until none of them is.
+        match = self.pattern.search(string)
+        if match is None:
+            return None
+        found = self.positions[match.lastindex]
+        while found > 0 and match.start() < len(string):
+            match = self.pattern.search(string, match.start() + 1)
+            if match is None:
+                break
+            found = min(found, self.positions[match.lastindex])
+        return found
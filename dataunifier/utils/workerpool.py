@@ -0,0 +1,61 @@
+"""
+Module containing a pool of worker processes that is only started when it is first used.
+"""
+
+import multiprocessing
+
+
+class WorkerPool:
+    """
+    A pool of worker processes, for spreading CPU-bound work across processors.
+
+    The processes are started when the pool is first used, with an initializer that can hand them large objects
+    (such as a task and its rule index) once, rather than with every piece of work. Where processes are forked, the
+    objects are inherited without being copied up front.
+    """
+
+    def __init__(self, processes):
+        """
+        Create a :code:`WorkerPool` object.
+
+        :param int processes: The number of worker processes.
+        """
+
+        self.processes = processes
+        self.pool = None
+
+    def map_slices(self, function, items, initializer, initargs):
+        """
+        Call a function on contiguous slices of a list of items, one slice per worker process, and join the results.
+
+        :param Callable[[list], list] function: The function, which is given a slice and returns a result for each
+                                                item in it, in order. Must be defined at module level.
+        :param list items: The items.
+        :param Callable initializer: Called in each worker process when it is started. Must be defined at module
+                                     level.
+        :param tuple initargs: The arguments to the initializer. Only used when the processes are started.
+        :return: The results for all items, in the same order as the items.
+        :rtype: list
+        """
+
+        if not items:
+            return []
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes, initializer, initargs)
+        slice_size = -(-len(items) // self.processes)
+        slices = [items[i:i + slice_size] for i in range(0, len(items), slice_size)]
+        return [result for results in self.pool.map(function, slices, 1) for result in results]
+
+    def close(self):
+        """
+        Stop the worker processes, if they were started. They are started again if the pool is used again.
+        """
+
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __reduce__(self):
+        # Processes cannot be carried over, e.g., into a cached configuration, so a copy starts its own.
+        return WorkerPool, (self.processes,)
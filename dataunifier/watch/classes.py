@@ -0,0 +1,52 @@
+"""
+Classes pertaining to watching the input directory.
+"""
+
+import os
+
+from dataunifier.utils import fileio
+
+
+class DirectoryWatcher:
+    """
+    Detects files that are added to a directory, by comparing listings of the directory taken at each poll.
+
+    A new file is only reported once its size and modification time have stayed the same across two consecutive
+    polls, so that files that are still being written are not picked up too early. Each file is only reported once.
+    """
+
+    def __init__(self, directory, known_file_names):
+        """
+        Create a :code:`DirectoryWatcher` object.
+
+        :param str directory: The path of the directory to watch.
+        :param set[str] known_file_names: The names of files that should not be reported as new.
+        """
+
+        self.directory = directory
+        self.known_file_names = set(known_file_names)
+        self.pending = {}
+
+    def poll(self):
+        """
+        Look for new files in the directory.
+
+        :return: The sorted names of new files that have become stable since the previous poll.
+        :rtype: list[str]
+        """
+
+        snapshot = {}
+        for file_name in fileio.get_file_names(self.directory):
+            if file_name in self.known_file_names:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                continue
+            snapshot[file_name] = (stat.st_size, stat.st_mtime_ns)
+        ready = sorted([file_name for file_name, stat in snapshot.items() if self.pending.get(file_name) == stat])
+        self.known_file_names.update(ready)
+        self.pending = {
+            file_name: stat for file_name, stat in snapshot.items() if file_name not in self.known_file_names
+        }
+        return ready
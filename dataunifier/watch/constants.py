@@ -0,0 +1,5 @@
+"""
+Constants pertaining to watching the input directory.
+"""
+
+DEFAULT_POLL_INTERVAL = 5.0
@@ -0,0 +1,81 @@
+"""
+Module for watching the input directory and handling input files as they are added.
+"""
+
+import os
+import time
+
+from dataunifier.common.exceptions import ExceptionWithMessage
+from dataunifier.config import config
+from dataunifier.parse import parse
+from dataunifier.parse.classes import SpooledWriter
+from dataunifier.utils import display, fileio
+from dataunifier.watch.classes import DirectoryWatcher
+from dataunifier.watch.constants import DEFAULT_POLL_INTERVAL
+
+
+def handle_new_files(config_ctxt, writer, file_names):
+    """
+    Parse, transform and write files that were added to the input directory.
+
+    Files are handled one at a time. The rows of a file are only written once the whole file has been handled
+    successfully; if an error occurs, it is shown, none of the rows of the file are written, and the next file is
+    handled.
+
+    :param ConfigContext config_ctxt: The configuration context.
+    :param csv.DictWriter writer: The DictWriter to use to write.
+    :param list[str] file_names: The names of the new files in the input directory.
+    :return: The number of files whose rows were written.
+    :rtype: int
+    """
+
+    handled = 0
+    for file_name in file_names:
+        spool = SpooledWriter()
+        try:
+            read_paths = parse.parse_files(config_ctxt, spool, [file_name])
+        except ExceptionWithMessage as e:
+            spool.close()
+            display.error(str(e))
+            continue
+        if not read_paths:
+            spool.close()
+            display.stdout('Ignoring new file "%s", as it does not match any input file.' % file_name)
+            continue
+        spool.replay(writer)
+        handled += 1
+    return handled
+
+
+def start(config_ctxt, writer, flush, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    Parse, transform and write all input files, then keep watching the input directory for new files and handle
+    them as they are added, until interrupted (e.g., with Ctrl+C).
+
+    The configuration, including loaded lookup files, is kept in memory throughout, and the rows of new files are
+    appended to the same output. The tasks are closed when watching stops. Input files that do not match any file yet
+    are not an error, but are handled once a matching file is added.
+
+    :param ConfigContext config_ctxt: The configuration context.
+    :param csv.DictWriter writer: The DictWriter to use to write.
+    :param Callable[[], None] flush: A function that flushes the output, called whenever new rows were written.
+    :param float poll_interval: The number of seconds to wait between looking for new files.
+    """
+
+    existing_file_names = fileio.get_file_names(config_ctxt.input_dir)
+    read_paths = parse.parse_files(config_ctxt, writer, existing_file_names)
+    flush()
+    watcher = DirectoryWatcher(
+        config_ctxt.input_dir, set(existing_file_names) | {os.path.basename(path) for path in read_paths}
+    )
+    display.stdout('Watching input directory "%s" for new files. Press Ctrl+C to stop.' % config_ctxt.input_dir)
+    try:
+        while True:
+            time.sleep(poll_interval)
+            if handle_new_files(config_ctxt, writer, watcher.poll()):
+                flush()
+    except KeyboardInterrupt:
+        display.stdout()
+        display.stdout("Stopped watching.")
+    finally:
+        config.close_tasks(config_ctxt.filesets)
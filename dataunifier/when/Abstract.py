@@ -10,6 +10,13 @@ class AbstractWhen(abc.ABC):
     Abstract base class for a :code:`when` object.
     """
 
+    # Set on :code:`when` objects that are shared by several tasks, to remember their last result (see
+    # :code:`whenrouter.WhenInterner`).
+    memo = None
+    # Set on :code:`and` and :code:`or` objects whose conditions are to be reordered by how cheaply they decide the
+    # result (see :code:`codegen.AdaptiveOrder`).
+    adaptive = None
+
     @abc.abstractmethod
     def evaluate(self, row_ctxt):
         """
@@ -20,6 +27,45 @@ class AbstractWhen(abc.ABC):
         :rtype: bool
         """
 
+    def compile(self, slots):
+        """
+        Compile the :code:`when` object for rows that are represented as lists of values instead of rowdicts.
+
+        The compiled function is called with the list of values and the row context, and returns the same as
+        :code:`evaluate`.
+
+        :param dict[str, int] slots: The position of each field in the lists of values.
+        :return: The compiled function, or None if only row context objects can be evaluated.
+        :rtype: Optional[Callable[[list, ParseRowContext], bool]]
+        """
+
+        return None
+
+    def get_fields(self):
+        """
+        Get the fields whose values the :code:`when` object reads. Its result must depend on nothing else.
+
+        :return: The fields, or None if they are not known, or the result may depend on something else.
+        :rtype: Optional[list[str]]
+        """
+
+        return None
+
+    def get_expression(self, source):
+        """
+        Get a Python expression that evaluates the :code:`when` object, for use in a function compiled by
+        :code:`codegen.compile_when`.
+
+        The expression refers to the row as :code:`values`, and to its row context as :code:`row_ctxt`.
+
+        :param WhenSource source: The source of the compiled function, which gives expressions for field values, and
+                                  names for the objects the expression refers to.
+        :return: The expression, or None if the :code:`when` object is to be called as it is.
+        :rtype: Optional[str]
+        """
+
+        return None
+
 
 class AbstractRegularWhen(AbstractWhen):
     """
@@ -46,3 +92,14 @@ class AbstractRegularWhen(AbstractWhen):
         :return: The set of YAML keys.
         :rtype: set[str]
         """
+
+    @classmethod
+    def get_optional_key_set(cls):
+        """
+        Get the set of YAML keys that may be given in addition to those of :code:`get_key_set`.
+
+        :return: The set of YAML keys.
+        :rtype: set[str]
+        """
+
+        return set()
@@ -2,6 +2,7 @@
 Module for the :code:`And` class.
 """
 
+from dataunifier.when import codegen
 from dataunifier.when.Abstract import AbstractWhen
 
 
@@ -19,6 +20,7 @@ class And(AbstractWhen):
 
         super(And, self).__init__()
         self.when_list = when_list
+        self.evaluate_rowdict = None
 
     def __eq__(self, other):
         if other is None:
@@ -29,8 +31,32 @@ class And(AbstractWhen):
             self.when_list == other.when_list
         ])
 
+    def __reduce__(self):
+        # The compiled function cannot be pickled, e.g., into a cached configuration, so it is compiled anew.
+        return And, (self.when_list,), {"memo": self.memo, "adaptive": self.adaptive}
+
+    def __str__(self):
+        return "And(%s)" % self.when_list
+
+    def __repr__(self):
+        return str(self)
+
     def evaluate(self, row_ctxt):
-        for when in self.when_list:
-            if not when.evaluate(row_ctxt):
-                return False
-        return True
+        if self.evaluate_rowdict is None:
+            self.evaluate_rowdict = codegen.compile_when(self, None)
+        return self.evaluate_rowdict(row_ctxt.rowdict, row_ctxt)
+
+    def compile(self, slots):
+        return codegen.compile_when(self, slots)
+
+    def get_fields(self):
+        field_lists = [when.get_fields() for when in self.when_list]
+        if None in field_lists:
+            return None
+        return list(dict.fromkeys([field for fields in field_lists for field in fields]))
+
+    def get_expression(self, source):
+        expression_list = [source.get_expression(when) for when in self.when_list]
+        if not expression_list:
+            return "True"
+        return "(%s)" % " and ".join(expression_list)
@@ -2,6 +2,7 @@
 Module for the :code:`Not` class.
 """
 
+from dataunifier.when import codegen
 from dataunifier.when.Abstract import AbstractWhen
 
 
@@ -19,6 +20,7 @@ class Not(AbstractWhen):
 
         super(Not, self).__init__()
         self.when = when
+        self.evaluate_rowdict = None
 
     def __eq__(self, other):
         if other is None:
@@ -29,5 +31,26 @@ class Not(AbstractWhen):
             self.when == other.when
         ])
 
+    def __reduce__(self):
+        # The compiled function cannot be pickled, e.g., into a cached configuration, so it is compiled anew.
+        return Not, (self.when,), {"memo": self.memo}
+
+    def __str__(self):
+        return "Not(%s)" % self.when
+
+    def __repr__(self):
+        return str(self)
+
     def evaluate(self, row_ctxt):
-        return not self.when.evaluate(row_ctxt)
+        if self.evaluate_rowdict is None:
+            self.evaluate_rowdict = codegen.compile_when(self, None)
+        return self.evaluate_rowdict(row_ctxt.rowdict, row_ctxt)
+
+    def compile(self, slots):
+        return codegen.compile_when(self, slots)
+
+    def get_fields(self):
+        return self.when.get_fields()
+
+    def get_expression(self, source):
+        return "(not %s)" % source.get_expression(self.when)
@@ -4,12 +4,57 @@ Module for the :code:`WhenFieldMatchesRegex` class.
 
 import re
 
-from dataunifier.common.exceptions import TransformationException
+from dataunifier.common.exceptions import ConfigException, TransformationException
 from dataunifier.utils import confighelper
+from dataunifier.utils.lrucache import LruCache
+from dataunifier.utils.regex import is_combinable
 from dataunifier.when.Abstract import AbstractRegularWhen
 
 K_VALUE_OF_FIELD = "value_of_field"
 K_MATCHES_REGEX = "matches_regex"
+K_CACHE_SIZE = "cache_size"
+
+DEFAULT_CACHE_SIZE = 0
+
+
+def _check_regex_list(regex_list_ctxt):
+    for regex_ctxt in regex_list_ctxt.value:
+        try:
+            re.compile(regex_ctxt.value)
+        except re.error as e:
+            msg = 'Invalid regular expression at key "%s": "%s". Details: "%s" (File "%s")' % (
+                regex_ctxt.key_path, regex_ctxt.value, str(e), regex_ctxt.current_file
+            )
+            raise ConfigException(msg)
+
+
+def _get_cache_size(when_parsing_context):
+    cache_size_ctxt = confighelper.get_literal(when_parsing_context, K_CACHE_SIZE, False)
+    if cache_size_ctxt is None:
+        return DEFAULT_CACHE_SIZE
+    try:
+        cache_size = int(cache_size_ctxt.value)
+        if cache_size < 0:
+            raise ValueError
+        return cache_size
+    except ValueError:
+        raise ConfigException('Invalid value for key "%s": "%s". Must be an integer not less than 0. (File "%s")' % (
+            cache_size_ctxt.key_path, cache_size_ctxt.value, cache_size_ctxt.current_file
+        ))
+
+
+def _get_pattern_list(regex_list):
+    # The patterns that can be combined are fused into one alternation, which matches a value against all of them in
+    # one call. The others are tried one by one.
+    pattern_list = [re.compile(regex) for regex in regex_list]
+    combinable = [pattern for pattern in pattern_list if is_combinable(pattern)]
+    if len(combinable) < 2:
+        return pattern_list
+    try:
+        fused = re.compile("|".join(["(?:%s)" % pattern.pattern for pattern in combinable]))
+    except re.error:
+        return pattern_list
+    return [fused] + [pattern for pattern in pattern_list if not is_combinable(pattern)]
 
 
 class WhenFieldMatchesRegex(AbstractRegularWhen):
@@ -21,23 +66,33 @@ class WhenFieldMatchesRegex(AbstractRegularWhen):
     def create_from_config(cls, when_parsing_context):
         field_name = confighelper.get_literal(when_parsing_context, K_VALUE_OF_FIELD, True).value
         regex_list_ctxt = confighelper.get_literal_list(when_parsing_context, K_MATCHES_REGEX, True)
+        _check_regex_list(regex_list_ctxt)
         regex_list = [ctxt.value for ctxt in regex_list_ctxt.value]
-        return WhenFieldMatchesRegex(field_name, regex_list)
+        cache_size = _get_cache_size(when_parsing_context)
+        return WhenFieldMatchesRegex(field_name, regex_list, cache_size)
 
     @classmethod
     def get_key_set(cls):
         return {K_VALUE_OF_FIELD, K_MATCHES_REGEX}
 
-    def __init__(self, field_name, regex_list):
+    @classmethod
+    def get_optional_key_set(cls):
+        return {K_CACHE_SIZE}
+
+    def __init__(self, field_name, regex_list, cache_size=DEFAULT_CACHE_SIZE):
         """
         Create a :code:`WhenFieldMatchesRegex` object.
 
         :param str field_name: The name of the field to check.
         :param list[str] regex_list: A list of regular expressions to check against.
+        :param int cache_size: The number of distinct values whose result is remembered. If 0, nothing is cached.
         """
 
         self.field_name = field_name
         self.regex_list = regex_list
+        self.cache_size = cache_size
+        self.pattern_list = _get_pattern_list(regex_list)
+        self.cache = LruCache(cache_size) if cache_size > 0 else None
         super(WhenFieldMatchesRegex, self).__init__()
 
     def __str__(self):
@@ -48,11 +103,56 @@ class WhenFieldMatchesRegex(AbstractRegularWhen):
     def __repr__(self):
         return str(self)
 
+    def __matches(self, value):
+        for pattern in self.pattern_list:
+            if pattern.fullmatch(value):
+                return True
+        return False
+
+    def matches(self, value):
+        """
+        Check whether a value fully matches any of the regular expressions.
+
+        :param str value: The value.
+        :return: True if the value matches, False otherwise.
+        :rtype: bool
+        """
+
+        if self.cache is None:
+            return self.__matches(value)
+        result = self.cache.get(value)
+        if result is LruCache.MISSING:
+            result = self.__matches(value)
+            self.cache.put(value, result)
+        return result
+
     def evaluate(self, row_ctxt):
         if self.field_name not in row_ctxt.rowdict:
             raise TransformationException('Could not find field "%s".' % self.field_name)
         value = row_ctxt.rowdict[self.field_name]
-        return any([bool(re.fullmatch(regex, value)) for regex in self.regex_list])
+        if self.memo is None:
+            return self.matches(value)
+        if value == self.memo.key:
+            return self.memo.result
+        return self.memo.store(value, self.matches(value))
+
+    def compile(self, slots):
+        if self.field_name not in slots:
+            return None
+        index = slots[self.field_name]
+        matches = self.matches
+        return lambda values, row_ctxt: matches(values[index])
+
+    def get_fields(self):
+        return [self.field_name]
+
+    def get_expression(self, source):
+        value = source.get_field(self.field_name)
+        if value is None:
+            return None
+        if self.cache is None and len(self.pattern_list) == 1:
+            return "(%s(%s) is not None)" % (source.bind(self.pattern_list[0].fullmatch), value)
+        return "%s(%s)" % (source.bind(self.matches), value)
 
     def __eq__(self, other):
         if other is None:
@@ -61,5 +161,6 @@ class WhenFieldMatchesRegex(AbstractRegularWhen):
             return False
         return all([
             self.field_name == other.field_name,
-            self.regex_list == other.regex_list
+            self.regex_list == other.regex_list,
+            self.cache_size == other.cache_size
         ])
@@ -0,0 +1,393 @@
+"""
+Module for compiling trees of :code:`when` objects into single Python functions.
+
+A tree of :code:`And`, :code:`Or` and :code:`Not` objects is evaluated by a call per node, for every row and every
+task. Instead, each :code:`when` object that supports it contributes a Python expression through
+:code:`AbstractWhen.get_expression`, and the expressions are joined into the source of one function, with the field
+lookups and regular expression checks inlined, and the short-circuiting of :code:`and` and :code:`or` left to Python.
+Other :code:`when` objects are called from that function as they are, through :code:`compile` if possible.
+
+A :code:`when` object that is shared by several tasks has a :code:`WhenMemo`, and its expression is only evaluated
+again if the fields it reads have changed since it was last evaluated, e.g., because a task in between wrote one of
+them.
+
+An :code:`and` or :code:`or` object with an :code:`AdaptiveOrder` is evaluated by an :code:`AdaptiveEvaluator`
+instead, which times each of its conditions over the first rows, and then evaluates them in the order that is expected
+to be the cheapest.
+"""
+
+import time
+
+from dataunifier.common.exceptions import TransformationException
+
+FUNCTION_NAME = "evaluate"
+
+# Equal to no key, so that an empty memo is never used.
+_NO_KEY = object()
+
+
+def _raise_missing_field(field):
+    raise TransformationException('Could not find field "%s".' % field)
+
+
+class WhenMemo:
+    """
+    The last result of a :code:`when` object, with the values of the fields it read.
+    """
+
+    def __init__(self):
+        """
+        Create an empty :code:`WhenMemo` object.
+        """
+
+        self.key = _NO_KEY
+        self.result = None
+
+    def store(self, key, result):
+        """
+        Remember the result of a :code:`when` object.
+
+        :param object key: The value of the field the :code:`when` object read, or a tuple of the values of the fields,
+                           in the order of :code:`get_fields`.
+        :param bool result: The result.
+        :return: The result.
+        :rtype: bool
+        """
+
+        self.key = key
+        self.result = result
+        return result
+
+    def __reduce__(self):
+        # The last result is not carried over, e.g., into a cached configuration.
+        return WhenMemo, ()
+
+
+class AdaptiveOrder:
+    """
+    The statistics of the conditions of an :code:`and` or :code:`or` object over the first rows, and the order they are
+    evaluated in once enough rows have been sampled.
+    """
+
+    def __init__(self, sample_size, stops_on):
+        """
+        Create an :code:`AdaptiveOrder` object.
+
+        :param int sample_size: The number of rows to sample before ordering the conditions.
+        :param bool stops_on: The result of a condition on which the evaluation stops, i.e., False for :code:`and`
+                              and True for :code:`or`.
+        """
+
+        self.sample_size = sample_size
+        self.stops_on = stops_on
+        self.rows = 0
+        self.counts = {}
+        self.passes = {}
+        self.times = {}
+        self.order = None
+        self.row_parent = None
+        self.row_numbers = set()
+
+    def start_row(self, row_ctxt):
+        """
+        Start sampling a row, unless it was already sampled through another use of the :code:`and` or :code:`or`
+        object, e.g., by another task that shares it. Each row is only sampled once, so that the statistics count
+        rows, not uses.
+
+        :param ParseRowContext row_ctxt: The context of the row.
+        :return: True if the row is to be sampled, False if it was already sampled.
+        :rtype: bool
+        """
+
+        # All uses of the object are done with a row, or a chunk of rows, before the rows of another file come up.
+        if row_ctxt.parent is not self.row_parent:
+            self.row_parent = row_ctxt.parent
+            self.row_numbers = set()
+        if row_ctxt.row_number in self.row_numbers:
+            return False
+        self.row_numbers.add(row_ctxt.row_number)
+        return True
+
+    def record(self, i, result, elapsed):
+        """
+        Record an evaluation of a condition.
+
+        :param int i: The position of the condition in the configuration.
+        :param bool result: The result of the condition.
+        :param float elapsed: The time taken, in seconds.
+        """
+
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.passes[i] = self.passes.get(i, 0) + (1 if result else 0)
+        self.times[i] = self.times.get(i, 0.0) + elapsed
+
+    def get_cost(self, i):
+        """
+        Get the expected time spent on a condition for each time the evaluation stops on it, which is the lowest for
+        the condition that should be evaluated first.
+
+        :param int i: The position of the condition in the configuration.
+        :return: The expected time, in seconds, or infinity if the condition was never seen to stop the evaluation.
+        :rtype: float
+        """
+
+        count = self.counts.get(i, 0)
+        stops = self.passes.get(i, 0) if self.stops_on else count - self.passes.get(i, 0)
+        if not stops:
+            return float("inf")
+        return self.times[i] / stops
+
+    def finish_row(self, size):
+        """
+        Count a sampled row, and order the conditions if enough rows have been sampled.
+
+        :param int size: The number of conditions.
+        """
+
+        self.rows += 1
+        if self.order is None and self.rows >= self.sample_size:
+            # Sorting is stable, so conditions that are as cheap keep their order in the configuration.
+            self.order = sorted(range(size), key=self.get_cost)
+            self.row_parent = None
+            self.row_numbers = set()
+
+    def get_summary(self, description, when_list):
+        """
+        Get the order chosen for the conditions and their statistics, for display on console when the run is done.
+
+        :param str description: Where the :code:`and` or :code:`or` object is used, e.g., the name of a task.
+        :param list[AbstractWhen] when_list: The conditions.
+        :return: Lines of text.
+        :rtype: list[str]
+        """
+
+        if self.order is None:
+            lines = ["Condition in %s: order kept, as only %d of %d rows were sampled." % (
+                description, self.rows, self.sample_size
+            )]
+        else:
+            lines = ["Condition in %s: conditions evaluated in the order %s after sampling %d rows." % (
+                description, ", ".join([str(i + 1) for i in self.order]), self.rows
+            )]
+        for i, when in enumerate(when_list):
+            count = self.counts.get(i, 0)
+            if not count:
+                lines.append("  %d. %s: never evaluated." % (i + 1, when))
+                continue
+            lines.append("  %d. %s: true for %.1f%% of %d rows, %.2f us per row." % (
+                i + 1, when, 100.0 * self.passes[i] / count, count, 1000000 * self.times[i] / count
+            ))
+        return lines
+
+    def __reduce__(self):
+        # The statistics are not carried over, e.g., into a cached configuration.
+        return AdaptiveOrder, (self.sample_size, self.stops_on)
+
+
+class AdaptiveEvaluator:
+    """
+    Evaluates an :code:`and` or :code:`or` object with an :code:`AdaptiveOrder` for rows that are lists of values.
+
+    While sampling, the conditions are evaluated in the order of the configuration, and the result is found as usual.
+    The conditions after the one the evaluation stops on are still evaluated, only to record their statistics, which
+    is why all of them must read nothing but fields of the row. A row that was already sampled through another use of
+    the object is evaluated without recording statistics. Once the order is chosen, :code:`evaluate` is replaced
+    by a compiled function that evaluates the conditions in that order.
+    """
+
+    def __init__(self, when, slots):
+        """
+        Create an :code:`AdaptiveEvaluator` object.
+
+        :param And | Or when: The :code:`and` or :code:`or` object.
+        :param dict[str, int] slots: The position of each field in the lists of values.
+        """
+
+        self.when = when
+        self.slots = slots
+        self.evaluate_list = [compile_when(inner, slots) for inner in when.when_list]
+        self.evaluate = self.__sample
+
+    def __sample(self, values, row_ctxt):
+        adaptive = self.when.adaptive
+        if adaptive.order is not None:
+            self.evaluate = self.__compile_ordered(adaptive.order)
+            return self.evaluate(values, row_ctxt)
+        stops_on = adaptive.stops_on
+        if not adaptive.start_row(row_ctxt):
+            for evaluate in self.evaluate_list:
+                if bool(evaluate(values, row_ctxt)) == stops_on:
+                    return stops_on
+            return not stops_on
+        result = not stops_on
+        for i, evaluate in enumerate(self.evaluate_list):
+            started = time.perf_counter()
+            if result == stops_on:
+                try:
+                    inner_result = bool(evaluate(values, row_ctxt))
+                except Exception:  # pylint: disable=broad-except
+                    # Only evaluated for the statistics, so it must not fail the row.
+                    continue
+            else:
+                inner_result = bool(evaluate(values, row_ctxt))
+                if inner_result == stops_on:
+                    result = stops_on
+            adaptive.record(i, inner_result, time.perf_counter() - started)
+        adaptive.finish_row(len(self.evaluate_list))
+        return result
+
+    def __compile_ordered(self, order):
+        source = WhenSource(self.slots)
+        expression_list = [source.get_expression(self.when.when_list[i]) for i in order]
+        stops_on = self.when.adaptive.stops_on
+        expression = "(%s)" % (" or " if stops_on else " and ").join(expression_list) if order else str(not stops_on)
+        return _compile(source, expression, type(self.when).__name__)
+
+    @staticmethod
+    def is_applicable(when, slots):
+        """
+        Check whether the conditions of an :code:`and` or :code:`or` object can be evaluated in any order, i.e., they
+        read nothing but fields that are in the lists of values.
+
+        :param And | Or when: The :code:`and` or :code:`or` object.
+        :param Optional[dict[str, int]] slots: The position of each field in the lists of values, or None if the rows
+                                               are rowdicts.
+        :return: True if they can be evaluated in any order, False otherwise.
+        :rtype: bool
+        """
+
+        if slots is None:
+            return False
+        fields = when.get_fields()
+        return fields is not None and all([field in slots for field in fields])
+
+
+class WhenSource:
+    """
+    The source of a compiled :code:`when` function, and the objects it refers to.
+
+    The compiled function takes the row, as a list of values or a rowdict, and its row context, which the
+    expressions refer to as :code:`values` and :code:`row_ctxt`.
+    """
+
+    def __init__(self, slots):
+        """
+        Create a :code:`WhenSource` object.
+
+        :param Optional[dict[str, int]] slots: The position of each field in the lists of values, or None if the rows
+                                               are rowdicts.
+        """
+
+        self.slots = slots
+        self.namespace = {}
+
+    def bind(self, obj):
+        """
+        Make an object available to the compiled function.
+
+        :param object obj: The object, e.g., a function or compiled pattern.
+        :return: The name by which expressions refer to the object.
+        :rtype: str
+        """
+
+        name = "_%d" % len(self.namespace)
+        self.namespace[name] = obj
+        return name
+
+    def get_field(self, field):
+        """
+        Get an expression for the value of a field of the row, which raises the same
+        :code:`TransformationException` as :code:`evaluate` if the field is missing from a rowdict.
+
+        :param str field: The field.
+        :return: The expression, or None if the rows are lists of values without the field.
+        :rtype: Optional[str]
+        """
+
+        if self.slots is None:
+            return "(values[%r] if %r in values else %s(%r))" % (
+                field, field, self.bind(_raise_missing_field), field
+            )
+        if field not in self.slots:
+            return None
+        return "values[%d]" % self.slots[field]
+
+    def get_key(self, fields):
+        """
+        Get an expression for the key of a :code:`WhenMemo`, i.e., the value of a field, or a tuple of the values of
+        fields. Fields missing from a rowdict are taken to be None, as the result cannot depend on them if it was
+        found without raising an exception.
+
+        :param list[str] fields: The fields.
+        :return: The expression, or None if the rows are lists of values without some of the fields.
+        :rtype: Optional[str]
+        """
+
+        if self.slots is None:
+            values = ["values.get(%r)" % field for field in fields]
+        elif all([field in self.slots for field in fields]):
+            values = ["values[%d]" % self.slots[field] for field in fields]
+        else:
+            return None
+        if len(values) == 1:
+            return values[0]
+        return "(%s)" % "".join(["%s, " % value for value in values])
+
+    def __get_plain_expression(self, when):
+        if when.adaptive is not None and AdaptiveEvaluator.is_applicable(when, self.slots):
+            return "%s.evaluate(values, row_ctxt)" % self.bind(AdaptiveEvaluator(when, self.slots))
+        expression = when.get_expression(self)
+        if expression is not None:
+            return expression
+        if self.slots is None:
+            return "%s(row_ctxt)" % self.bind(when.evaluate)
+        evaluate = when.compile(self.slots)
+        if evaluate is not None:
+            return "%s(values, row_ctxt)" % self.bind(evaluate)
+        # Only row context objects can be evaluated, so the list of values is converted to a rowdict.
+        return "%s(row_ctxt.with_updated_rowdict(dict(zip(%s, values))))" % (
+            self.bind(when.evaluate), self.bind(list(self.slots))
+        )
+
+    def get_expression(self, when):
+        """
+        Get an expression that evaluates a :code:`when` object.
+
+        :param AbstractWhen when: The :code:`when` object.
+        :return: The expression.
+        :rtype: str
+        """
+
+        expression = self.__get_plain_expression(when)
+        fields = when.get_fields() if when.memo is not None else None
+        key = self.get_key(fields) if fields else None
+        if key is None:
+            return expression
+        memo = self.bind(when.memo)
+        return "(%s.result if (_key%s := %s) == %s.key else %s.store(_key%s, %s))" % (
+            memo, memo, key, memo, memo, memo, expression
+        )
+
+
+def compile_when(when, slots):
+    """
+    Compile a :code:`when` object, with any :code:`when` objects in it, into a single function.
+
+    The compiled function is called with the row and its row context, and returns the same as :code:`evaluate`.
+
+    :param AbstractWhen when: The :code:`when` object.
+    :param Optional[dict[str, int]] slots: The position of each field in the lists of values, or None if the rows
+                                           are rowdicts.
+    :return: The compiled function.
+    :rtype: Callable[[list | dict, ParseRowContext], bool]
+    """
+
+    source = WhenSource(slots)
+    return _compile(source, source.get_expression(when), type(when).__name__)
+
+
+def _compile(source, expression, label):
+    code = "def %s(values, row_ctxt):\n    return %s\n" % (FUNCTION_NAME, expression)
+    namespace = dict(source.namespace)
+    exec(compile(code, "<when %s>" % label, "exec"), namespace)  # pylint: disable=exec-used
+    return namespace[FUNCTION_NAME]
@@ -4,7 +4,9 @@ import unittest
 from dataunifier.cmdline import cmdline
 from dataunifier.cmdline.classes import CommandLineContext
 from dataunifier.cmdline.constants import INPUT_DIR_OPTION_STUB, DEFAULT_INPUT_DIR, OUTPUT_OPTION_STUB, \
-    DEFAULT_OUTPUT_FILE_PATH, FORCE_OPTION
+    DEFAULT_OUTPUT_FILE_PATH, FORCE_OPTION, PARTITION_BY_OPTION_STUB, STDIN_AS_OPTION_STUB, STDOUT_OUTPUT_FILE_PATH, \
+    WATCH_OPTION, CACHE_DIR_OPTION_STUB, ADAPTIVE_CONDITIONS_OPTION, ADAPTIVE_CONDITIONS_OPTION_STUB, \
+    DEFAULT_ADAPTIVE_SAMPLE_SIZE
 from dataunifier.common.exceptions import SyntaxException, CommandLineException
 
 from tests import constants as testconstants
@@ -52,6 +54,90 @@ class TestGetOutputFile(unittest.TestCase):
         self.assertEqual(correct1, output1)
 
 
+class TestGetPartitionField(unittest.TestCase):
+    def test_specified(self):
+        input1 = {f"{FORCE_OPTION}", f"{PARTITION_BY_OPTION_STUB}region", "--some-other-option=no"}
+        correct1 = "region"
+        output1 = cmdline.get_partition_field(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_unspecified(self):
+        input1 = {f"{FORCE_OPTION}", "--some-other-option=no"}
+        output1 = cmdline.get_partition_field(input1)
+        self.assertIsNone(output1)
+
+
+class TestGetStdinInputFile(unittest.TestCase):
+    def test_specified(self):
+        input1 = {f"{FORCE_OPTION}", f"{STDIN_AS_OPTION_STUB}Input CSV", "--some-other-option=no"}
+        correct1 = "Input CSV"
+        output1 = cmdline.get_stdin_input_file(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_unspecified(self):
+        input1 = {f"{FORCE_OPTION}", "--some-other-option=no"}
+        output1 = cmdline.get_stdin_input_file(input1)
+        self.assertIsNone(output1)
+
+
+class TestGetCacheDir(unittest.TestCase):
+    def test_specified(self):
+        input1 = {f"{FORCE_OPTION}", f"{CACHE_DIR_OPTION_STUB}path/to/cache", "--some-other-option=no"}
+        correct1 = "path/to/cache"
+        output1 = cmdline.get_cache_dir(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_unspecified(self):
+        input1 = {f"{FORCE_OPTION}", "--some-other-option=no"}
+        output1 = cmdline.get_cache_dir(input1)
+        self.assertIsNone(output1)
+
+
+class TestGetAdaptiveSampleSize(unittest.TestCase):
+    def test_specified(self):
+        input1 = {f"{FORCE_OPTION}", f"{ADAPTIVE_CONDITIONS_OPTION_STUB}500"}
+        correct1 = 500
+        output1 = cmdline.get_adaptive_sample_size(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_default(self):
+        input1 = {f"{FORCE_OPTION}", f"{ADAPTIVE_CONDITIONS_OPTION}"}
+        correct1 = DEFAULT_ADAPTIVE_SAMPLE_SIZE
+        output1 = cmdline.get_adaptive_sample_size(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_unspecified(self):
+        input1 = {f"{FORCE_OPTION}", "--some-other-option=no"}
+        output1 = cmdline.get_adaptive_sample_size(input1)
+        self.assertIsNone(output1)
+
+    def test_invalid(self):
+        for value in ["0", "-1", "many"]:
+            try:
+                cmdline.get_adaptive_sample_size({f"{ADAPTIVE_CONDITIONS_OPTION_STUB}{value}"})
+                self.fail()
+            except CommandLineException as e:
+                correct1 = 'Invalid number of rows to sample for "%s": "%s". Must be an integer more than 0.' % (
+                    ADAPTIVE_CONDITIONS_OPTION, value
+                )
+                output1 = e.message
+                self.assertEqual(correct1, output1)
+
+
+class TestGetPartitionDir(unittest.TestCase):
+    def test_with_extension(self):
+        input1 = os.path.join("path", "to", "output.csv")
+        correct1 = os.path.join("path", "to", "output")
+        output1 = cmdline.get_partition_dir(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_without_extension(self):
+        input1 = os.path.join("path", "to", "output") + os.path.sep
+        correct1 = os.path.join("path", "to", "output")
+        output1 = cmdline.get_partition_dir(input1)
+        self.assertEqual(correct1, output1)
+
+
 class TestGetContext(unittest.TestCase):
     def test_successful_with_options(self):
         input1 = [
@@ -81,6 +167,173 @@ class TestGetContext(unittest.TestCase):
         output1 = cmdline.get_context(input1)
         self.assertEqual(correct1, output1)
 
+    def test_successful_with_partition(self):
+        input1 = [
+            "run.py",
+            f"{INPUT_DIR_OPTION_STUB}{testconstants.TESTINPUT_PATH}",
+            f"{OUTPUT_OPTION_STUB}{testconstants.TESTOUTPUT_PATH}",
+            f"{PARTITION_BY_OPTION_STUB}region",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        correct1 = CommandLineContext(
+            testconstants.TESTINPUT_PATH,
+            testconstants.TESTOUTPUT_PATH,
+            False,
+            testconstants.TESTCONFIG_PATH,
+            partition_field="region"
+        )
+        output1 = cmdline.get_context(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_successful_with_stdio(self):
+        input1 = [
+            "run.py",
+            f"{OUTPUT_OPTION_STUB}{STDOUT_OUTPUT_FILE_PATH}",
+            f"{STDIN_AS_OPTION_STUB}Input CSV",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        correct1 = CommandLineContext(
+            DEFAULT_INPUT_DIR,
+            STDOUT_OUTPUT_FILE_PATH,
+            False,
+            testconstants.TESTCONFIG_PATH,
+            stdin_input_file="Input CSV"
+        )
+        output1 = cmdline.get_context(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_successful_with_watch(self):
+        input1 = [
+            "run.py",
+            WATCH_OPTION,
+            f"{OUTPUT_OPTION_STUB}{STDOUT_OUTPUT_FILE_PATH}",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        correct1 = CommandLineContext(
+            DEFAULT_INPUT_DIR,
+            STDOUT_OUTPUT_FILE_PATH,
+            False,
+            testconstants.TESTCONFIG_PATH,
+            watch=True
+        )
+        output1 = cmdline.get_context(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_watch_with_stdin(self):
+        input1 = [
+            "run.py",
+            WATCH_OPTION,
+            f"{STDIN_AS_OPTION_STUB}Input CSV",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        try:
+            cmdline.get_context(input1)
+            self.fail()
+        except CommandLineException as e:
+            correct1 = "Cannot watch the input directory when reading from stdin."
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_partition_with_stdout(self):
+        input1 = [
+            "run.py",
+            f"{OUTPUT_OPTION_STUB}{STDOUT_OUTPUT_FILE_PATH}",
+            f"{PARTITION_BY_OPTION_STUB}region",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        try:
+            cmdline.get_context(input1)
+            self.fail()
+        except CommandLineException as e:
+            correct1 = "Cannot partition the output when writing to stdout."
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_partition_dir_not_a_directory(self):
+        input1 = [
+            "run.py",
+            f"{INPUT_DIR_OPTION_STUB}{testconstants.TESTINPUT_PATH}",
+            f"{OUTPUT_OPTION_STUB}{testconstants.TESTCSV_PATH}.csv",
+            f"{PARTITION_BY_OPTION_STUB}region",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        try:
+            cmdline.get_context(input1)
+            self.fail()
+        except CommandLineException as e:
+            correct1 = 'Output path "%s" exists but is not a directory.' % testconstants.TESTCSV_PATH
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_stdin_with_existing_output_file(self):
+        input1 = [
+            "run.py",
+            f"{OUTPUT_OPTION_STUB}{testconstants.TESTCSV_PATH}",
+            f"{STDIN_AS_OPTION_STUB}Input CSV",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        try:
+            cmdline.get_context(input1)
+            self.fail()
+        except CommandLineException as e:
+            correct1 = 'Output file "%s" already exists. Set the %s option to overwrite it when reading from ' \
+                       'stdin.' % (testconstants.TESTCSV_PATH, FORCE_OPTION)
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_stdin_with_existing_output_file_forced(self):
+        input1 = [
+            "run.py",
+            FORCE_OPTION,
+            f"{OUTPUT_OPTION_STUB}{testconstants.TESTCSV_PATH}",
+            f"{STDIN_AS_OPTION_STUB}Input CSV",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        correct1 = CommandLineContext(
+            DEFAULT_INPUT_DIR,
+            testconstants.TESTCSV_PATH,
+            True,
+            testconstants.TESTCONFIG_PATH,
+            stdin_input_file="Input CSV"
+        )
+        output1 = cmdline.get_context(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_partition_dir_is_input_dir(self):
+        input1 = [
+            "run.py",
+            f"{INPUT_DIR_OPTION_STUB}{testconstants.TESTINPUT_PATH}",
+            f"{OUTPUT_OPTION_STUB}{testconstants.TESTINPUT_PATH}.csv",
+            f"{PARTITION_BY_OPTION_STUB}region",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        try:
+            cmdline.get_context(input1)
+            self.fail()
+        except CommandLineException as e:
+            correct1 = 'Output directory "%s" cannot be the input directory or inside it.' % (
+                testconstants.TESTINPUT_PATH
+            )
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_partition_dir_inside_input_dir(self):
+        partition_dir = os.path.join(testconstants.TESTINPUT_PATH, "output")
+        input1 = [
+            "run.py",
+            f"{INPUT_DIR_OPTION_STUB}{testconstants.TESTINPUT_PATH}",
+            f"{OUTPUT_OPTION_STUB}{partition_dir}.csv",
+            f"{PARTITION_BY_OPTION_STUB}region",
+            testconstants.TESTCONFIG_PATH,
+        ]
+        try:
+            cmdline.get_context(input1)
+            self.fail()
+        except CommandLineException as e:
+            correct1 = 'Output directory "%s" cannot be the input directory or inside it.' % partition_dir
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
     def test_syntax_error_with_options(self):
         input1 = [
             "run.py",
@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.config import cache, config
+from dataunifier.utils import fileio
+from tests.constants import TESTCONFIG_PATH, TESTPLAYBOOK_PATH
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tempdir.name, "cache")
+        self.config_file_path = os.path.join(self.tempdir.name, "playbook.yaml")
+        shutil.copy(TESTPLAYBOOK_PATH, self.config_file_path)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def get_command_line_ctxt(self, config_file_path=None):
+        return CommandLineContext(
+            "", "", True, config_file_path or self.config_file_path, cache_dir=self.cache_dir
+        )
+
+    def test_get_context_uses_cache(self):
+        input1 = self.get_command_line_ctxt(TESTCONFIG_PATH)
+        correct1 = config.get_context(input1)
+        self.assertTrue(os.path.isfile(cache.get_cache_file_path(input1)))
+        with mock.patch("dataunifier.utils.confighelper.parse_config_file", side_effect=AssertionError):
+            output1 = config.get_context(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_load_without_cache_file(self):
+        input1 = self.get_command_line_ctxt()
+        output1 = cache.load(input1)
+        self.assertIsNone(output1)
+
+    def test_load_after_change(self):
+        input1 = self.get_command_line_ctxt()
+        config.get_context(input1)
+        self.assertIsNotNone(cache.load(input1))
+        with open(self.config_file_path, "a") as f:
+            f.write("\n# changed\n")
+        output1 = cache.load(input1)
+        self.assertIsNone(output1)
+
+    def test_load_after_directory_change(self):
+        input1 = self.get_command_line_ctxt(TESTCONFIG_PATH)
+        config_ctxt = config.get_context(input1)
+        temp_lookup_dir = os.path.join(self.tempdir.name, "lookups")
+        os.mkdir(temp_lookup_dir)
+        cache.save(input1, config_ctxt, [(fileio.RECORDED_DIRECTORY, temp_lookup_dir)])
+        self.assertIsNotNone(cache.load(input1))
+        open(os.path.join(temp_lookup_dir, "new.csv"), "w").close()
+        output1 = cache.load(input1)
+        self.assertIsNone(output1)
+
+    def test_get_context_with_lookup_index(self):
+        lookup_dir = os.path.join(self.tempdir.name, "lookups")
+        os.mkdir(lookup_dir)
+        lookup_file_path = os.path.join(lookup_dir, "lookup.csv")
+        with open(lookup_file_path, "w", newline="") as f:
+            f.write("lookup,value\nlookup1,ONE\nlookup2,TWO\n")
+        with open(self.config_file_path, "a") as f:
+            f.write(
+                '      - name: "Lookup"\n'
+                '        csv_lookup_replace:\n'
+                '          fields: "field1"\n'
+                '          directory: "%s"\n'
+                '          filename_regex: "^lookup\\\\.csv$"\n'
+                '          lookup_column: "lookup"\n'
+                '          value_column: "value"\n'
+                '          on_unmatched: "passthrough"\n'
+                '          index_directory: "%s"\n' % (lookup_dir, os.path.join(self.tempdir.name, "index"))
+            )
+        # The index is built without the cache, and only reused when the configuration is cached.
+        config.get_context(CommandLineContext("", "", True, self.config_file_path)).filesets[0].tasks[-1] \
+            .lookup_dict.close()
+        input1 = self.get_command_line_ctxt()
+        config.get_context(input1).filesets[0].tasks[-1].lookup_dict.close()
+        self.assertIsNotNone(cache.load(input1))
+        with open(lookup_file_path, "w", newline="") as f:
+            f.write("lookup,value\nlookup1,UNO\nlookup2,DOS\n")
+        self.assertIsNone(cache.load(input1))
+        config_ctxt = config.get_context(input1)
+        lookup_dict = config_ctxt.filesets[0].tasks[-1].lookup_dict
+        correct1 = "UNO"
+        output1 = lookup_dict.get("lookup1")
+        self.assertEqual(correct1, output1)
+        lookup_dict.close()
+
+    def test_load_unreadable(self):
+        input1 = self.get_command_line_ctxt()
+        os.mkdir(self.cache_dir)
+        with open(cache.get_cache_file_path(input1), "w") as f:
+            f.write("not a pickle")
+        output1 = cache.load(input1)
+        self.assertIsNone(output1)
+
+
+class TestRecordReads(unittest.TestCase):
+    def test_record(self):
+        fileio.start_recording_reads()
+        config.get_context(CommandLineContext("", "", True, TESTCONFIG_PATH))
+        output1 = fileio.stop_recording_reads()
+        self.assertEqual((fileio.RECORDED_FILE, TESTCONFIG_PATH), output1[0])
+        self.assertIn((fileio.RECORDED_DIRECTORY, "testassets"), output1)
+        self.assertIn((fileio.RECORDED_FILE, os.path.join("testassets", "testcsv.csv")), output1)
+        self.assertEqual(len(set(output1)), len(output1))
@@ -204,6 +204,26 @@ class TestGetContext(unittest.TestCase):
         output1 = config.get_context(input1)
         self.assertEqual(correct1, output1)
 
+    def test_shared_whens(self):
+        input1 = CommandLineContext("", "", True, TESTCONFIG_PATH)
+        output1 = config.get_context(input1)
+        tasks = output1.filesets[0].tasks
+        whens = [task.when for task in tasks if task.when == WhenFieldMatchesRegex("someField", ["someRegex"])]
+        self.assertTrue(len(whens) > 1)
+        for when in whens:
+            self.assertIs(whens[0], when)
+        self.assertIsNotNone(whens[0].memo)
+
+    def test_adaptive_conditions(self):
+        input1 = CommandLineContext("", "", True, TESTCONFIG_PATH, adaptive_sample_size=10)
+        output1 = config.get_context(input1)
+        lines = config.get_condition_summary(output1.filesets)
+        self.assertTrue(lines)
+        self.assertEqual('Condition in task "Fuzzy Match": order kept, as only 0 of 10 rows were sampled.', lines[0])
+        input2 = CommandLineContext("", "", True, TESTCONFIG_PATH)
+        output2 = config.get_context(input2)
+        self.assertEqual([], config.get_condition_summary(output2.filesets))
+
     def test_illegal_block(self):
         input1 = CommandLineContext("", "", True, TESTCONFIG_ILLEGALBLOCK_PATH)
         try:
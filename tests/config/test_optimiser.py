@@ -0,0 +1,202 @@
+import unittest
+
+from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.common.exceptions import TransformationException
+from dataunifier.config import optimiser
+from dataunifier.config.classes import Fileset, InputFile, Sheet
+from dataunifier.parse.classes import ParseRowContext, ParseIteratorContext, ParseInputFileContext, ParseFilesetContext, \
+    TestBogusDictWriter
+from dataunifier.tasks.DiscardFieldsTask import DiscardFieldsTask
+from dataunifier.tasks.LowercaseTask import LowercaseTask
+from dataunifier.tasks.ReplaceTask import ReplaceTask, ReplaceRule, E_FAIL, E_BLANK, E_PASSTHROUGH, C_UPPER
+from dataunifier.tasks.SetFieldValueTask import SetFieldValueTask
+from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
+from dataunifier.tasks.UppercaseTask import UppercaseTask
+from dataunifier.when.WhenSimpleTest import WhenSimpleTest
+
+FIELDS = ["field1", "field2"]
+
+
+def get_row_ctxt(rowdict):
+    return ParseRowContext(
+        ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer1"),
+                    Fileset(
+                        "fileset1",
+                        FIELDS,
+                        [InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])],
+                        TestFieldCreatorTask("task1", FIELDS)
+                    )
+                ),
+                InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])
+            ),
+            "filepath", "sheet", ["row1", "row2"]
+        ), 1, rowdict
+    )
+
+
+def run_tasks(tasks, rowdict):
+    row_ctxt = get_row_ctxt(rowdict)
+    try:
+        for task in tasks:
+            row_ctxt = task.transform(row_ctxt)
+    except TransformationException as e:
+        return e.message
+    return row_ctxt.rowdict
+
+
+def replace(name, on_unmatched, allow_blank, rules, rules_file="file1", when=None, resulting_fields=FIELDS):
+    return ReplaceTask(
+        name, when, resulting_fields, ["field1"], on_unmatched, allow_blank,
+        [ReplaceRule([value], replacement) for value, replacement in rules.items()], rules_file
+    )
+
+
+class TestOptimise(unittest.TestCase):
+    def assert_equivalent(self, tasks, optimised_tasks, values):
+        for value in values:
+            rowdict = {"field1": value, "field2": "other"}
+            self.assertEqual(run_tasks(tasks, rowdict), run_tasks(optimised_tasks, rowdict), value)
+
+    def test_fuse_replace_tasks(self):
+        input1 = [
+            replace("task1", E_PASSTHROUGH, False, {"a": "b", "c": "d"}),
+            replace("task2", E_FAIL, True, {"b": "x", "d": "", "e": "y", "f": "z"}, "file2")
+        ]
+        output1, notes1 = optimiser.optimise(input1)
+        self.assertEqual(1, len(output1))
+        self.assertEqual(1, len(notes1))
+        # Unmatched values are reported by the second task.
+        self.assertEqual("task2", output1[0].name)
+        self.assert_equivalent(input1, output1, ["a", "b", "c", "d", "e", "f", "g", ""])
+
+    def test_fuse_replace_tasks_blank(self):
+        input1 = [
+            replace("task1", E_BLANK, False, {"a": "b", "c": "d"}),
+            replace("task2", E_PASSTHROUGH, True, {"b": "x", "d": "y"})
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assertEqual(1, len(output1))
+        self.assert_equivalent(input1, output1, ["a", "b", "c", "d", "e", ""])
+
+    def test_fuse_replace_tasks_blank_key(self):
+        # Values unmatched by the first task become blank, which the second task replaces.
+        input1 = [
+            replace("task1", E_BLANK, False, {"": "q", "a": "b"}),
+            replace("task2", E_PASSTHROUGH, False, {"q": "", "": "w"})
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assert_equivalent(input1, output1, ["a", "b", "e", "q", ""])
+
+    def test_fuse_replace_tasks_may_both_fail(self):
+        # Without known resulting fields, the first task may fail because a field is missing.
+        input1 = [
+            replace("task1", E_PASSTHROUGH, False, {"a": "b"}, resulting_fields=None),
+            replace("task2", E_FAIL, False, {"b": "c"}, resulting_fields=None)
+        ]
+        output1, notes1 = optimiser.optimise(input1)
+        self.assertEqual(input1, output1)
+        self.assertEqual([], notes1)
+
+    def test_fuse_replace_tasks_unknown_fields(self):
+        input1 = [
+            replace("task1", E_PASSTHROUGH, False, {"a": "b"}, resulting_fields=None),
+            replace("task2", E_PASSTHROUGH, False, {"b": "c"}, resulting_fields=None)
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assertEqual(1, len(output1))
+        self.assertEqual("task1", output1[0].name)
+        self.assert_equivalent(input1, output1, ["a", "b", "c"])
+
+    def test_fuse_replace_tasks_different_error_message(self):
+        # An unmatched value would be reported by a different task depending on the value.
+        input1 = [
+            replace("task1", E_FAIL, False, {"a": "b"}, "file1"),
+            replace("task2", E_FAIL, False, {"c": "d"}, "file2")
+        ]
+        output1, notes1 = optimiser.optimise(input1)
+        self.assertEqual(input1, output1)
+        self.assertEqual([], notes1)
+
+    def test_fuse_uppercase_and_replace(self):
+        input1 = [
+            UppercaseTask("task1", None, FIELDS, ["field1"]),
+            replace("task2", E_FAIL, False, {"A": "x", "B": "y"})
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assertEqual(1, len(output1))
+        self.assertEqual(C_UPPER, output1[0].case)
+        self.assertEqual("task2", output1[0].name)
+        self.assert_equivalent(input1, output1, ["a", "B", "c", ""])
+
+    def test_fuse_lowercase_and_replace_different_fields(self):
+        input1 = [
+            LowercaseTask("task1", None, FIELDS, ["field2"]),
+            replace("task2", E_FAIL, False, {"a": "x"})
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assertEqual(input1, output1)
+
+    def test_remove_overwritten_task(self):
+        input1 = [
+            UppercaseTask("task1", None, FIELDS, ["field1"]),
+            SetFieldValueTask("task2", None, FIELDS, "field1", "value1")
+        ]
+        output1, notes1 = optimiser.optimise(input1)
+        self.assertEqual([input1[1]], output1)
+        self.assertEqual(1, len(notes1))
+        self.assert_equivalent(input1, output1, ["a"])
+
+    def test_remove_discarded_task(self):
+        input1 = [
+            replace("task1", E_BLANK, False, {"a": "b"}),
+            DiscardFieldsTask("task2", FIELDS, ["field1"])
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assertEqual([input1[1]], output1)
+        self.assert_equivalent(input1, output1, ["a", "c"])
+
+    def test_keep_task_that_may_fail(self):
+        input1 = [
+            replace("task1", E_FAIL, False, {"a": "b"}),
+            SetFieldValueTask("task2", None, FIELDS, "field1", "value1")
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assertEqual(input1, output1)
+
+    def test_keep_task_read_before_overwritten(self):
+        input1 = [
+            SetFieldValueTask("task1", None, FIELDS, "field1", "A"),
+            replace("task2", E_FAIL, False, {"A": "b"}, "file2"),
+            SetFieldValueTask("task3", None, FIELDS, "field1", "value1")
+        ]
+        output1, _ = optimiser.optimise(input1)
+        self.assertEqual(input1, output1)
+
+    def test_conditional_tasks_unchanged(self):
+        input1 = [
+            replace("task1", E_PASSTHROUGH, False, {"a": "b"}, when=WhenSimpleTest("true")),
+            replace("task2", E_PASSTHROUGH, False, {"b": "c"}),
+            SetFieldValueTask("task3", WhenSimpleTest("true"), FIELDS, "field1", "value1")
+        ]
+        output1, notes1 = optimiser.optimise(input1)
+        self.assertEqual(input1, output1)
+        self.assertEqual([], notes1)
+
+
+class TestDescribe(unittest.TestCase):
+    def test_successful(self):
+        input1 = [
+            UppercaseTask("task1", None, FIELDS, ["field1"]),
+            SetFieldValueTask("task2", None, FIELDS, "field1", "value1")
+        ]
+        correct1 = ['1. uppercase "task1"', '2. set_field_value "task2"']
+        output1 = optimiser.describe(input1)
+        self.assertEqual(correct1, output1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from importlib.metadata import EntryPoint
+from unittest import mock
+
+from dataunifier.common.exceptions import ConfigException, NoSuchTaskException
+from dataunifier.config import taskrouter
+from dataunifier.tasks import MapFieldsTask
+from dataunifier.tasks.AbstractTask import AbstractRegularTask
+
+K_PLUGIN = "plugin_task"
+
+
+class PluginTask(AbstractRegularTask):
+    @classmethod
+    def create_from_config(cls, task_parsing_context):
+        return cls(task_parsing_context.task_name, task_parsing_context.when)
+
+    @classmethod
+    def get_task_type_string(cls):
+        return K_PLUGIN
+
+    @classmethod
+    def is_conditional(cls):
+        return True
+
+    def transform(self, row_ctxt):
+        return row_ctxt
+
+    def get_resulting_fields(self):
+        return None
+
+
+def _entry_points(name, value):
+    return [EntryPoint(name=name, value=value, group=taskrouter.ENTRY_POINT_GROUP)]
+
+
+class TestGetTaskClass(unittest.TestCase):
+    def test_builtin(self):
+        with mock.patch("importlib.metadata.entry_points", side_effect=AssertionError):
+            output1 = taskrouter.get_task_class("map_fields")
+        self.assertIs(MapFieldsTask, output1)
+
+    def test_nonexistent(self):
+        with mock.patch("importlib.metadata.entry_points", return_value=[]):
+            try:
+                taskrouter.get_task_class("nonexistent")
+                self.fail()
+            except NoSuchTaskException as e:
+                self.assertEqual("nonexistent", e.task_type)
+
+    def test_plugin(self):
+        entry_points = _entry_points(K_PLUGIN, "tests.config.test_taskrouter:PluginTask")
+        with mock.patch.dict(taskrouter._task_classes), \
+                mock.patch("importlib.metadata.entry_points", return_value=entry_points) as found:
+            output1 = taskrouter.get_task_class(K_PLUGIN)
+            output2 = taskrouter.get_task_class(K_PLUGIN)
+            self.assertEqual(1, found.call_count)
+        self.assertIs(PluginTask, output1)
+        self.assertIs(PluginTask, output2)
+
+    def test_plugin_wrong_task_type(self):
+        entry_points = _entry_points("other_task", "tests.config.test_taskrouter:PluginTask")
+        with mock.patch.dict(taskrouter._task_classes), \
+                mock.patch("importlib.metadata.entry_points", return_value=entry_points):
+            try:
+                taskrouter.get_task_class("other_task")
+                self.fail()
+            except ConfigException as e:
+                correct1 = 'Plugin "tests.config.test_taskrouter:PluginTask" for task type "other_task" is not a ' \
+                           'task class for that task type.'
+                self.assertEqual(correct1, e.message)
+
+    def test_plugin_not_importable(self):
+        entry_points = _entry_points(K_PLUGIN, "tests.config.nonexistent:PluginTask")
+        with mock.patch.dict(taskrouter._task_classes), \
+                mock.patch("importlib.metadata.entry_points", return_value=entry_points):
+            try:
+                taskrouter.get_task_class(K_PLUGIN)
+                self.fail()
+            except ConfigException:
+                pass
+
+
+class TestRegisterTaskClass(unittest.TestCase):
+    def test_conflict(self):
+        class OtherMapFieldsTask(PluginTask):
+            @classmethod
+            def get_task_type_string(cls):
+                return "map_fields"
+
+        try:
+            taskrouter.register_task_class(OtherMapFieldsTask)
+            self.fail()
+        except ValueError:
+            pass
+        self.assertIs(MapFieldsTask, taskrouter.get_task_class("map_fields"))
@@ -0,0 +1,108 @@
+import unittest
+from importlib.metadata import EntryPoint
+from unittest import mock
+
+from dataunifier.config import whenrouter
+from dataunifier.when import And, Or, Not
+from dataunifier.when.Abstract import AbstractRegularWhen
+from dataunifier.when.WhenSimpleTest import WhenSimpleTest
+from dataunifier.when.WhenFieldMatchesRegex import WhenFieldMatchesRegex, K_CACHE_SIZE
+
+
+class PluginWhen(AbstractRegularWhen):
+    @classmethod
+    def create_from_config(cls, when_parsing_context):
+        return cls()
+
+    @classmethod
+    def get_key_set(cls):
+        return {"plugin_key"}
+
+    def evaluate(self, row_ctxt):
+        return True
+
+
+class TestGetWhenClass(unittest.TestCase):
+    def test_builtin(self):
+        with mock.patch("importlib.metadata.entry_points", side_effect=AssertionError):
+            output1 = whenrouter.get_when_class(WhenFieldMatchesRegex.get_key_set())
+        self.assertIs(WhenFieldMatchesRegex, output1)
+
+    def test_optional_keys(self):
+        output1 = whenrouter.get_when_class(WhenFieldMatchesRegex.get_key_set() | {K_CACHE_SIZE})
+        self.assertIs(WhenFieldMatchesRegex, output1)
+
+    def test_plugin(self):
+        entry_points = [
+            EntryPoint(
+                name="plugin", value="tests.config.test_whenrouter:PluginWhen", group=whenrouter.ENTRY_POINT_GROUP
+            )
+        ]
+        with mock.patch.dict(whenrouter._when_classes), \
+                mock.patch("dataunifier.config.whenrouter._plugins_loaded", False), \
+                mock.patch("importlib.metadata.entry_points", return_value=entry_points):
+            output1 = whenrouter.get_when_class({"plugin_key"})
+            output2 = whenrouter.get_when_class({"nonexistent"})
+        self.assertIs(PluginWhen, output1)
+        self.assertIsNone(output2)
+
+
+class TestWhenInterner(unittest.TestCase):
+    def test_intern(self):
+        obj1 = whenrouter.WhenInterner()
+        input1 = WhenFieldMatchesRegex("field1", ["a"])
+        input2 = And([WhenFieldMatchesRegex("field2", ["b"]), WhenFieldMatchesRegex("field1", ["a"])])
+        input3 = Or([Not(WhenFieldMatchesRegex("field2", ["b"])), WhenFieldMatchesRegex("field1", ["a"], 10)])
+        output1 = obj1.intern(input1)
+        output2 = obj1.intern(input2)
+        output3 = obj1.intern(input3)
+        self.assertIs(input1, output1)
+        self.assertIs(input1, output2.when_list[1])
+        self.assertIs(output2.when_list[0], output3.when_list[0].when)
+        self.assertIsNot(input1, output3.when_list[1])
+        self.assertIsNotNone(input1.memo)
+        self.assertIsNotNone(output2.when_list[0].memo)
+        self.assertIsNone(output2.memo)
+        self.assertIsNone(output3.when_list[1].memo)
+
+    def test_intern_equal_tree(self):
+        obj1 = whenrouter.WhenInterner()
+        input1 = And([WhenFieldMatchesRegex("field1", ["a"]), WhenFieldMatchesRegex("field2", ["b"])])
+        input2 = And([WhenFieldMatchesRegex("field1", ["a"]), WhenFieldMatchesRegex("field2", ["b"])])
+        output1 = obj1.intern(input1)
+        output2 = obj1.intern(input2)
+        self.assertIs(output1, output2)
+        self.assertIsNotNone(output1.memo)
+        self.assertIsNone(output1.when_list[0].memo)
+
+    def test_intern_adaptive(self):
+        obj1 = whenrouter.WhenInterner(100)
+        input1 = Not(And([
+            WhenFieldMatchesRegex("field1", ["a"]),
+            Or([WhenFieldMatchesRegex("field2", ["b"]), WhenFieldMatchesRegex("field3", ["c"])]),
+            Or([WhenFieldMatchesRegex("field2", ["b"])])
+        ]))
+        output1 = obj1.intern(input1)
+        self.assertEqual((100, False), (output1.when.adaptive.sample_size, output1.when.adaptive.stops_on))
+        self.assertEqual((100, True), (output1.when.when_list[1].adaptive.sample_size,
+                                       output1.when.when_list[1].adaptive.stops_on))
+        self.assertIsNone(output1.when.when_list[2].adaptive)
+        correct2 = [output1.when, output1.when.when_list[1]]
+        output2 = whenrouter.get_adaptive_whens(output1)
+        self.assertEqual(len(correct2), len(output2))
+        for correct, output in zip(correct2, output2):
+            self.assertIs(correct, output)
+
+    def test_intern_not_adaptive(self):
+        obj1 = whenrouter.WhenInterner()
+        output1 = obj1.intern(And([WhenFieldMatchesRegex("field1", ["a"]), WhenFieldMatchesRegex("field2", ["b"])]))
+        self.assertIsNone(output1.adaptive)
+        self.assertEqual([], whenrouter.get_adaptive_whens(output1))
+
+    def test_intern_unknown_fields(self):
+        obj1 = whenrouter.WhenInterner()
+        obj1.intern(WhenSimpleTest("true"))
+        output1 = obj1.intern(WhenSimpleTest("true"))
+        self.assertIsNone(output1.memo)
+        self.assertIsNone(obj1.intern(None))
+
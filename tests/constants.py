@@ -50,3 +50,8 @@ TESTXLS_NAME = "testxls.xlsx"
 TESTXLS_PATH = os.path.join(TESTASSETS_DIR, TESTXLS_NAME)
 TESTXLSENCRYPT_NAME = "testxlsencrypt.xlsx"
 TESTXLSENCRYPT_PATH = os.path.join(TESTASSETS_DIR, TESTXLSENCRYPT_NAME)
+TESTSHARED_DIRNAME = "shared"
+TESTSHARED_PATH = os.path.join(TESTASSETS_DIR, TESTSHARED_DIRNAME)
+TESTSHARED_CSV_COPY_NAME = "testcsv_copy.csv"
+TESTPLAYBOOK_NAME = "testplaybook.yaml"
+TESTPLAYBOOK_PATH = os.path.join(TESTASSETS_DIR, TESTPLAYBOOK_NAME)
@@ -1,18 +1,22 @@
+import csv
+import io
 import os
 import re
 import unittest
+from unittest import mock
 
 from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.common.constants import STDIN_FILE_PATH
 from dataunifier.common.exceptions import InputFileException, ParsingException
 from dataunifier.config.classes import ConfigContext, Fileset, InputFile, Sheet
-from dataunifier.parse import parse
+from dataunifier.parse import parse, positional
 from dataunifier.parse.classes import TestBogusDictWriter
 from dataunifier.tasks import MapFieldsTask, CopyFieldValueTask, RegexReplaceTask
 from dataunifier.tasks.MapFieldsTask import Field
 from dataunifier.tasks.RegexReplaceTask import RegexReplaceRule
 from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
 from tests.constants import TESTASSETS_DIR, TESTCSV_NAME, TESTXLS_NAME, TESTTXT_NAME, TESTXLSENCRYPT_NAME, \
-    TESTXLSENCRYPT_PATH
+    TESTXLSENCRYPT_PATH, TESTSHARED_PATH, TESTSHARED_CSV_COPY_NAME
 
 
 class TestParse(unittest.TestCase):
@@ -65,6 +69,49 @@ class TestParse(unittest.TestCase):
         output1 = writer.rowdicts
         self.assertEqual(correct1, output1)
 
+    def test_start_csv_positional(self):
+        tasks = [
+            MapFieldsTask("Map Fields", [
+                Field("field1", ["lookup"], True, False),
+                Field("field2", ["value"], True, False),
+                Field("field3", [], False, False)
+            ]),
+            CopyFieldValueTask("Copy Field Value", None, ["field1", "field2", "field3"], "field2", ["field3"]),
+            RegexReplaceTask(
+                "Regex Replace",
+                None,
+                ["field1", "field2", "field3"],
+                ["field2"],
+                RegexReplaceTask.E_FAIL,
+                False,
+                [
+                    RegexReplaceRule([re.compile("value")], "volley")
+                ],
+                "rulesFile"
+            )
+        ]
+        input1 = ConfigContext(
+            CommandLineContext(TESTASSETS_DIR, "outputFilePath", False, "configFilePath"),
+            ["field1", "field2", "field3"],
+            [
+                Fileset(
+                    "Test",
+                    ["field1", "field2", "field3"],
+                    [
+                        InputFile("Input CSV", ["^%s$" % TESTCSV_NAME], None)
+                    ],
+                    tasks,
+                    positional.get_plan(tasks)
+                )
+            ]
+        )
+        f = io.StringIO()
+        writer = csv.DictWriter(f, ["field1", "field2", "field3"])
+        correct1 = "lookup1,volley1,value1\r\nlookup2,volley2,value2\r\n"
+        parse.start(input1, writer)
+        output1 = f.getvalue()
+        self.assertEqual(correct1, output1)
+
     def test_start_csv_second_file_regex_match(self):
         input1 = ConfigContext(
             CommandLineContext(TESTASSETS_DIR, "outputFilePath", False, "configFilePath"),
@@ -432,3 +479,242 @@ class TestParse(unittest.TestCase):
                        )
             output1 = e.message
             self.assertEqual(correct1, output1)
+
+    def test_start_csv_shared_between_filesets(self):
+        input1 = ConfigContext(
+            CommandLineContext(TESTASSETS_DIR, "outputFilePath", False, "configFilePath"),
+            ["field1", "field2"],
+            [
+                Fileset(
+                    "Test 1",
+                    ["field1", "field2"],
+                    [
+                        InputFile("Input CSV 1", ["^%s$" % TESTCSV_NAME], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup"], True, False),
+                            Field("field2", ["value"], True, False)
+                        ])
+                    ]
+                ),
+                Fileset(
+                    "Test 2",
+                    ["field1", "field2"],
+                    [
+                        InputFile("Input CSV 2", ["^%s$" % TESTCSV_NAME], None),
+                        InputFile("Input CSV 3", ["^%s$" % TESTCSV_NAME], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["value"], True, False),
+                            Field("field2", ["lookup"], True, False)
+                        ])
+                    ]
+                )
+            ]
+        )
+        writer = TestBogusDictWriter("")
+        correct1 = [
+            {"field1": "lookup1", "field2": "value1"},
+            {"field1": "lookup2", "field2": "value2"},
+            {"field1": "value1", "field2": "lookup1"},
+            {"field1": "value2", "field2": "lookup2"},
+            {"field1": "value1", "field2": "lookup1"},
+            {"field1": "value2", "field2": "lookup2"}
+        ]
+        parse.start(input1, writer)
+        output1 = writer.rowdicts
+        self.assertEqual(correct1, output1)
+
+    def test_start_csv_identical_copies(self):
+        input1 = ConfigContext(
+            CommandLineContext(TESTSHARED_PATH, "outputFilePath", False, "configFilePath"),
+            ["field1", "field2"],
+            [
+                Fileset(
+                    "Test",
+                    ["field1", "field2"],
+                    [
+                        InputFile("Input CSV", ["^%s$" % TESTCSV_NAME], None),
+                        InputFile("Input CSV Copy", ["^%s$" % TESTSHARED_CSV_COPY_NAME], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup"], True, False),
+                            Field("field2", ["value"], True, False)
+                        ])
+                    ]
+                )
+            ]
+        )
+        writer = TestBogusDictWriter("")
+        correct1 = [
+            {"field1": "lookup1", "field2": "value1"},
+            {"field1": "lookup2", "field2": "value2"},
+            {"field1": "lookup1", "field2": "value1"},
+            {"field1": "lookup2", "field2": "value2"}
+        ]
+        parse.start(input1, writer)
+        output1 = writer.rowdicts
+        self.assertEqual(correct1, output1)
+
+    def test_start_xls_shared_between_filesets(self):
+        input1 = ConfigContext(
+            CommandLineContext(TESTASSETS_DIR, "outputFilePath", False, "configFilePath"),
+            ["field1"],
+            [
+                Fileset(
+                    "Test 1",
+                    ["field1"],
+                    [
+                        InputFile("Input Excel 1", ["^%s$" % TESTXLS_NAME], [
+                            Sheet(["^readme$"], True)
+                        ])
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup", "MyLookup"], True, False)
+                        ])
+                    ]
+                ),
+                Fileset(
+                    "Test 2",
+                    ["field1"],
+                    [
+                        InputFile("Input Excel 2", ["^%s$" % TESTXLS_NAME], [
+                            Sheet(["^canre.+$"], True)
+                        ])
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["value", "MyValue"], True, False)
+                        ])
+                    ]
+                )
+            ]
+        )
+        writer = TestBogusDictWriter("")
+        correct1 = [
+            {"field1": "lookup1"},
+            {"field1": "lookup2"},
+            {"field1": "value5"},
+            {"field1": "value6"}
+        ]
+        parse.start(input1, writer)
+        output1 = writer.rowdicts
+        self.assertEqual(correct1, output1)
+
+    def test_start_shared_transformation_exception(self):
+        input1 = ConfigContext(
+            CommandLineContext(TESTASSETS_DIR, "outputFilePath", False, "configFilePath"),
+            ["field1", "field2", "field3"],
+            [
+                Fileset(
+                    "Test 1",
+                    ["field1", "field2", "field3"],
+                    [
+                        InputFile("Input CSV 1", ["^%s$" % TESTCSV_NAME], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup"], True, False),
+                            Field("field2", ["value"], True, False),
+                            Field("field3", [], False, False)
+                        ])
+                    ]
+                ),
+                Fileset(
+                    "Test 2",
+                    ["field1", "field2", "field3"],
+                    [
+                        InputFile("Input CSV 2", ["^%s$" % TESTCSV_NAME], None)
+                    ],
+                    [
+                        TestFieldCreatorTask("Fail", ["field1", "field2", "field3"])
+                    ]
+                )
+            ]
+        )
+        writer = TestBogusDictWriter("")
+        correct1 = [
+            {"field1": "lookup1", "field2": "value1", "field3": ""},
+            {"field1": "lookup2", "field2": "value2", "field3": ""}
+        ]
+        try:
+            parse.start(input1, writer)
+            self.fail()
+        except ParsingException as e:
+            correct2 = 'When executing task "%s" on row %d of file "%s": %s' % (
+                "Fail", 1, os.path.join(TESTASSETS_DIR, TESTCSV_NAME),
+                TestFieldCreatorTask.TRANSFORMATION_EXCEPTION_MESSAGE
+            )
+            output2 = e.message
+            self.assertEqual(correct2, output2)
+        output1 = writer.rowdicts
+        self.assertEqual(correct1, output1)
+
+    def test_start_stdin(self):
+        input1 = ConfigContext(
+            CommandLineContext(
+                TESTASSETS_DIR, "-", False, "configFilePath", stdin_input_file="Input CSV"
+            ),
+            ["field1", "field2"],
+            [
+                Fileset(
+                    "Test",
+                    ["field1", "field2"],
+                    [
+                        InputFile("Input CSV", ["^nonexistent.csv$"], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup"], True, False),
+                            Field("field2", ["value"], True, False)
+                        ])
+                    ]
+                )
+            ]
+        )
+        writer = TestBogusDictWriter("")
+        correct1 = [
+            {"field1": "lookup1", "field2": "value1"},
+            {"field1": "lookup2", "field2": "value2"}
+        ]
+        stdin = io.TextIOWrapper(io.BytesIO(b"lookup,value\r\nlookup1,value1\r\nlookup2,value2\r\n"))
+        with mock.patch("sys.stdin", new=stdin):
+            parse.start(input1, writer)
+        output1 = writer.rowdicts
+        self.assertEqual(correct1, output1)
+
+    def test_start_stdin_transformation_exception(self):
+        input1 = ConfigContext(
+            CommandLineContext(
+                TESTASSETS_DIR, "-", False, "configFilePath", stdin_input_file="Input CSV"
+            ),
+            ["field1", "field2", "field3"],
+            [
+                Fileset(
+                    "Test",
+                    ["field1", "field2", "field3"],
+                    [
+                        InputFile("Input CSV", ["^%s$" % TESTCSV_NAME], None)
+                    ],
+                    [
+                        TestFieldCreatorTask("Fail", ["field1", "field2", "field3"])
+                    ]
+                )
+            ]
+        )
+        writer = TestBogusDictWriter("")
+        stdin = io.TextIOWrapper(io.BytesIO(b"lookup,value\nlookup1,value1\n"))
+        try:
+            with mock.patch("sys.stdin", new=stdin):
+                parse.start(input1, writer)
+            self.fail()
+        except ParsingException as e:
+            correct1 = 'When executing task "%s" on row %d of file "%s": %s' % (
+                "Fail", 1, STDIN_FILE_PATH, TestFieldCreatorTask.TRANSFORMATION_EXCEPTION_MESSAGE
+            )
+            output1 = e.message
+            self.assertEqual(correct1, output1)
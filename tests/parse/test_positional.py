@@ -0,0 +1,184 @@
+import pickle
+import unittest
+
+from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.common.exceptions import ParsingException
+from dataunifier.config.classes import Fileset, InputFile
+from dataunifier.parse import parse, positional
+from dataunifier.parse.classes import ParseRowContext, ParseIteratorContext, ParseInputFileContext, ParseFilesetContext, \
+    TestBogusDictWriter
+from dataunifier.tasks.ConcatenateFieldsTask import ConcatenateFieldsTask
+from dataunifier.tasks.CsvMatchTask import CsvMatchTask
+from dataunifier.tasks.DiscardFieldsTask import DiscardFieldsTask
+from dataunifier.tasks.DiscardRecordTask import DiscardRecordTask
+from dataunifier.tasks.MapFieldsTask import MapFieldsTask, Field
+from dataunifier.tasks.ReplaceTask import ReplaceTask, ReplaceRule, E_FAIL, E_PASSTHROUGH
+from dataunifier.tasks.SetFieldValueTask import SetFieldValueTask
+from dataunifier.tasks.UppercaseTask import UppercaseTask
+from dataunifier.when.And import And
+from dataunifier.when.Not import Not
+from dataunifier.when.WhenFieldMatchesRegex import WhenFieldMatchesRegex
+from dataunifier.when.WhenSimpleTest import WhenSimpleTest
+
+FIELDS = ["id", "name", "grade", "note"]
+
+
+def get_tasks():
+    return [
+        MapFieldsTask("Map Fields", [
+            Field("id", ["id"], True, True),
+            Field("name", ["name", "full name"], True, True),
+            Field("grade", ["grade"], True, False),
+            Field("note", [], False, False)
+        ]),
+        UppercaseTask("Uppercase", None, FIELDS, ["name"]),
+        ReplaceTask(
+            "Replace", WhenFieldMatchesRegex("grade", ["[A-E]"]), FIELDS, ["grade", "grade"], E_FAIL, True,
+            [ReplaceRule(["A"], "B"), ReplaceRule(["B"], "C"), ReplaceRule(["C"], "D")], "rulesFile"
+        ),
+        CsvMatchTask("Match", None, FIELDS, ["note"], {""}, "none", "some"),
+        ConcatenateFieldsTask("Concatenate", Not(WhenSimpleTest("false")), FIELDS, ["id", "grade"], "note", "-"),
+        SetFieldValueTask("Set", And([WhenFieldMatchesRegex("id", ["9"]), WhenSimpleTest("true")]), FIELDS, "name",
+                          "NINE"),
+        DiscardRecordTask("Discard", WhenFieldMatchesRegex("id", ["1[0-9]"]), FIELDS),
+        ReplaceTask(
+            "Replace Again", None, FIELDS, ["name"], E_PASSTHROUGH, False, [ReplaceRule(["BOB"], "Robert")],
+            "rulesFile"
+        ),
+        DiscardFieldsTask("Discard Fields", FIELDS, ["grade"])
+    ]
+
+
+def get_row_ctxt(tasks, plan, rowdict):
+    fileset = Fileset("fileset1", ["id", "name", "note"], [InputFile("inputFile1", ["regex1"], None)], tasks, plan)
+    return ParseRowContext(
+        ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer1"),
+                    fileset
+                ),
+                fileset.input_files[0]
+            ),
+            "filepath", None, []
+        ), 1, rowdict
+    )
+
+
+def transform_row(tasks, plan, rowdict):
+    try:
+        return parse.transform_row(get_row_ctxt(tasks, plan, rowdict))
+    except ParsingException as e:
+        return e.message
+
+
+class TestGetPlan(unittest.TestCase):
+    def test_successful(self):
+        tasks = get_tasks()
+        output1 = positional.get_plan(tasks)
+        self.assertEqual([], output1.dict_tasks)
+        self.assertEqual(tasks, [task for task, _ in output1.steps])
+        self.assertEqual(["id", "name", "note"], output1.fields)
+
+    def test_no_map_fields(self):
+        input1 = [UppercaseTask("Uppercase", None, None, ["name"])]
+        output1 = positional.get_plan(input1)
+        self.assertIsNone(output1)
+
+    def test_duplicate_fields(self):
+        input1 = [MapFieldsTask("Map Fields", [Field("id", ["a"], True, False), Field("id", ["b"], True, False)])]
+        output1 = positional.get_plan(input1)
+        self.assertIsNone(output1)
+
+    def test_pickle(self):
+        input1 = positional.get_plan(get_tasks())
+        output1 = pickle.loads(pickle.dumps(input1))
+        self.assertEqual(input1.tasks, output1.tasks)
+        self.assertEqual(len(input1.steps), len(output1.steps))
+
+
+class TestRun(unittest.TestCase):
+    def test_same_as_rowdicts(self):
+        tasks = get_tasks()
+        plan = positional.get_plan(tasks)
+        inputs = [
+            {"ID": "1", "Name": "bob", "grade": "A"},
+            {"ID": "2", "Full Name": "alice", "grade": "C", "extra": "x"},
+            {"ID": "9", "Name": "carol", "grade": ""},
+            {"ID": "10", "Name": "dave", "grade": "F"},
+            {"ID": "3", "Name": "eve", "grade": "B", "Full Name": "Eve"},
+            {"ID": "4", "Name": "frank"},
+            {"ID": "5", "Name": " \tgreg\n", "grade": "Z"}
+        ]
+        for rowdict in inputs:
+            correct1 = transform_row(tasks, None, rowdict)
+            output1 = transform_row(tasks, plan, rowdict)
+            self.assertEqual(correct1, output1, rowdict)
+
+    def test_unrecognised_value(self):
+        tasks = get_tasks()
+        input1 = {"ID": "1", "Name": "bob", "grade": "E"}
+        correct1 = 'When executing task "Replace" on row 1 of file "filepath": Encountered unrecognised value in ' \
+                   'field "grade": "E". (Rules in file "rulesFile")'
+        output1 = transform_row(tasks, positional.get_plan(tasks), input1)
+        self.assertEqual(correct1, output1)
+
+    def test_discard_record(self):
+        tasks = get_tasks()
+        input1 = {"ID": "10", "Name": "bob", "grade": "A"}
+        output1 = transform_row(tasks, positional.get_plan(tasks), input1)
+        self.assertIsNone(output1)
+
+
+def raise_task_name(row_ctxt, task, e):
+    raise ValueError("%d %s" % (row_ctxt.row_number, task.name))
+
+
+class TestRunChunk(unittest.TestCase):
+    def test_same_as_rowdicts(self):
+        tasks = get_tasks()
+        plan = positional.get_plan(tasks)
+        inputs = [
+            {"ID": "1", "Name": "bob", "grade": "A"},
+            {"ID": "2", "Full Name": "alice", "grade": "C", "extra": "x"},
+            {"ID": "9", "Name": "carol", "grade": ""},
+            {"ID": "10", "Name": "dave", "grade": "F"},
+            {"ID": "3", "Name": "eve", "grade": "B"}
+        ]
+        row_ctxts = [get_row_ctxt(tasks, plan, rowdict) for rowdict in inputs]
+        correct1 = [transform_row(tasks, None, rowdict) for rowdict in inputs]
+        output1 = [
+            None if values is None else plan.to_rowdict(values)
+            for values in positional.run_chunk(plan.dict_tasks, plan.steps, row_ctxts, inputs, raise_task_name)
+        ]
+        self.assertEqual(correct1, output1)
+        output2 = list(positional.run_chunk(tasks, [], row_ctxts, inputs, raise_task_name))
+        self.assertEqual(correct1, output2)
+
+    def test_first_failure(self):
+        tasks = get_tasks()
+        plan = positional.get_plan(tasks)
+        inputs = [
+            {"ID": "1", "Name": "bob", "grade": "A"},
+            {"ID": "10", "Name": "dave", "grade": "B"},
+            {"ID": "3", "Name": "eve", "grade": "E"},
+            {"ID": "4", "Name": "frank", "grade": ""}
+        ]
+        row_ctxts = [
+            ParseRowContext(get_row_ctxt(tasks, plan, rowdict).parent, i + 1, rowdict)
+            for i, rowdict in enumerate(inputs)
+        ]
+        output1 = []
+        try:
+            for values in positional.run_chunk(plan.dict_tasks, plan.steps, row_ctxts, inputs, raise_task_name):
+                output1.append(values)
+            self.fail()
+        except ValueError as e:
+            self.assertEqual("3 Replace", str(e))
+        correct1 = [["1", "Robert", "none"], None]
+        self.assertEqual(correct1, output1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 from dataunifier.cmdline.classes import CommandLineContext
@@ -8,7 +10,8 @@ from dataunifier.parse.classes import ParseRowContext, ParseIteratorContext, Par
 from dataunifier.tasks import CsvLookupReplaceTask
 from dataunifier.tasks.CsvLookupReplaceTask import K_CSV_LOOKUP_REPLACE, E_FAIL, E_PASSTHROUGH, E_BLANK, K_FIELDS, \
     K_DIRECTORY, K_FILENAME_REGEX, K_LOOKUP_COLUMN, K_VALUE_COLUMN, K_ON_UNMATCHED, K_DEDUPLICATE_BY, \
-    E_LOWER_ROW_NUMBER, E_HIGHER_ROW_NUMBER
+    E_LOWER_ROW_NUMBER, E_HIGHER_ROW_NUMBER, K_INDEX_DIRECTORY
+from dataunifier.utils.lookupindex import LookupIndex
 from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
 from dataunifier.when.WhenSimpleTest import WhenSimpleTest
 from tests.constants import TESTASSETS_DIR, TESTCSV_NAME, TESTCSV_DUP_NAME, TESTCSV_DUP_PATH, TESTCSV_PATH
@@ -236,6 +239,98 @@ class TestCsvLookupReplaceTask(unittest.TestCase):
         output1 = task.lookup_dict["lookup1"]
         self.assertEqual(correct1, output1)
 
+    def test_create_from_config_with_index_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_dict = {
+                K_FIELDS: ["field1"],
+                K_DIRECTORY: "%INPUT_DIR%",
+                K_FILENAME_REGEX: "^testcsv\\.csv$",
+                K_LOOKUP_COLUMN: "lookup",
+                K_VALUE_COLUMN: "value",
+                K_ON_UNMATCHED: E_FAIL,
+                K_INDEX_DIRECTORY: os.path.join(temp_dir, "index")
+            }
+            input1 = TaskParsingContext(
+                YamlPathContext(
+                    CommandLineContext(TESTASSETS_DIR, "outputFilePath", False, "configFilePath"),
+                    "currentFile", "current.key", config_dict
+                ),
+                "taskName",
+                K_CSV_LOOKUP_REPLACE,
+                WhenSimpleTest("when"),
+                TestFieldCreatorTask("prevTask", ["field1", "field2"])
+            )
+            output1 = CsvLookupReplaceTask.create_from_config(input1)
+            self.assertIsInstance(output1.lookup_dict, LookupIndex)
+            self.assertEqual("value2", output1.lookup_dict.get("lookup2"))
+            self.assertIsNone(output1.lookup_dict.get("lookup3"))
+            output1.lookup_dict.close()
+            output2 = CsvLookupReplaceTask.create_from_config(input1)
+            self.assertEqual(output1, output2)
+            self.assertEqual(2, len(output2.lookup_dict))
+            output2.lookup_dict.close()
+
+    def test_create_from_config_with_index_directory_duplicate_value(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_dict = {
+                K_FIELDS: ["field1"],
+                K_DIRECTORY: TESTASSETS_DIR,
+                K_FILENAME_REGEX: "^testcsv_dup\\.csv$",
+                K_LOOKUP_COLUMN: "lookup",
+                K_VALUE_COLUMN: "value",
+                K_ON_UNMATCHED: E_FAIL,
+                K_INDEX_DIRECTORY: temp_dir
+            }
+            input1 = TaskParsingContext(
+                YamlPathContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    "currentFile", "current.key", config_dict
+                ),
+                "taskName",
+                K_CSV_LOOKUP_REPLACE,
+                WhenSimpleTest("when"),
+                TestFieldCreatorTask("prevTask", ["field1", "field2"])
+            )
+            try:
+                CsvLookupReplaceTask.create_from_config(input1)
+                self.fail()
+            except ConfigException as e:
+                correct1 = 'Duplicate value "%s" found in lookup column "%s" of file "%s", when preparing %s ' \
+                           'task "%s" (File "%s")' % (
+                               "lookup1", "lookup", TESTCSV_DUP_PATH, K_CSV_LOOKUP_REPLACE, "taskName", "currentFile"
+                           )
+                output1 = e.message
+                self.assertEqual(correct1, output1)
+            self.assertEqual([], os.listdir(temp_dir))
+
+    def test_create_from_config_with_index_directory_deduplicate_by_higher_row_number(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_dict = {
+                K_FIELDS: ["field1"],
+                K_DIRECTORY: TESTASSETS_DIR,
+                K_FILENAME_REGEX: "^testcsv_dup\\.csv$",
+                K_LOOKUP_COLUMN: "lookup",
+                K_VALUE_COLUMN: "value",
+                K_ON_UNMATCHED: E_FAIL,
+                K_DEDUPLICATE_BY: E_HIGHER_ROW_NUMBER,
+                K_INDEX_DIRECTORY: temp_dir
+            }
+            input1 = TaskParsingContext(
+                YamlPathContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    "currentFile", "current.key", config_dict
+                ),
+                "taskName",
+                K_CSV_LOOKUP_REPLACE,
+                WhenSimpleTest("when"),
+                TestFieldCreatorTask("prevTask", ["field1", "field2"])
+            )
+            task = CsvLookupReplaceTask.create_from_config(input1)
+            correct1 = "value3"
+            output1 = task.lookup_dict["lookup1"]
+            task.lookup_dict.close()
+            self.assertEqual(correct1, output1)
+
     def test_create_from_config_missing_lookup_col(self):
         config_dict = {
             K_FIELDS: ["field1"],
@@ -637,6 +732,50 @@ class TestCsvLookupReplaceTask(unittest.TestCase):
         output1 = obj1.transform(input1)
         self.assertEqual(correct1, output1)
 
+    def test_transform_matched_none(self):
+        lookup_dict = {"a1": None, "a2": "b2"}
+        obj1 = CsvLookupReplaceTask(
+            "taskName", WhenSimpleTest("true"), ["field1", "field2"], ["field1"], lookup_dict, E_FAIL
+        )
+        input1 = ParseRowContext(
+            ParseIteratorContext(
+                ParseInputFileContext(
+                    ParseFilesetContext(
+                        CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                        TestBogusDictWriter("writer1"),
+                        Fileset(
+                            "fileset1",
+                            ["field1"],
+                            [InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])],
+                            TestFieldCreatorTask("task1", ["field1", "field2"])
+                        )
+                    ),
+                    InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])
+                ),
+                "filepath", "sheet", ["row1", "row2"]
+            ), 1, {"field1": "a1", "field2": "a2"}
+        )
+        correct1 = ParseRowContext(
+            ParseIteratorContext(
+                ParseInputFileContext(
+                    ParseFilesetContext(
+                        CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                        TestBogusDictWriter("writer1"),
+                        Fileset(
+                            "fileset1",
+                            ["field1"],
+                            [InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])],
+                            TestFieldCreatorTask("task1", ["field1", "field2"])
+                        )
+                    ),
+                    InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])
+                ),
+                "filepath", "sheet", ["row1", "row2"]
+            ), 1, {"field1": None, "field2": "a2"}
+        )
+        output1 = obj1.transform(input1)
+        self.assertEqual(correct1, output1)
+
     def test_transform_unmatched_blank(self):
         lookup_dict = {"a1": "b1", "a2": "b2"}
         obj1 = CsvLookupReplaceTask(
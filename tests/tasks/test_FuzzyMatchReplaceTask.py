@@ -1,4 +1,6 @@
+import sys
 import unittest
+from unittest import mock
 
 from dataunifier.cmdline.classes import CommandLineContext
 from dataunifier.common.exceptions import TransformationException, ConfigException
@@ -7,12 +9,29 @@ from dataunifier.parse.classes import ParseRowContext, ParseIteratorContext, Par
     TestBogusDictWriter
 from dataunifier.tasks.FuzzyMatchReplaceTask import JaccardRule, K_FUZZY_MATCH_REPLACE, E_JACCARD, E_FAIL, E_BLANK, \
     E_PASSTHROUGH, K_FIELDS, K_METHOD, K_RULES, K_STRING, K_REPLACEMENT, K_MINIMUM_SCORE, K_ON_UNMATCHED, \
-    DEFAULT_NGRAM_SIZE, K_NGRAM_SIZE
+    DEFAULT_NGRAM_SIZE, K_NGRAM_SIZE, K_CACHE_SIZE, E_LEVENSHTEIN, E_TFIDF, LevenshteinRule, TfidfRule, IdfTable, \
+    K_PROCESSES
 from dataunifier.tasks import FuzzyMatchReplaceTask
 from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
 from dataunifier.when.WhenSimpleTest import WhenSimpleTest
 
 
+def get_row_ctxt(rowdict):
+    return ParseRowContext(
+        ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer1"),
+                    Fileset("fileset1", list(rowdict), [InputFile("inputFile1", ["regex1"], None)], [])
+                ),
+                InputFile("inputFile1", ["regex1"], None)
+            ),
+            "filepath", None, []
+        ), 1, rowdict
+    )
+
+
 class TestJaccardRule(unittest.TestCase):
     def test_eq(self):
         obj1 = JaccardRule("string1", "replacement1", 3)
@@ -74,6 +93,90 @@ class TestJaccardRule(unittest.TestCase):
         self.assertEqual(correct1, output1)
 
 
+class TestLevenshteinRule(unittest.TestCase):
+    def test_eq(self):
+        obj1 = LevenshteinRule("string1", "replacement1")
+        obj2 = LevenshteinRule("string1", "replacement1")
+        self.assertTrue(obj1 == obj2)
+        self.assertFalse(obj1 != obj2)
+
+    def test_ne_diff_string(self):
+        obj1 = LevenshteinRule("string1", "replacement1")
+        obj2 = LevenshteinRule("string2", "replacement1")
+        self.assertFalse(obj1 == obj2)
+        self.assertTrue(obj1 != obj2)
+
+    def test_evaluate_100_percent(self):
+        obj1 = LevenshteinRule("string1", "replacement1")
+        input1 = "string1"
+        correct1 = 1.0
+        output1 = obj1.evaluate(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_evaluate_75_percent(self):
+        obj1 = LevenshteinRule("AB12", "replacement1")
+        input1 = "AB13"
+        correct1 = 0.75
+        output1 = obj1.evaluate(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_evaluate_longer_value(self):
+        obj1 = LevenshteinRule("AB12", "replacement1")
+        input1 = "XAB12X"
+        correct1 = 1 - 2 / 6
+        output1 = obj1.evaluate(input1)
+        self.assertEqual(correct1, output1)
+
+
+class TestTfidfRule(unittest.TestCase):
+    def test_eq(self):
+        idf_table = IdfTable([["str"]])
+        obj1 = TfidfRule("string1", "replacement1", 3, idf_table)
+        obj2 = TfidfRule("string1", "replacement1", 3, IdfTable([]))
+        self.assertTrue(obj1 == obj2)
+        self.assertFalse(obj1 != obj2)
+
+    def test_ne_diff_ngram_size(self):
+        idf_table = IdfTable([["str"]])
+        obj1 = TfidfRule("string1", "replacement1", 3, idf_table)
+        obj2 = TfidfRule("string1", "replacement1", 2, idf_table)
+        self.assertFalse(obj1 == obj2)
+        self.assertTrue(obj1 != obj2)
+
+    def test_vectorise(self):
+        obj1 = TfidfRule("abab", "replacement1", 2, IdfTable([["ab", "ba", "ab"], ["ab"]]))
+        input1 = "abab"
+        # "ab" occurs twice with an IDF of 1, "ba" once with an IDF of log(3 / 2) + 1.
+        weights = {"ab": 2.0, "ba": 1.4054651081081644}
+        norm = (weights["ab"] ** 2 + weights["ba"] ** 2) ** 0.5
+        correct1 = {"ab": weights["ab"] / norm, "ba": weights["ba"] / norm}
+        output1 = obj1.vectorise(input1)
+        self.assertEqual(correct1.keys(), output1.keys())
+        for ngram in correct1:
+            self.assertAlmostEqual(correct1[ngram], output1[ngram])
+
+    def test_evaluate_100_percent(self):
+        obj1 = TfidfRule("string1", "replacement1", 3, IdfTable([["str", "tri"]]))
+        input1 = "string1"
+        correct1 = 1.0
+        output1 = obj1.evaluate(input1)
+        self.assertAlmostEqual(correct1, output1)
+
+    def test_evaluate_0_percent(self):
+        obj1 = TfidfRule("string1", "replacement1", 3, IdfTable([["str", "tri"]]))
+        input1 = "1gnirts"
+        correct1 = 0.0
+        output1 = obj1.evaluate(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_evaluate_rare_ngrams_count_more(self):
+        idf_table = IdfTable([["ab", "bc"], ["ab", "cd"], ["ab", "de"]])
+        obj1 = TfidfRule("abc", "replacement1", 2, idf_table)
+        output1 = obj1.evaluate("bcx")
+        output2 = obj1.evaluate("abx")
+        self.assertGreater(output1, output2)
+
+
 class TestFuzzyMatchReplaceTask(unittest.TestCase):
     def test_create_from_config(self):
         config_dict = {
@@ -207,6 +310,175 @@ class TestFuzzyMatchReplaceTask(unittest.TestCase):
             output1 = e.message
             self.assertEqual(correct1, output1)
 
+    def test_create_from_config_with_cache_size(self):
+        config_dict = {
+            K_FIELDS: ["field1"],
+            K_RULES: [
+                {K_STRING: "string1", K_REPLACEMENT: "replacement1"}
+            ],
+            K_ON_UNMATCHED: E_FAIL,
+            K_CACHE_SIZE: 5
+        }
+        input1 = TaskParsingContext(
+            YamlPathContext(
+                CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                "currentFile", "current.key", config_dict
+            ),
+            "taskName",
+            K_FUZZY_MATCH_REPLACE,
+            WhenSimpleTest("when"),
+            TestFieldCreatorTask("prevTask", ["field1", "field2"])
+        )
+        correct1 = FuzzyMatchReplaceTask(
+            "taskName", WhenSimpleTest("when"), ["field1", "field2"], ["field1"], E_JACCARD,
+            [JaccardRule("string1", "replacement1", DEFAULT_NGRAM_SIZE)], 0.0, E_FAIL, 5
+        )
+        output1 = FuzzyMatchReplaceTask.create_from_config(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_create_from_config_with_processes(self):
+        config_dict = {
+            K_FIELDS: ["field1"],
+            K_RULES: [
+                {K_STRING: "string1", K_REPLACEMENT: "replacement1"}
+            ],
+            K_ON_UNMATCHED: E_FAIL,
+            K_PROCESSES: 4
+        }
+        input1 = TaskParsingContext(
+            YamlPathContext(
+                CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                "currentFile", "current.key", config_dict
+            ),
+            "taskName",
+            K_FUZZY_MATCH_REPLACE,
+            WhenSimpleTest("when"),
+            TestFieldCreatorTask("prevTask", ["field1", "field2"])
+        )
+        correct1 = FuzzyMatchReplaceTask(
+            "taskName", WhenSimpleTest("when"), ["field1", "field2"], ["field1"], E_JACCARD,
+            [JaccardRule("string1", "replacement1", DEFAULT_NGRAM_SIZE)], 0.0, E_FAIL, processes=4
+        )
+        output1 = FuzzyMatchReplaceTask.create_from_config(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_create_from_config_processes_invalid(self):
+        config_dict = {
+            K_FIELDS: ["field1"],
+            K_RULES: [
+                {K_STRING: "string1", K_REPLACEMENT: "replacement1"}
+            ],
+            K_ON_UNMATCHED: E_FAIL,
+            K_PROCESSES: "0"
+        }
+        input1 = TaskParsingContext(
+            YamlPathContext(
+                CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                "currentFile", "current.key", config_dict
+            ),
+            "taskName",
+            K_FUZZY_MATCH_REPLACE,
+            WhenSimpleTest("when"),
+            TestFieldCreatorTask("prevTask", ["field1", "field2"])
+        )
+        try:
+            FuzzyMatchReplaceTask.create_from_config(input1)
+            self.fail()
+        except ConfigException as e:
+            correct1 = 'Invalid %s: "%s". Must be an integer more than 0. (File "%s", Task "%s")' % (
+                K_PROCESSES, "0", "currentFile", "taskName"
+            )
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_create_from_config_levenshtein(self):
+        config_dict = {
+            K_FIELDS: ["field1"],
+            K_METHOD: E_LEVENSHTEIN,
+            K_RULES: [
+                {K_STRING: ["string1", "string2"], K_REPLACEMENT: "replacement1"}
+            ],
+            K_ON_UNMATCHED: E_FAIL
+        }
+        input1 = TaskParsingContext(
+            YamlPathContext(
+                CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                "currentFile", "current.key", config_dict
+            ),
+            "taskName",
+            K_FUZZY_MATCH_REPLACE,
+            WhenSimpleTest("when"),
+            TestFieldCreatorTask("prevTask", ["field1", "field2"])
+        )
+        correct1 = FuzzyMatchReplaceTask(
+            "taskName", WhenSimpleTest("when"), ["field1", "field2"], ["field1"], E_LEVENSHTEIN,
+            [LevenshteinRule("string1", "replacement1"), LevenshteinRule("string2", "replacement1")], 0.0, E_FAIL
+        )
+        output1 = FuzzyMatchReplaceTask.create_from_config(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_create_from_config_tfidf(self):
+        config_dict = {
+            K_FIELDS: ["field1"],
+            K_METHOD: E_TFIDF,
+            K_NGRAM_SIZE: 2,
+            K_RULES: [
+                {K_STRING: "string1", K_REPLACEMENT: "replacement1"},
+                {K_STRING: "other", K_REPLACEMENT: "replacement2"}
+            ],
+            K_ON_UNMATCHED: E_FAIL
+        }
+        input1 = TaskParsingContext(
+            YamlPathContext(
+                CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                "currentFile", "current.key", config_dict
+            ),
+            "taskName",
+            K_FUZZY_MATCH_REPLACE,
+            WhenSimpleTest("when"),
+            TestFieldCreatorTask("prevTask", ["field1", "field2"])
+        )
+        output1 = FuzzyMatchReplaceTask.create_from_config(input1)
+        correct1 = FuzzyMatchReplaceTask(
+            "taskName", WhenSimpleTest("when"), ["field1", "field2"], ["field1"], E_TFIDF,
+            [
+                TfidfRule("string1", "replacement1", 2, output1.rules[0].idf_table),
+                TfidfRule("other", "replacement2", 2, output1.rules[0].idf_table)
+            ], 0.0, E_FAIL
+        )
+        self.assertEqual(correct1, output1)
+        self.assertIs(output1.rules[0].idf_table, output1.rules[1].idf_table)
+        self.assertEqual(2, output1.rules[0].idf_table.document_count)
+
+    def test_create_from_config_cache_size_invalid(self):
+        config_dict = {
+            K_FIELDS: ["field1"],
+            K_RULES: [
+                {K_STRING: "string1", K_REPLACEMENT: "replacement1"}
+            ],
+            K_ON_UNMATCHED: E_FAIL,
+            K_CACHE_SIZE: "-1"
+        }
+        input1 = TaskParsingContext(
+            YamlPathContext(
+                CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                "currentFile", "current.key", config_dict
+            ),
+            "taskName",
+            K_FUZZY_MATCH_REPLACE,
+            WhenSimpleTest("when"),
+            TestFieldCreatorTask("prevTask", ["field1", "field2"])
+        )
+        try:
+            FuzzyMatchReplaceTask.create_from_config(input1)
+            self.fail()
+        except ConfigException as e:
+            correct1 = 'Invalid %s: "%s". Must be an integer not less than 0. (File "%s", Task "%s")' % (
+                K_CACHE_SIZE, "-1", "currentFile", "taskName"
+            )
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
     def test_create_from_config_ngram_size_invalid(self):
         config_dict = {
             K_FIELDS: ["field1"],
@@ -264,7 +536,8 @@ class TestFuzzyMatchReplaceTask(unittest.TestCase):
             self.fail()
         except ConfigException as e:
             correct1 = 'Invalid value for key "%s": "%s". Accepted values are: "%s". (File "%s")' % (
-                "current.key.%s" % K_METHOD, "invalidMethod", '", "'.join([E_JACCARD]), "currentFile"
+                "current.key.%s" % K_METHOD, "invalidMethod",
+                '", "'.join([E_JACCARD, E_LEVENSHTEIN, E_TFIDF]), "currentFile"
             )
             output1 = e.message
             self.assertEqual(correct1, output1)
@@ -718,6 +991,114 @@ class TestFuzzyMatchReplaceTask(unittest.TestCase):
             output1 = e.message
             self.assertEqual(correct1, output1)
 
+    def test_transform_levenshtein(self):
+        obj1 = FuzzyMatchReplaceTask(
+            "taskName", None, ["field1"], ["field1"], E_LEVENSHTEIN,
+            [LevenshteinRule("AB12", "replacement1"), LevenshteinRule("AB21", "replacement2")], 0.7, E_BLANK
+        )
+        input1 = ["AB13", "AB22", "AB12", "XY99"]
+        correct1 = ["replacement1", "replacement1", "replacement1", ""]
+        output1 = [
+            obj1.transform(get_row_ctxt({"field1": value})).rowdict["field1"] for value in input1
+        ]
+        self.assertEqual(correct1, output1)
+
+    def test_transform_tfidf(self):
+        rules = [("north street", "1"), ("south street", "2"), ("north avenue", "3")]
+        idf_table = IdfTable([["x"]])
+        obj1 = FuzzyMatchReplaceTask(
+            "taskName", None, ["field1"], ["field1"], E_TFIDF,
+            [TfidfRule(string, replacement, 3, idf_table) for string, replacement in rules], 0.3, E_PASSTHROUGH
+        )
+        input1 = ["nrth street", "north ave", "zzz"]
+        correct1 = ["1", "3", "zzz"]
+        output1 = [
+            obj1.transform(get_row_ctxt({"field1": value})).rowdict["field1"] for value in input1
+        ]
+        self.assertEqual(correct1, output1)
+
+    def test_prepare(self):
+        with mock.patch.object(sys.modules[FuzzyMatchReplaceTask.__module__], "MATRIX_RULE_COUNT", 2):
+            obj1 = FuzzyMatchReplaceTask(
+                "taskName", None, ["field1", "field2"], ["field1"], E_JACCARD,
+                [JaccardRule("string1", "replacement1", 3), JaccardRule("string2", "replacement2", 3)], 0.5,
+                E_PASSTHROUGH
+            )
+        self.assertTrue(obj1.is_chunked())
+        obj1.prepare([["string2", "x"], ["string1", "y"], ["string2", "z"], ["zzz", "w"]], {"field1": 0, "field2": 1})
+        correct1 = {
+            "string2": (obj1.rules[1], 1.0),
+            "string1": (obj1.rules[0], 1.0),
+            "zzz": (None, 0.0)
+        }
+        output1 = dict(obj1.cache.entries)
+        self.assertEqual(correct1, output1)
+
+    def test_prepare_rowdicts(self):
+        with mock.patch.object(sys.modules[FuzzyMatchReplaceTask.__module__], "MATRIX_RULE_COUNT", 2):
+            obj1 = FuzzyMatchReplaceTask(
+                "taskName", None, None, ["field1"], E_JACCARD,
+                [JaccardRule("string1", "replacement1", 3), JaccardRule("string2", "replacement2", 3)], 0.0,
+                E_PASSTHROUGH
+            )
+        obj1.prepare([{"field1": "string3"}, {"field2": "string1"}], None)
+        correct1 = {"string3": (obj1.rules[0], 4 / 6)}
+        output1 = dict(obj1.cache.entries)
+        self.assertEqual(correct1, output1)
+
+    def test_prepare_processes(self):
+        rules = [LevenshteinRule("AB%02d" % i, str(i)) for i in range(100)]
+        obj1 = FuzzyMatchReplaceTask("taskName", None, None, ["field1"], E_LEVENSHTEIN, rules, 0.0, E_PASSTHROUGH)
+        obj2 = FuzzyMatchReplaceTask(
+            "taskName", None, None, ["field1"], E_LEVENSHTEIN, rules, 0.0, E_PASSTHROUGH, processes=3
+        )
+        self.assertFalse(obj1.is_chunked())
+        self.assertTrue(obj2.is_chunked())
+        input1 = [{"field1": value} for value in ["AB1", "XB23", "AB99", "AB999", "", "ZZ", "AB1"]]
+        try:
+            obj2.prepare(input1, None)
+        finally:
+            obj2.close()
+        correct1 = {row["field1"]: obj1.match_values([row["field1"]])[0] for row in input1}
+        output1 = {
+            value: (None if rule is None else rules.index(rule), score)
+            for value, (rule, score) in obj2.cache.entries.items()
+        }
+        self.assertEqual(correct1, output1)
+
+    def test_is_chunked_few_rules(self):
+        obj1 = FuzzyMatchReplaceTask(
+            "taskName", None, None, ["field1"], E_JACCARD, [JaccardRule("string1", "replacement1", 3)], 0.0,
+            E_PASSTHROUGH
+        )
+        self.assertFalse(obj1.is_chunked())
+
+    def test_get_summary(self):
+        obj1 = FuzzyMatchReplaceTask(
+            "taskName", None, ["field1"], ["field1"], E_JACCARD,
+            [JaccardRule("string1", "replacement1", DEFAULT_NGRAM_SIZE)], 0.0, E_PASSTHROUGH, 1
+        )
+        iterator_ctxt = ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer1"),
+                    Fileset("fileset1", ["field1"], [InputFile("inputFile1", ["regex1"], None)], [])
+                ),
+                InputFile("inputFile1", ["regex1"], None)
+            ),
+            "filepath", None, []
+        )
+        input1 = ["string1", "string1", "string2", "string1"]
+        correct1 = ["replacement1", "replacement1", "replacement1", "replacement1"]
+        output1 = [
+            obj1.transform(ParseRowContext(iterator_ctxt, 1, {"field1": value})).rowdict["field1"] for value in input1
+        ]
+        self.assertEqual(correct1, output1)
+        correct2 = ['%s task "taskName": 1 of 4 values found in cache (25.0%%, cache size 1).' % K_FUZZY_MATCH_REPLACE]
+        output2 = obj1.get_summary()
+        self.assertEqual(correct2, output2)
+
     def test_get_resulting_fields(self):
         obj1 = FuzzyMatchReplaceTask(
             "taskName", None, ["field1", "field2"], ["field1"], E_JACCARD,
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 
 from dataunifier.cmdline.classes import CommandLineContext
 from dataunifier.common.exceptions import ConfigException, TransformationException
@@ -397,6 +398,42 @@ class TestMapFieldsTask(unittest.TestCase):
             output1 = e.message
             self.assertEqual(correct1, output1)
 
+    def test_transform_resolves_each_header_once(self):
+        obj1 = MapFieldsTask("name", [
+            Field("targetField1", ["srcfield1a", "srcfield1b"], True, True),
+            Field("targetField2", ["srcField2a", "srcField2b"], False, False)
+        ])
+        iterator_ctxt = ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer1"),
+                    Fileset(
+                        "fileset1",
+                        ["field1"],
+                        [InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])],
+                        TestFieldCreatorTask("task1", ["field1"])
+                    )
+                ),
+                InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])
+            ),
+            "filepath", "sheet", ["row1", "row2"]
+        )
+        input1 = [
+            {"SrcField1A": "value1", "srcField2b": "value2"},
+            {"SrcField1A": "value3", "srcField2b": "value4"},
+            {"srcField1B": "value5", "other": "value6"}
+        ]
+        correct1 = [
+            {"targetField1": "value1", "targetField2": "value2"},
+            {"targetField1": "value3", "targetField2": "value4"},
+            {"targetField1": "value5", "targetField2": ""}
+        ]
+        with mock.patch.object(obj1, "_MapFieldsTask__resolve", wraps=obj1._MapFieldsTask__resolve) as resolve:
+            output1 = [obj1.transform(ParseRowContext(iterator_ctxt, 1, rowdict)).rowdict for rowdict in input1]
+            self.assertEqual(2, resolve.call_count)
+        self.assertEqual(correct1, output1)
+
     def test_get_resulting_fields(self):
         obj1 = MapFieldsTask("name", [
             Field("targetField1", ["srcField1a", "srcField1b"], True, False),
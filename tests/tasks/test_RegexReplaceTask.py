@@ -1,3 +1,4 @@
+import pickle
 import re
 import unittest
 
@@ -13,6 +14,35 @@ from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
 from dataunifier.when.WhenSimpleTest import WhenSimpleTest
 
 
+def get_row_ctxt(rowdict):
+    return ParseRowContext(
+        ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer1"),
+                    Fileset(
+                        "fileset1",
+                        ["field1"],
+                        [InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])],
+                        TestFieldCreatorTask("task1", ["field1"])
+                    )
+                ),
+                InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])
+            ),
+            "filepath", "sheet", ["row1", "row2"]
+        ), 1, rowdict
+    )
+
+
+def replace_by_searching(rules, value):
+    for rule in rules:
+        for pattern in rule.pattern_list:
+            if pattern.search(value):
+                return pattern.sub(rule.replacement, value)
+    return value
+
+
 class TestRegexReplaceRule(unittest.TestCase):
     def test_eq(self):
         obj1 = RegexReplaceRule([re.compile("regex1"), re.compile("regex2")], "replacement")
@@ -633,6 +663,31 @@ class TestRegexReplaceTask(unittest.TestCase):
             output1 = e.message
             self.assertEqual(correct1, output1)
 
+    def test_transform_first_matching_rule(self):
+        rules = [
+            RegexReplaceRule([re.compile("a"), re.compile("(?i)^z")], "A"),
+            RegexReplaceRule([re.compile("x(y)?")], "[\\1]"),
+            RegexReplaceRule([re.compile("(.)\\1")], "double"),
+            RegexReplaceRule([re.compile("^(?P<first>.)"), re.compile("(?P<first>.)$")], "<\\g<first>>"),
+        ]
+        obj1 = RegexReplaceTask("taskName", None, ["field1"], ["field1"], E_FAIL, False, rules, "rulesFile")
+        input1 = ["xa", "xy", "Zoo", "ooo", "bb", "q", "xyxa"]
+        correct1 = [replace_by_searching(rules, value) for value in input1]
+        output1 = [obj1.transform(get_row_ctxt({"field1": value})).rowdict["field1"] for value in input1]
+        self.assertEqual(["xA", "[y]", "Aoo", "doubleo", "double", "<q>", "xyxA"], correct1)
+        self.assertEqual(correct1, output1)
+
+    def test_pickle(self):
+        obj1 = RegexReplaceTask(
+            "taskName", None, ["field1"], ["field1"], E_FAIL, False,
+            [RegexReplaceRule([re.compile("^a"), re.compile("b")], "c")], "rulesFile"
+        )
+        output1 = pickle.loads(pickle.dumps(obj1))
+        self.assertEqual(obj1, output1)
+        correct2 = "cc"
+        output2 = output1.transform(get_row_ctxt({"field1": "bb"})).rowdict["field1"]
+        self.assertEqual(correct2, output2)
+
     def test_get_resulting_fields(self):
         obj1 = RegexReplaceTask(
             "taskName", WhenSimpleTest(), ["field1", "field2"], ["field1"], E_FAIL, True, [], "rulesFile"
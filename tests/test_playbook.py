@@ -0,0 +1,87 @@
+import io
+import unittest
+from unittest import mock
+
+from dataunifier import Playbook
+from dataunifier.common.exceptions import CommandLineException, ConfigException, ParsingException
+from dataunifier.parse.classes import TestBogusDictWriter
+from tests.constants import TESTASSETS_DIR, TESTPLAYBOOK_PATH
+
+
+class TestPlaybook(unittest.TestCase):
+    def test_load_nonexistent(self):
+        try:
+            Playbook.load("nonexistent.yaml")
+            self.fail()
+        except CommandLineException as e:
+            correct1 = 'Could not find configuration file "nonexistent.yaml".'
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_fields(self):
+        obj1 = Playbook.load(TESTPLAYBOOK_PATH)
+        correct1 = ["field1", "field2"]
+        output1 = obj1.fields
+        self.assertEqual(correct1, output1)
+
+    def test_transform_rows(self):
+        obj1 = Playbook.load(TESTPLAYBOOK_PATH)
+        input1 = [
+            {"lookup": " lookup1 ", "value": "value1"},
+            {"lookup": "discard", "value": "value2"},
+            {"lookup": "lookup3", "value": "value3"}
+        ]
+        correct1 = [
+            {"field1": "lookup1", "field2": "VALUE1"},
+            {"field1": "lookup3", "field2": "VALUE3"}
+        ]
+        output1 = list(obj1.transform_rows(input1))
+        self.assertEqual(correct1, output1)
+        output2 = list(obj1.transform_rows(iter(input1), "Test Playbook"))
+        self.assertEqual(correct1, output2)
+
+    def test_transform_rows_exception(self):
+        obj1 = Playbook.load(TESTPLAYBOOK_PATH)
+        input1 = [
+            {"lookup": "lookup1", "value": "value1"},
+            {"value": "value2"}
+        ]
+        try:
+            list(obj1.transform_rows(input1, source_name="batch"))
+            self.fail()
+        except ParsingException as e:
+            self.assertTrue(e.message.startswith('When executing task "Map Fields" on row 2 of file "batch": '))
+
+    def test_get_fileset_nonexistent(self):
+        obj1 = Playbook.load(TESTPLAYBOOK_PATH)
+        try:
+            obj1.transform_rows([], "Nonexistent")
+            self.fail()
+        except ConfigException as e:
+            correct1 = 'Could not find fileset "Nonexistent" in playbook "%s".' % TESTPLAYBOOK_PATH
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_run(self):
+        obj1 = Playbook.load(TESTPLAYBOOK_PATH)
+        output1 = io.StringIO(newline="")
+        obj1.run(TESTASSETS_DIR, output1)
+        correct1 = "field1,field2\r\nlookup1,VALUE1\r\nlookup2,VALUE2\r\n"
+        self.assertEqual(correct1, output1.getvalue())
+        writer = TestBogusDictWriter("")
+        obj1.run(TESTASSETS_DIR, writer)
+        correct2 = [
+            {"field1": "lookup1", "field2": "VALUE1"},
+            {"field1": "lookup2", "field2": "VALUE2"}
+        ]
+        self.assertEqual(correct2, writer.rowdicts)
+
+    def test_close(self):
+        obj1 = Playbook.load(TESTPLAYBOOK_PATH)
+        with mock.patch.object(type(obj1.get_fileset().tasks[0]), "close") as close:
+            with obj1:
+                output1 = list(obj1.transform_rows([{"lookup": "lookup1", "value": "value1"}]))
+                self.assertEqual(0, close.call_count)
+            self.assertEqual(1, close.call_count)
+        correct1 = [{"field1": "lookup1", "field2": "VALUE1"}]
+        self.assertEqual(correct1, output1)
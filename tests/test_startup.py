@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import unittest
+
+# Cumulative import time of the command line entry point, in microseconds, as reported by "python -X importtime".
+STARTUP_BUDGET = 250000
+HEAVY_MODULES = ["pandas", "numpy", "xlrd", "pytz"]
+RUNS = 3
+
+
+def _get_import_times(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % module], capture_output=True, text=True, check=True
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+class TestStartup(unittest.TestCase):
+    def test_no_heavy_modules(self):
+        import_times = _get_import_times("dataunifier.run")
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, import_times)
+
+    def test_budget(self):
+        output1 = min([_get_import_times("dataunifier.run")["dataunifier.run"] for _ in range(RUNS)])
+        self.assertLess(output1, STARTUP_BUDGET)
@@ -1,5 +1,8 @@
+import io
 import unittest
+from unittest import mock
 
+from dataunifier.utils import display
 from dataunifier.utils.display import ProgressBar
 
 
@@ -7,3 +10,22 @@ class TestProgressBar(unittest.TestCase):
     def test_zero_total(self):
         obj1 = ProgressBar(0)
         obj1.close()
+
+
+class TestSetMessagesToStderr(unittest.TestCase):
+    def tearDown(self):
+        display.set_messages_to_stderr(False)
+
+    def test_to_stderr(self):
+        display.set_messages_to_stderr()
+        with mock.patch("sys.stdout", new=io.StringIO()) as out, mock.patch("sys.stderr", new=io.StringIO()) as err:
+            display.stdout("message")
+        self.assertEqual("", out.getvalue())
+        self.assertEqual("message\n", err.getvalue())
+
+    def test_to_stdout(self):
+        display.set_messages_to_stderr(False)
+        with mock.patch("sys.stdout", new=io.StringIO()) as out, mock.patch("sys.stderr", new=io.StringIO()) as err:
+            display.stdout("message")
+        self.assertEqual("message\n", out.getvalue())
+        self.assertEqual("", err.getvalue())
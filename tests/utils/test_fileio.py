@@ -1,4 +1,5 @@
 import os
+import tempfile
 import unittest
 
 from dataunifier.utils import fileio
@@ -150,9 +151,58 @@ class TestGetExtension(unittest.TestCase):
         self.assertEqual(correct1, output1)
 
 
+class TestPrepareDir(unittest.TestCase):
+    def test_only_matching_files_removed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for file_name in ["region=APAC.csv", "region=EMEA (2).csv", "vendor.csv", "region=notes.txt"]:
+                with open(os.path.join(temp_dir, file_name), "w") as f:
+                    f.write("abc")
+            correct1 = [os.path.join(temp_dir, "region=APAC.csv"), os.path.join(temp_dir, "region=EMEA (2).csv")]
+            output1 = fileio.get_file_paths_by_pattern(temp_dir, "region=*.csv")
+            self.assertEqual(correct1, output1)
+            fileio.prepare_dir(temp_dir, "region=*.csv")
+            correct2 = ["region=notes.txt", "vendor.csv"]
+            output2 = sorted(os.listdir(temp_dir))
+            self.assertEqual(correct2, output2)
+
+    def test_created(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            directory = os.path.join(temp_dir, "output")
+            fileio.prepare_dir(directory, "region=*.csv")
+            self.assertTrue(os.path.isdir(directory))
+
+
 class TestCountRows(unittest.TestCase):
     def test_simple(self):
         input1 = TESTCSV_PATH
         correct1 = 2
         output1 = fileio.count_rows(input1)
         self.assertEqual(correct1, output1)
+
+
+class TestCachingReads(unittest.TestCase):
+    def test_cached(self):
+        fileio.start_caching_reads()
+        try:
+            output1 = fileio.read_yaml_file(TESTYAML_PATH)
+            output2 = fileio.read_yaml_file(TESTYAML_PATH)
+        finally:
+            fileio.stop_caching_reads()
+        self.assertIs(output1, output2)
+        self.assertIsNot(output1, fileio.read_yaml_file(TESTYAML_PATH))
+
+    def test_changed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "test.txt")
+            with open(file_path, "w") as f:
+                f.write("abc")
+            fileio.start_caching_reads()
+            try:
+                output1 = fileio.read_text_file(file_path)
+                with open(file_path, "w") as f:
+                    f.write("abcd")
+                output2 = fileio.read_text_file(file_path)
+            finally:
+                fileio.stop_caching_reads()
+        self.assertEqual("abc", output1)
+        self.assertEqual("abcd", output2)
@@ -0,0 +1,142 @@
+import random
+import unittest
+
+from dataunifier.tasks.FuzzyMatchReplaceTask import JaccardRule, LevenshteinRule, TfidfRule, IdfTable
+from dataunifier.utils.fuzzyindex import JaccardIndex, JaccardMatrix, LevenshteinIndex, CosineIndex, \
+    get_edit_distance
+
+
+def find_by_scanning(rules, value):
+    best = None
+    highest_score = 0.0
+    for i, rule in enumerate(rules):
+        score = rule.evaluate(value)
+        if score > highest_score:
+            best = i
+            highest_score = score
+    return best, highest_score
+
+
+def get_random_string(rng):
+    return "".join([rng.choice("abcd ") for _ in range(rng.randint(0, 10))])
+
+
+class TestJaccardIndex(unittest.TestCase):
+    def test_find(self):
+        rules = [JaccardRule("apple", "1", 3), JaccardRule("apply", "2", 3), JaccardRule("banana", "3", 3)]
+        obj1 = JaccardIndex([rule.ngrams for rule in rules])
+        correct1 = (1, 1.0)
+        output1 = obj1.find(rules[0].ngramify("apply"), 0.0)
+        self.assertEqual(correct1, output1)
+
+    def test_find_first_of_equal_scores(self):
+        rules = [JaccardRule("abcx", "1", 3), JaccardRule("abcy", "2", 3)]
+        obj1 = JaccardIndex([rule.ngrams for rule in rules])
+        correct1 = (0, 1 / 3)
+        output1 = obj1.find(rules[0].ngramify("abcz"), 0.0)
+        self.assertEqual(correct1, output1)
+
+    def test_find_none(self):
+        rules = [JaccardRule("apple", "1", 3)]
+        obj1 = JaccardIndex([rule.ngrams for rule in rules])
+        correct1 = (None, 0.0)
+        output1 = obj1.find(rules[0].ngramify("kiwi"), 0.0)
+        self.assertEqual(correct1, output1)
+
+    def test_find_same_as_scanning(self):
+        rng = random.Random(0)
+        for ngram_size in [1, 2, 3]:
+            rules = [JaccardRule(get_random_string(rng), str(i), ngram_size) for i in range(200)]
+            obj1 = JaccardIndex([rule.ngrams for rule in rules])
+            for minimum_score in [0.0, 0.3, 0.5, 1.0]:
+                for _ in range(50):
+                    value = get_random_string(rng)
+                    correct1 = find_by_scanning(rules, value)
+                    output1 = obj1.find(rules[0].ngramify(value), minimum_score)
+                    if correct1[0] is None or correct1[1] < minimum_score:
+                        self.assertTrue(output1[0] is None or output1[1] < minimum_score, value)
+                    else:
+                        self.assertEqual(correct1, output1, value)
+
+
+class TestJaccardMatrix(unittest.TestCase):
+    def test_find_all(self):
+        rules = [JaccardRule("apple", "1", 3), JaccardRule("apply", "2", 3), JaccardRule("banana", "3", 3)]
+        obj1 = JaccardMatrix([rule.ngrams for rule in rules])
+        correct1 = [(1, 1.0), (None, 0.0), (0, 0.75)]
+        output1 = obj1.find_all([rules[0].ngramify(value) for value in ["apply", "kiwi", "apples"]], 0.0)
+        self.assertEqual(correct1, output1)
+
+    def test_find_all_same_as_index(self):
+        rng = random.Random(0)
+        for batch_size in [10, JaccardMatrix.BATCH_SIZE]:
+            for ngram_size in [1, 2, 3]:
+                rules = [JaccardRule(get_random_string(rng), str(i), ngram_size) for i in range(200)]
+                index = JaccardIndex([rule.ngrams for rule in rules])
+                obj1 = JaccardMatrix([rule.ngrams for rule in rules])
+                obj1.BATCH_SIZE = batch_size
+                for minimum_score in [0.0, 0.3, 0.5, 1.0]:
+                    values = [get_random_string(rng) for _ in range(50)]
+                    correct1 = [index.find(rules[0].ngramify(value), minimum_score) for value in values]
+                    output1 = obj1.find_all([rules[0].ngramify(value) for value in values], minimum_score)
+                    for value, correct, output in zip(values, correct1, output1):
+                        if correct[0] is None or correct[1] < minimum_score:
+                            self.assertTrue(output[0] is None or output[1] < minimum_score, value)
+                        else:
+                            self.assertEqual(correct, output, value)
+
+
+class TestGetEditDistance(unittest.TestCase):
+    def test_successful(self):
+        input1 = [("", ""), ("abc", ""), ("kitten", "sitting"), ("sitting", "kitten"), ("flaw", "lawn"), ("ab", "ab")]
+        correct1 = [0, 3, 3, 3, 2, 0]
+        output1 = [get_edit_distance(string1, string2) for string1, string2 in input1]
+        self.assertEqual(correct1, output1)
+
+
+class TestLevenshteinIndex(unittest.TestCase):
+    def test_find(self):
+        rules = [LevenshteinRule("AB12", "1"), LevenshteinRule("AB21", "2"), LevenshteinRule("AB12", "3")]
+        obj1 = LevenshteinIndex([rule.string for rule in rules])
+        correct1 = [(0, 1.0), (1, 0.75), (0, 0.75)]
+        output1 = [obj1.find(value, 0.0) for value in ["AB12", "AB31", "AB22"]]
+        self.assertEqual(correct1, output1)
+
+    def test_find_none(self):
+        obj1 = LevenshteinIndex(["AB12"])
+        correct1 = (None, 0.0)
+        output1 = obj1.find("XYZW", 0.0)
+        self.assertEqual(correct1, output1)
+
+    def test_find_same_as_scanning(self):
+        rng = random.Random(0)
+        rules = [LevenshteinRule(get_random_string(rng), str(i)) for i in range(200)]
+        obj1 = LevenshteinIndex([rule.string for rule in rules])
+        for minimum_score in [0.0, 0.3, 0.5, 1.0]:
+            for _ in range(50):
+                value = get_random_string(rng)
+                correct1 = find_by_scanning(rules, value)
+                output1 = obj1.find(value, minimum_score)
+                if correct1[0] is None or correct1[1] < minimum_score:
+                    self.assertTrue(output1[0] is None or output1[1] < minimum_score, value)
+                else:
+                    self.assertEqual(correct1, output1, value)
+
+
+class TestCosineIndex(unittest.TestCase):
+    def test_find_same_as_scanning(self):
+        rng = random.Random(0)
+        for ngram_size in [1, 2, 3]:
+            strings = [get_random_string(rng) for _ in range(200)]
+            idf_table = IdfTable([[string[i:i + ngram_size] for i in range(len(string))] for string in strings])
+            rules = [TfidfRule(string, str(i), ngram_size, idf_table) for i, string in enumerate(strings)]
+            obj1 = CosineIndex([rule.weights for rule in rules])
+            for _ in range(100):
+                value = get_random_string(rng)
+                correct1 = find_by_scanning(rules, value)
+                output1 = obj1.find(rules[0].vectorise(value), 0.0)
+                self.assertEqual(correct1, output1, value)
+
+
+if __name__ == '__main__':
+    unittest.main()
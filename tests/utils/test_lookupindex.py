@@ -0,0 +1,102 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from dataunifier.common.exceptions import DuplicateKeyException
+from dataunifier.utils import lookupindex
+from dataunifier.utils.lookupindex import LookupIndex, E_KEEP_FIRST, E_KEEP_LAST
+
+
+class TestGetIndexFilePath(unittest.TestCase):
+    def test_differs_by_columns(self):
+        output1 = lookupindex.get_index_file_path("dir", "file.csv", "lookup", "value", None)
+        output2 = lookupindex.get_index_file_path("dir", "file.csv", "value", "lookup", None)
+        self.assertNotEqual(output1, output2)
+
+    def test_differs_by_on_duplicate(self):
+        output1 = lookupindex.get_index_file_path("dir", "file.csv", "lookup", "value", E_KEEP_FIRST)
+        output2 = lookupindex.get_index_file_path("dir", "file.csv", "lookup", "value", E_KEEP_LAST)
+        self.assertNotEqual(output1, output2)
+
+
+class TestBuild(unittest.TestCase):
+    def test_successful(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file_path = os.path.join(temp_dir, "index.sqlite")
+            lookupindex.build(index_file_path, [("a", "1"), ("b", "2")], (10, 20, "digest"))
+            index = LookupIndex(index_file_path)
+            self.assertEqual("1", index["a"])
+            self.assertEqual("2", index.get("b"))
+            self.assertIsNone(index.get("c"))
+            self.assertTrue("a" in index)
+            self.assertFalse("c" in index)
+            self.assertEqual(2, len(index))
+            index.close()
+            self.assertEqual((10, 20, "digest"), lookupindex.get_source_fingerprint(index_file_path))
+
+    def test_keep_first(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file_path = os.path.join(temp_dir, "index.sqlite")
+            lookupindex.build(index_file_path, [("a", "1"), ("a", "2")], (10, 20, "digest"), E_KEEP_FIRST)
+            index = LookupIndex(index_file_path)
+            self.assertEqual("1", index["a"])
+            index.close()
+
+    def test_keep_last(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file_path = os.path.join(temp_dir, "index.sqlite")
+            lookupindex.build(index_file_path, [("a", "1"), ("a", "2")], (10, 20, "digest"), E_KEEP_LAST)
+            index = LookupIndex(index_file_path)
+            self.assertEqual("2", index["a"])
+            index.close()
+
+    def test_duplicate(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file_path = os.path.join(temp_dir, "index.sqlite")
+            try:
+                lookupindex.build(index_file_path, [("a", "1"), ("b", "2"), ("b", "3")], (10, 20, "digest"))
+                self.fail()
+            except DuplicateKeyException as e:
+                self.assertEqual("b", e.key)
+            self.assertEqual([], os.listdir(temp_dir))
+
+
+class TestGetSourceFingerprint(unittest.TestCase):
+    def test_nonexistent(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.assertIsNone(lookupindex.get_source_fingerprint(os.path.join(temp_dir, "index.sqlite")))
+
+    def test_not_an_index(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file_path = os.path.join(temp_dir, "index.sqlite")
+            with open(index_file_path, "w") as f:
+                f.write("not an index")
+            self.assertIsNone(lookupindex.get_source_fingerprint(index_file_path))
+
+
+class TestLookupIndex(unittest.TestCase):
+    def test_missing_key(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file_path = os.path.join(temp_dir, "index.sqlite")
+            lookupindex.build(index_file_path, [("a", "1")], (10, 20, "digest"))
+            index = LookupIndex(index_file_path)
+            try:
+                _ = index["b"]
+                self.fail()
+            except KeyError:
+                pass
+            finally:
+                index.close()
+
+    def test_pickle(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file_path = os.path.join(temp_dir, "index.sqlite")
+            lookupindex.build(index_file_path, [("a", "1")], (10, 20, "digest"))
+            index = LookupIndex(index_file_path)
+            self.assertEqual("1", index["a"])
+            unpickled = pickle.loads(pickle.dumps(index))
+            self.assertEqual(index, unpickled)
+            self.assertEqual("1", unpickled["a"])
+            index.close()
+            unpickled.close()
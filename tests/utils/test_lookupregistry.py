@@ -0,0 +1,117 @@
+import unittest
+from unittest import mock
+
+from dataunifier.utils import fileio
+from dataunifier.utils.lookupindex import E_KEEP_FIRST, E_KEEP_LAST
+from dataunifier.utils.lookupregistry import LookupRegistry
+from tests.constants import TESTCSV_PATH, TESTCSV_DUP_PATH
+
+
+def _fail(value):
+    raise ValueError(value)
+
+
+class TestLookupRegistry(unittest.TestCase):
+    def test_request_dict(self):
+        registry = LookupRegistry()
+        output1 = registry.request_dict(TESTCSV_PATH, "lookup", "value", None, "requester", _fail, _fail)
+        self.assertEqual({}, output1)
+        registry.load()
+        correct1 = {"lookup1": "value1", "lookup2": "value2"}
+        self.assertEqual(correct1, output1)
+
+    def test_request_set(self):
+        registry = LookupRegistry()
+        output1 = registry.request_set(TESTCSV_PATH, "value", "requester", _fail)
+        registry.load()
+        correct1 = {"value1", "value2"}
+        self.assertEqual(correct1, output1)
+
+    def test_same_request_shared(self):
+        registry = LookupRegistry()
+        output1 = registry.request_dict(TESTCSV_PATH, "lookup", "value", None, "requester1", _fail, _fail)
+        output2 = registry.request_dict(TESTCSV_PATH, "lookup", "value", None, "requester2", _fail, _fail)
+        output3 = registry.request_dict(TESTCSV_PATH, "value", "lookup", None, "requester3", _fail, _fail)
+        registry.load()
+        self.assertIs(output1, output2)
+        self.assertIsNot(output1, output3)
+        self.assertEqual({"value1": "lookup1", "value2": "lookup2"}, output3)
+
+    def test_single_pass(self):
+        registry = LookupRegistry()
+        registry.request_dict(TESTCSV_PATH, "lookup", "value", None, "requester1", _fail, _fail)
+        registry.request_set(TESTCSV_PATH, "lookup", "requester2", _fail)
+        registry.request_set(TESTCSV_DUP_PATH, "value", "requester3", _fail)
+        with mock.patch("dataunifier.utils.fileio.open_csv_file", wraps=fileio.open_csv_file) as open_csv_file:
+            registry.load()
+        self.assertEqual(2, open_csv_file.call_count)
+
+    def test_keep_first(self):
+        registry = LookupRegistry()
+        output1 = registry.request_dict(TESTCSV_DUP_PATH, "lookup", "value", E_KEEP_FIRST, "requester", _fail, _fail)
+        registry.load()
+        self.assertEqual("value1", output1["lookup1"])
+
+    def test_keep_last(self):
+        registry = LookupRegistry()
+        output1 = registry.request_dict(TESTCSV_DUP_PATH, "lookup", "value", E_KEEP_LAST, "requester", _fail, _fail)
+        registry.load()
+        self.assertEqual("value3", output1["lookup1"])
+
+    def test_duplicate(self):
+        registry = LookupRegistry()
+        registry.request_dict(TESTCSV_DUP_PATH, "lookup", "value", None, "requester", _fail, _fail)
+        try:
+            registry.load()
+            self.fail()
+        except ValueError as e:
+            self.assertEqual("lookup1", str(e))
+
+    def test_missing_column(self):
+        registry = LookupRegistry()
+        registry.request_set(TESTCSV_PATH, "nonexistent", "requester", _fail)
+        try:
+            registry.load()
+            self.fail()
+        except ValueError as e:
+            self.assertEqual("nonexistent", str(e))
+
+    def test_start_wait_multiple_files(self):
+        registry = LookupRegistry()
+        output1 = registry.request_set(TESTCSV_PATH, "value", "requester1", _fail)
+        output2 = registry.request_set(TESTCSV_DUP_PATH, "value", "requester2", _fail)
+        registry.start()
+        registry.wait()
+        self.assertEqual({"value1", "value2"}, output1)
+        self.assertEqual({"value1", "value2", "value3"}, output2)
+        self.assertIsNone(registry.executor)
+
+    def test_start_wait_multiple_files_error(self):
+        registry = LookupRegistry()
+        registry.request_set(TESTCSV_PATH, "nonexistent1", "requester1", _fail)
+        registry.request_set(TESTCSV_DUP_PATH, "nonexistent2", "requester2", _fail)
+        registry.start()
+        try:
+            registry.wait()
+            self.fail()
+        except ValueError as e:
+            self.assertEqual("nonexistent1", str(e))
+        self.assertIsNone(registry.executor)
+
+    def test_request_after_start(self):
+        registry = LookupRegistry()
+        registry.start()
+        output1 = registry.request_set(TESTCSV_PATH, "value", "requester1", _fail)
+        output2 = registry.request_dict(TESTCSV_DUP_PATH, "lookup", "value", E_KEEP_FIRST, "requester2", _fail, _fail)
+        registry.wait()
+        self.assertEqual({"value1", "value2"}, output1)
+        self.assertEqual("value1", output2["lookup1"])
+        self.assertIsNone(registry.executor)
+
+    def test_cancel(self):
+        registry = LookupRegistry()
+        registry.start()
+        registry.request_set(TESTCSV_PATH, "nonexistent", "requester", _fail)
+        registry.cancel()
+        self.assertIsNone(registry.executor)
+        self.assertEqual([], registry.futures)
@@ -0,0 +1,46 @@
+import pickle
+import unittest
+
+from dataunifier.utils.lrucache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    def test_get_missing(self):
+        obj1 = LruCache(2)
+        output1 = obj1.get("key1")
+        self.assertIs(LruCache.MISSING, output1)
+        self.assertEqual((0, 1), (obj1.hits, obj1.misses))
+
+    def test_get_successful(self):
+        obj1 = LruCache(2)
+        obj1.put("key1", "value1")
+        output1 = obj1.get("key1")
+        self.assertEqual("value1", output1)
+        self.assertEqual((1, 0), (obj1.hits, obj1.misses))
+
+    def test_put_discards_least_recently_used(self):
+        obj1 = LruCache(2)
+        obj1.put("key1", "value1")
+        obj1.put("key2", "value2")
+        obj1.get("key1")
+        obj1.put("key3", "value3")
+        correct1 = ["value1", LruCache.MISSING, "value3"]
+        output1 = [obj1.get("key1"), obj1.get("key2"), obj1.get("key3")]
+        self.assertEqual(correct1, output1)
+
+    def test_put_capacity_0(self):
+        obj1 = LruCache(0)
+        obj1.put("key1", "value1")
+        output1 = obj1.get("key1")
+        self.assertIs(LruCache.MISSING, output1)
+
+    def test_pickle(self):
+        obj1 = LruCache(2)
+        obj1.put("key1", "value1")
+        obj1.get("key1")
+        output1 = pickle.loads(pickle.dumps(obj1))
+        self.assertEqual((2, 0, 0, 0), (output1.capacity, len(output1.entries), output1.hits, output1.misses))
+
+
+if __name__ == '__main__':
+    unittest.main()
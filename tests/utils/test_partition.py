@@ -0,0 +1,97 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from dataunifier.utils import partition
+from dataunifier.utils.partition import PartitionedDictWriter
+
+
+def read_csv(file_path):
+    with open(file_path, "r", newline="") as f:
+        return list(csv.reader(f))
+
+
+class TestGetPartitionFileName(unittest.TestCase):
+    def test_simple(self):
+        correct1 = "region=APAC.csv"
+        output1 = partition.get_partition_file_name("region", "APAC")
+        self.assertEqual(correct1, output1)
+
+    def test_unsafe_characters(self):
+        correct1 = "region=A%2FB%3A C.csv"
+        output1 = partition.get_partition_file_name("region", "A/B: C")
+        self.assertEqual(correct1, output1)
+
+    def test_empty_value(self):
+        correct1 = "region=.csv"
+        output1 = partition.get_partition_file_name("region", "")
+        self.assertEqual(correct1, output1)
+
+
+class TestGetPartitionFilePattern(unittest.TestCase):
+    def test_simple(self):
+        correct1 = "region=*.csv"
+        output1 = partition.get_partition_file_pattern("region")
+        self.assertEqual(correct1, output1)
+
+    def test_unsafe_characters(self):
+        correct1 = "sales%2Aregion=*.csv"
+        output1 = partition.get_partition_file_pattern("sales*region")
+        self.assertEqual(correct1, output1)
+
+
+class TestPartitionedDictWriter(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.directory = self.tempdir.name
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_writerows(self):
+        writer = PartitionedDictWriter(self.directory, ["region", "value"], "region")
+        writer.writeheader()
+        writer.writerows([
+            {"region": "APAC", "value": "1"},
+            {"region": "EMEA", "value": "2"},
+            {"region": "APAC", "value": "3"}
+        ])
+        writer.close()
+        correct1 = [os.path.join(self.directory, "region=APAC.csv"), os.path.join(self.directory, "region=EMEA.csv")]
+        output1 = writer.get_file_paths()
+        self.assertEqual(correct1, output1)
+        correct2 = [["region", "value"], ["APAC", "1"], ["APAC", "3"]]
+        output2 = read_csv(correct1[0])
+        self.assertEqual(correct2, output2)
+        correct3 = [["region", "value"], ["EMEA", "2"]]
+        output3 = read_csv(correct1[1])
+        self.assertEqual(correct3, output3)
+
+    def test_reopen_after_eviction(self):
+        writer = PartitionedDictWriter(self.directory, ["region", "value"], "region", max_open_files=1)
+        writer.writerows([
+            {"region": "APAC", "value": "1"},
+            {"region": "EMEA", "value": "2"},
+            {"region": "APAC", "value": "3"},
+            {"region": "EMEA", "value": "4"}
+        ])
+        self.assertEqual(1, len(writer.open_files))
+        writer.close()
+        correct1 = [["region", "value"], ["APAC", "1"], ["APAC", "3"]]
+        output1 = read_csv(os.path.join(self.directory, "region=APAC.csv"))
+        self.assertEqual(correct1, output1)
+        correct2 = [["region", "value"], ["EMEA", "2"], ["EMEA", "4"]]
+        output2 = read_csv(os.path.join(self.directory, "region=EMEA.csv"))
+        self.assertEqual(correct2, output2)
+
+    def test_values_differing_in_case(self):
+        writer = PartitionedDictWriter(self.directory, ["region"], "region")
+        writer.writerows([{"region": "apac"}, {"region": "APAC"}])
+        writer.close()
+        correct1 = [
+            os.path.join(self.directory, "region=apac.csv"),
+            os.path.join(self.directory, "region=APAC (2).csv")
+        ]
+        output1 = writer.get_file_paths()
+        self.assertEqual(correct1, output1)
@@ -1,3 +1,5 @@
+import random
+import re
 import unittest
 
 from dataunifier.utils import regex
@@ -10,3 +12,53 @@ class TestRegexify(unittest.TestCase):
                    "\\*sometimes\\+\\.$"
         output1 = regex.regexify(input1)
         self.assertEqual(correct1, output1)
+
+
+def find_by_searching(patterns, string):
+    for i, pattern in enumerate(patterns):
+        if pattern.search(string):
+            return i
+    return None
+
+
+class TestIsCombinable(unittest.TestCase):
+    def test_successful(self):
+        input1 = ["abc", "^(a+)(?P<name>b)$", "(?i:a)", "\\d\\s", "(a)\\1", "(?P<x>a)(?P=x)", "(a)?(?(1)b|c)", "(?i)a"]
+        correct1 = [True, True, True, True, False, False, False, False]
+        output1 = [regex.is_combinable(re.compile(pattern)) for pattern in input1]
+        self.assertEqual(correct1, output1)
+
+
+class TestCombinedSearch(unittest.TestCase):
+    def test_find(self):
+        obj1 = regex.CombinedSearch([re.compile(pattern) for pattern in ["a", "x", "^b(c)", "\\d+$", "z|y"]])
+        input1 = ["xa", "x", "bc9", "9", "qqq", "bcd", "ay", "", "y"]
+        correct1 = [0, 1, 2, 3, None, 2, 0, None, 4]
+        output1 = [obj1.find(string) for string in input1]
+        self.assertEqual(correct1, output1)
+
+    def test_find_empty_match(self):
+        obj1 = regex.CombinedSearch([re.compile("q"), re.compile("$")])
+        correct1 = 1
+        output1 = obj1.find("abc")
+        self.assertEqual(correct1, output1)
+
+    def test_duplicate_group_name(self):
+        try:
+            regex.CombinedSearch([re.compile("(?P<x>a)"), re.compile("(?P<x>b)")])
+            self.fail()
+        except re.error:
+            pass
+
+    def test_find_same_as_searching(self):
+        rng = random.Random(0)
+        pieces = ["a", "b", "ab", "^a", "b$", "\\bab", "a(?=b)", "(?<=a)b", "[ab]{2}", "a*", "ba?", "\\Ab"]
+        for _ in range(50):
+            patterns = [re.compile(rng.choice(pieces) + rng.choice(pieces)) for _ in range(rng.randint(2, 8))]
+            obj1 = regex.CombinedSearch(patterns)
+            for _ in range(20):
+                string = "".join([rng.choice("ab ") for _ in range(rng.randint(0, 8))])
+                correct1 = find_by_searching(patterns, string)
+                output1 = obj1.find(string)
+                self.assertEqual(correct1, output1, (string, [pattern.pattern for pattern in patterns]))
+
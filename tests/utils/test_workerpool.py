@@ -0,0 +1,48 @@
+import os
+import pickle
+import unittest
+
+from dataunifier.utils.workerpool import WorkerPool
+
+OFFSET = None
+
+
+def set_offset(offset):
+    global OFFSET  # pylint: disable=global-statement
+    OFFSET = offset
+
+
+def add_offset(items):
+    return [(item + OFFSET, os.getpid()) for item in items]
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_map_slices(self):
+        obj1 = WorkerPool(3)
+        try:
+            output1 = obj1.map_slices(add_offset, list(range(10)), set_offset, (100,))
+        finally:
+            obj1.close()
+        correct1 = list(range(100, 110))
+        self.assertEqual(correct1, [item for item, _ in output1])
+        self.assertNotIn(os.getpid(), [pid for _, pid in output1])
+
+    def test_map_slices_empty(self):
+        obj1 = WorkerPool(2)
+        output1 = obj1.map_slices(add_offset, [], set_offset, (100,))
+        self.assertEqual([], output1)
+        self.assertIsNone(obj1.pool)
+
+    def test_pickle(self):
+        obj1 = WorkerPool(2)
+        try:
+            obj1.map_slices(add_offset, [1, 2], set_offset, (100,))
+            output1 = pickle.loads(pickle.dumps(obj1))
+        finally:
+            obj1.close()
+        self.assertEqual(2, output1.processes)
+        self.assertIsNone(output1.pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from dataunifier.watch.classes import DirectoryWatcher
+
+
+def write_file(file_path, text):
+    with open(file_path, "w") as f:
+        f.write(text)
+
+
+class TestDirectoryWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.directory = self.tempdir.name
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_poll_known(self):
+        write_file(os.path.join(self.directory, "old.csv"), "a")
+        obj1 = DirectoryWatcher(self.directory, {"old.csv"})
+        self.assertEqual([], obj1.poll())
+        self.assertEqual([], obj1.poll())
+
+    def test_poll_new_when_stable(self):
+        obj1 = DirectoryWatcher(self.directory, set())
+        write_file(os.path.join(self.directory, "new2.csv"), "a")
+        write_file(os.path.join(self.directory, "new1.csv"), "a")
+        self.assertEqual([], obj1.poll())
+        self.assertEqual(["new1.csv", "new2.csv"], obj1.poll())
+        self.assertEqual([], obj1.poll())
+
+    def test_poll_new_while_growing(self):
+        obj1 = DirectoryWatcher(self.directory, set())
+        write_file(os.path.join(self.directory, "new.csv"), "a")
+        self.assertEqual([], obj1.poll())
+        write_file(os.path.join(self.directory, "new.csv"), "ab")
+        self.assertEqual([], obj1.poll())
+        self.assertEqual(["new.csv"], obj1.poll())
+
+    def test_poll_ignores_directories(self):
+        obj1 = DirectoryWatcher(self.directory, set())
+        os.mkdir(os.path.join(self.directory, "subdir"))
+        self.assertEqual([], obj1.poll())
+        self.assertEqual([], obj1.poll())
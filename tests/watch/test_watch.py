@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.config.classes import ConfigContext, Fileset, InputFile
+from dataunifier.parse.classes import TestBogusDictWriter
+from dataunifier.tasks import MapFieldsTask
+from dataunifier.tasks.MapFieldsTask import Field
+from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
+from dataunifier.watch import watch
+from tests.constants import TESTCSV_PATH
+
+
+class TestHandleNewFiles(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.directory = self.tempdir.name
+        shutil.copy(TESTCSV_PATH, os.path.join(self.directory, "new1.csv"))
+        shutil.copy(TESTCSV_PATH, os.path.join(self.directory, "new2.csv"))
+        shutil.copy(TESTCSV_PATH, os.path.join(self.directory, "bad.csv"))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def get_config_ctxt(self):
+        return ConfigContext(
+            CommandLineContext(self.directory, "outputFilePath", False, "configFilePath", watch=True),
+            ["field1", "field2"],
+            [
+                Fileset(
+                    "Test",
+                    ["field1", "field2"],
+                    [
+                        InputFile("Input CSV", ["^new\\d\\.csv$"], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup"], True, False),
+                            Field("field2", ["value"], True, False)
+                        ])
+                    ]
+                ),
+                Fileset(
+                    "Bad",
+                    ["field1", "field2"],
+                    [
+                        InputFile("Bad CSV", ["^bad\\.csv$"], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup"], True, False),
+                            Field("field2", ["value"], True, False)
+                        ]),
+                        TestFieldCreatorTask("Fail", ["field1", "field2"])
+                    ]
+                )
+            ]
+        )
+
+    def test_successful(self):
+        writer = TestBogusDictWriter("")
+        correct1 = 2
+        output1 = watch.handle_new_files(self.get_config_ctxt(), writer, ["new1.csv", "unmatched.txt", "new2.csv"])
+        self.assertEqual(correct1, output1)
+        correct2 = [
+            {"field1": "lookup1", "field2": "value1"},
+            {"field1": "lookup2", "field2": "value2"}
+        ] * 2
+        output2 = writer.rowdicts
+        self.assertEqual(correct2, output2)
+
+    def test_failing_file_is_skipped(self):
+        writer = TestBogusDictWriter("")
+        correct1 = 1
+        output1 = watch.handle_new_files(self.get_config_ctxt(), writer, ["bad.csv", "new1.csv"])
+        self.assertEqual(correct1, output1)
+        correct2 = [
+            {"field1": "lookup1", "field2": "value1"},
+            {"field1": "lookup2", "field2": "value2"}
+        ]
+        output2 = writer.rowdicts
+        self.assertEqual(correct2, output2)
+
+
+class TestStart(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.directory = self.tempdir.name
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_empty_directory(self):
+        config_ctxt = ConfigContext(
+            CommandLineContext(self.directory, "outputFilePath", False, "configFilePath", watch=True),
+            ["field1", "field2"],
+            [
+                Fileset(
+                    "Test",
+                    ["field1", "field2"],
+                    [
+                        InputFile("Input CSV", ["^new\\d\\.csv$"], None)
+                    ],
+                    [
+                        MapFieldsTask("Map Fields", [
+                            Field("field1", ["lookup"], True, False),
+                            Field("field2", ["value"], True, False)
+                        ])
+                    ]
+                )
+            ]
+        )
+        writer = TestBogusDictWriter("")
+        flush = mock.Mock()
+        sleeps = [
+            lambda: shutil.copy(TESTCSV_PATH, os.path.join(self.directory, "new1.csv")),
+            lambda: None,
+        ]
+
+        def sleep(_):
+            if not sleeps:
+                raise KeyboardInterrupt()
+            sleeps.pop(0)()
+
+        with mock.patch("dataunifier.watch.watch.time.sleep", side_effect=sleep), \
+                mock.patch("dataunifier.config.config.close_tasks") as close_tasks:
+            watch.start(config_ctxt, writer, flush, 0)
+        close_tasks.assert_called_once_with(config_ctxt.filesets)
+        correct1 = [
+            {"field1": "lookup1", "field2": "value1"},
+            {"field1": "lookup2", "field2": "value2"}
+        ]
+        output1 = writer.rowdicts
+        self.assertEqual(correct1, output1)
+        correct2 = 2
+        output2 = flush.call_count
+        self.assertEqual(correct2, output2)
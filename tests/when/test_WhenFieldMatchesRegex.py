@@ -1,13 +1,26 @@
+import pickle
+import random
+import re
 import unittest
 
 from dataunifier.cmdline.classes import CommandLineContext
-from dataunifier.common.exceptions import TransformationException
+from dataunifier.common.exceptions import ConfigException, TransformationException
 from dataunifier.config.classes import Fileset, InputFile, Sheet, WhenParsingContext, YamlPathContext
 from dataunifier.parse.classes import ParseRowContext, ParseIteratorContext, ParseInputFileContext, ParseFilesetContext, \
     TestBogusDictWriter
 from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
 from dataunifier.when import WhenFieldMatchesRegex
-from dataunifier.when.WhenFieldMatchesRegex import K_VALUE_OF_FIELD, K_MATCHES_REGEX
+from dataunifier.when.WhenFieldMatchesRegex import K_VALUE_OF_FIELD, K_MATCHES_REGEX, K_CACHE_SIZE
+
+
+def get_when_parsing_context(config_dict):
+    return WhenParsingContext(
+        YamlPathContext(
+            CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+            "currentFile", "current.key", config_dict
+        ),
+        "rootFile", "root.key.path", 0
+    )
 
 
 class TestWhenFieldMatchesRegex(unittest.TestCase):
@@ -116,3 +129,73 @@ class TestWhenFieldMatchesRegex(unittest.TestCase):
             correct1 = 'Could not find field "%s".' % "field1"
             output1 = e.message
             self.assertEqual(correct1, output1)
+
+    def test_create_from_config_cache_size(self):
+        input1 = get_when_parsing_context({K_VALUE_OF_FIELD: "field", K_MATCHES_REGEX: "regex", K_CACHE_SIZE: 100})
+        correct1 = WhenFieldMatchesRegex("field", ["regex"], 100)
+        output1 = WhenFieldMatchesRegex.create_from_config(input1)
+        self.assertEqual(correct1, output1)
+
+    def test_create_from_config_invalid_cache_size(self):
+        input1 = get_when_parsing_context({K_VALUE_OF_FIELD: "field", K_MATCHES_REGEX: "regex", K_CACHE_SIZE: -1})
+        try:
+            WhenFieldMatchesRegex.create_from_config(input1)
+            self.fail()
+        except ConfigException as e:
+            correct1 = 'Invalid value for key "current.key.%s": "-1". Must be an integer not less than 0. ' \
+                       '(File "currentFile")' % K_CACHE_SIZE
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_create_from_config_invalid_regex(self):
+        input1 = get_when_parsing_context({K_VALUE_OF_FIELD: "field", K_MATCHES_REGEX: ["regex1", "regex2("]})
+        try:
+            WhenFieldMatchesRegex.create_from_config(input1)
+            self.fail()
+        except ConfigException as e:
+            correct1 = 'Invalid regular expression at key "%s": "%s". Details: "' % (
+                f"current.key.{K_MATCHES_REGEX}.1", "regex2("
+            )
+            output1 = e.message
+            self.assertEqual(correct1, output1[0:len(correct1)])
+
+    def test_ne_diff_cache_size(self):
+        obj1 = WhenFieldMatchesRegex("field1", ["regex1"], 0)
+        obj2 = WhenFieldMatchesRegex("field1", ["regex1"], 10)
+        self.assertFalse(obj1 == obj2)
+        self.assertTrue(obj1 != obj2)
+
+    def test_matches(self):
+        obj1 = WhenFieldMatchesRegex("field1", ["a", "ab", "(x)\\1", "(?i)B+", "(?P<n>c)d"])
+        input1 = ["a", "ab", "abc", "xx", "x", "bbB", "cd", ""]
+        correct1 = [True, True, False, True, False, True, True, False]
+        output1 = [obj1.matches(value) for value in input1]
+        self.assertEqual(correct1, output1)
+
+    def test_matches_same_as_fullmatch(self):
+        rng = random.Random(0)
+        pieces = ["a", "b", "a*", "b?", "[ab]", "(a|b)", "^", "$", "\\b", "(?=a)", ".", "(a)\\1"]
+        for _ in range(50):
+            regex_list = ["".join([rng.choice(pieces) for _ in range(3)]) for _ in range(rng.randint(1, 5))]
+            obj1 = WhenFieldMatchesRegex("field1", regex_list)
+            for _ in range(20):
+                value = "".join([rng.choice("ab") for _ in range(rng.randint(0, 4))])
+                correct1 = any([bool(re.fullmatch(regex, value)) for regex in regex_list])
+                output1 = obj1.matches(value)
+                self.assertEqual(correct1, output1, (value, regex_list))
+
+    def test_matches_cached(self):
+        obj1 = WhenFieldMatchesRegex("field1", ["a+"], 2)
+        input1 = ["a", "b", "a", "c", "b"]
+        correct1 = [True, False, True, False, False]
+        output1 = [obj1.matches(value) for value in input1]
+        self.assertEqual(correct1, output1)
+        self.assertEqual(1, obj1.cache.hits)
+        self.assertEqual(4, obj1.cache.misses)
+
+    def test_pickle(self):
+        obj1 = WhenFieldMatchesRegex("field1", ["a+", "b"], 10)
+        output1 = pickle.loads(pickle.dumps(obj1))
+        self.assertEqual(obj1, output1)
+        self.assertTrue(output1.matches("aa"))
+
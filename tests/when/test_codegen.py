@@ -0,0 +1,273 @@
+import pickle
+import random
+import unittest
+
+from dataunifier.cmdline.classes import CommandLineContext
+from dataunifier.common.exceptions import TransformationException
+from dataunifier.config.classes import Fileset, InputFile, Sheet
+from dataunifier.parse.classes import ParseRowContext, ParseIteratorContext, ParseInputFileContext, \
+    ParseFilesetContext, TestBogusDictWriter
+from dataunifier.parse.positional import get_slots
+from dataunifier.tasks.TestFieldCreatorTask import TestFieldCreatorTask
+from dataunifier.when import And, Or, Not, WhenFieldMatchesRegex
+from dataunifier.when.Abstract import AbstractWhen
+from dataunifier.when.WhenSimpleTest import WhenSimpleTest
+from dataunifier.when.codegen import compile_when, WhenMemo, AdaptiveOrder
+
+FIELDS = ["field1", "field2", "field3"]
+
+
+def get_row_ctxt(rowdict):
+    return ParseRowContext(
+        ParseIteratorContext(
+            ParseInputFileContext(
+                ParseFilesetContext(
+                    CommandLineContext("inputDir", "outputFilePath", False, "configFilePath"),
+                    TestBogusDictWriter("writer1"),
+                    Fileset(
+                        "fileset1",
+                        ["field1"],
+                        [InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])],
+                        TestFieldCreatorTask("task1", ["field1"])
+                    )
+                ),
+                InputFile("inputFile1", ["regex1"], [Sheet(["regex1"], True)])
+            ),
+            "filepath", "sheet", ["row1", "row2"]
+        ), 1, rowdict
+    )
+
+
+class CountingWhen(AbstractWhen):
+    def __init__(self, field):
+        self.field = field
+        self.count = 0
+
+    def get_fields(self):
+        return [self.field]
+
+    def evaluate(self, row_ctxt):
+        self.count += 1
+        return row_ctxt.rowdict[self.field] == "a"
+
+
+def walk(when, row_ctxt):
+    if isinstance(when, And):
+        return all(walk(inner, row_ctxt) for inner in when.when_list)
+    if isinstance(when, Or):
+        return any(walk(inner, row_ctxt) for inner in when.when_list)
+    if isinstance(when, Not):
+        return not walk(when.when, row_ctxt)
+    return when.evaluate(row_ctxt)
+
+
+def get_random_when(rng, depth):
+    choice = rng.randrange(6 if depth < 3 else 2)
+    if choice == 0:
+        return WhenFieldMatchesRegex(rng.choice(FIELDS), [rng.choice(["a", "b", "a|b", "(a)\\1"])], rng.choice([0, 5]))
+    if choice == 1:
+        return WhenSimpleTest(rng.choice(["", "true"]))
+    if choice == 2:
+        return Not(get_random_when(rng, depth + 1))
+    when_list = [get_random_when(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    when = And(when_list) if choice in [3, 4] else Or(when_list)
+    if rng.random() < 0.5:
+        when.memo = WhenMemo()
+    if rng.random() < 0.5:
+        when.adaptive = AdaptiveOrder(rng.choice([1, 3]), isinstance(when, Or))
+    return when
+
+
+def evaluate_or_error(evaluate, *args):
+    try:
+        return evaluate(*args)
+    except TransformationException as e:
+        return e.message
+
+
+class TestCompileWhen(unittest.TestCase):
+    def test_rowdict(self):
+        obj1 = compile_when(Or([
+            And([WhenFieldMatchesRegex("field1", ["a+"]), Not(WhenFieldMatchesRegex("field2", ["b", "c"]))]),
+            WhenSimpleTest("true")
+        ]), None)
+        input1 = {"field1": "aa", "field2": "d"}
+        output1 = obj1(input1, get_row_ctxt(input1))
+        self.assertTrue(output1)
+
+    def test_short_circuit(self):
+        obj1 = compile_when(And([WhenFieldMatchesRegex("field1", ["a"]), WhenFieldMatchesRegex("field2", ["b"])]), None)
+        input1 = {"field1": "x"}
+        output1 = obj1(input1, get_row_ctxt(input1))
+        self.assertFalse(output1)
+        input2 = {"field1": "a"}
+        try:
+            obj1(input2, get_row_ctxt(input2))
+            self.fail()
+        except TransformationException as e:
+            correct2 = 'Could not find field "%s".' % "field2"
+            output2 = e.message
+            self.assertEqual(correct2, output2)
+
+    def test_values_field_not_in_slots(self):
+        obj1 = compile_when(Or([WhenFieldMatchesRegex("field1", ["a"]), WhenFieldMatchesRegex("field9", ["b"])]),
+                            get_slots(FIELDS))
+        input1 = ["x", "y", "z"]
+        try:
+            obj1(input1, get_row_ctxt(None))
+            self.fail()
+        except TransformationException as e:
+            correct1 = 'Could not find field "%s".' % "field9"
+            output1 = e.message
+            self.assertEqual(correct1, output1)
+
+    def test_same_as_walking(self):
+        rng = random.Random(0)
+        slots = get_slots(FIELDS)
+        for _ in range(300):
+            when = get_random_when(rng, 0)
+            evaluate_rowdict = compile_when(when, None)
+            evaluate_values = compile_when(when, slots)
+            for _ in range(10):
+                rowdict = {field: rng.choice(["a", "b", "aa", ""]) for field in FIELDS if rng.random() < 0.9}
+                row_ctxt = get_row_ctxt(rowdict)
+                correct1 = evaluate_or_error(walk, when, row_ctxt)
+                output1 = evaluate_or_error(evaluate_rowdict, rowdict, row_ctxt)
+                self.assertEqual(correct1, output1, (when, rowdict))
+                if len(rowdict) == len(FIELDS):
+                    values = [rowdict[field] for field in FIELDS]
+                    output2 = evaluate_or_error(evaluate_values, values, row_ctxt)
+                    self.assertEqual(correct1, output2, (when, rowdict))
+
+    def test_memo(self):
+        shared = CountingWhen("field1")
+        shared.memo = WhenMemo()
+        for slots in [None, get_slots(FIELDS)]:
+            obj1 = compile_when(And([WhenSimpleTest("true"), shared]), slots)
+            obj2 = compile_when(Not(shared), slots)
+            input1 = {"field1": "a", "field2": "b", "field3": "c"}
+            input2 = {"field1": "b", "field2": "b", "field3": "c"}
+            output1 = []
+            for rowdict in [input1, input1, input2]:
+                values = rowdict if slots is None else [rowdict[field] for field in FIELDS]
+                output1.append((obj1(values, get_row_ctxt(rowdict)), obj2(values, get_row_ctxt(rowdict))))
+            self.assertEqual([(True, False), (True, False), (False, True)], output1)
+        self.assertEqual(4, shared.count)
+
+    def test_pickle_after_evaluate(self):
+        obj1 = And([WhenFieldMatchesRegex("field1", ["a"]), Not(WhenSimpleTest(""))])
+        input1 = {"field1": "a"}
+        self.assertTrue(obj1.evaluate(get_row_ctxt(input1)))
+        output1 = pickle.loads(pickle.dumps(obj1))
+        self.assertEqual(obj1, output1)
+        self.assertTrue(output1.evaluate(get_row_ctxt(input1)))
+
+    def test_pickle_memo(self):
+        obj1 = And([WhenFieldMatchesRegex("field1", ["a"])])
+        obj1.memo = WhenMemo()
+        self.assertTrue(obj1.evaluate(get_row_ctxt({"field1": "a"})))
+        output1 = pickle.loads(pickle.dumps([obj1, obj1]))
+        self.assertIs(output1[0], output1[1])
+        self.assertIsInstance(output1[0].memo, WhenMemo)
+        self.assertFalse(output1[0].evaluate(get_row_ctxt({"field1": "b"})))
+
+
+class TestAdaptiveOrder(unittest.TestCase):
+    def test_order(self):
+        obj1 = AdaptiveOrder(2, False)
+        for result1, result2, result3 in [(True, False, False), (True, True, False)]:
+            obj1.record(0, result1, 1.0)
+            obj1.record(1, result2, 1.0)
+            obj1.record(2, result3, 3.0)
+            obj1.finish_row(3)
+        correct1 = [1, 2, 0]
+        output1 = obj1.order
+        self.assertEqual(correct1, output1)
+
+    def test_order_or(self):
+        obj1 = AdaptiveOrder(1, True)
+        obj1.record(0, False, 1.0)
+        obj1.record(1, True, 2.0)
+        obj1.record(2, True, 1.0)
+        obj1.finish_row(3)
+        correct1 = [2, 1, 0]
+        output1 = obj1.order
+        self.assertEqual(correct1, output1)
+
+    def test_get_summary(self):
+        obj1 = AdaptiveOrder(1, False)
+        obj1.record(0, True, 0.000002)
+        obj1.record(1, False, 0.000001)
+        input1 = [WhenFieldMatchesRegex("field1", ["a"]), Not(WhenFieldMatchesRegex("field2", ["b"]))]
+        correct1 = [
+            'Condition in task "task1": order kept, as only 0 of 1 rows were sampled.',
+            "  1. WhenFieldMatchesRegex(field1 matches ['a']): true for 100.0% of 1 rows, 2.00 us per row.",
+            "  2. Not(WhenFieldMatchesRegex(field2 matches ['b'])): true for 0.0% of 1 rows, 1.00 us per row."
+        ]
+        output1 = obj1.get_summary('task "task1"', input1)
+        self.assertEqual(correct1, output1)
+        obj1.finish_row(2)
+        correct2 = 'Condition in task "task1": conditions evaluated in the order 2, 1 after sampling 1 rows.'
+        output2 = obj1.get_summary('task "task1"', input1)[0]
+        self.assertEqual(correct2, output2)
+
+    def test_evaluate_reordered(self):
+        counting1 = CountingWhen("field1")
+        counting2 = CountingWhen("field2")
+        obj1 = And([counting1, counting2])
+        obj1.adaptive = AdaptiveOrder(3, False)
+        evaluate = compile_when(obj1, get_slots(FIELDS))
+        input1 = {"field1": "a", "field2": "b", "field3": "c"}
+        output1 = [evaluate([input1[field] for field in FIELDS], get_row_ctxt(input1)) for _ in range(10)]
+        self.assertEqual([False] * 10, output1)
+        self.assertEqual([1, 0], obj1.adaptive.order)
+        self.assertEqual((3, 10), (counting1.count, counting2.count))
+
+    def test_evaluate_shared(self):
+        counting1 = CountingWhen("field1")
+        counting2 = CountingWhen("field2")
+        obj1 = And([counting1, counting2])
+        obj1.adaptive = AdaptiveOrder(3, False)
+        # The same condition used by two tasks.
+        evaluate1 = compile_when(obj1, get_slots(FIELDS))
+        evaluate2 = compile_when(obj1, get_slots(FIELDS))
+        input1 = {"field1": "a", "field2": "b", "field3": "c"}
+        for _ in range(2):
+            row_ctxt = get_row_ctxt(input1)
+            self.assertFalse(evaluate1([input1[field] for field in FIELDS], row_ctxt))
+            self.assertFalse(evaluate2([input1[field] for field in FIELDS], row_ctxt))
+        self.assertEqual(2, obj1.adaptive.rows)
+        self.assertEqual({0: 2, 1: 2}, obj1.adaptive.counts)
+        self.assertIsNone(obj1.adaptive.order)
+        row_ctxt = get_row_ctxt(input1)
+        self.assertFalse(evaluate1([input1[field] for field in FIELDS], row_ctxt))
+        self.assertFalse(evaluate2([input1[field] for field in FIELDS], row_ctxt))
+        self.assertEqual(3, obj1.adaptive.rows)
+        self.assertEqual([1, 0], obj1.adaptive.order)
+        correct1 = 'Condition in task "task1": conditions evaluated in the order 2, 1 after sampling 3 rows.'
+        output1 = obj1.adaptive.get_summary('task "task1"', obj1.when_list)[0]
+        self.assertEqual(correct1, output1)
+
+    def test_evaluate_not_reordered_for_rowdicts(self):
+        counting1 = CountingWhen("field1")
+        obj1 = And([counting1, WhenFieldMatchesRegex("field2", ["a"])])
+        obj1.adaptive = AdaptiveOrder(1, False)
+        input1 = {"field1": "a", "field2": "b"}
+        for _ in range(3):
+            self.assertFalse(obj1.evaluate(get_row_ctxt(input1)))
+        self.assertEqual(3, counting1.count)
+        self.assertEqual(0, obj1.adaptive.rows)
+
+    def test_pickle(self):
+        obj1 = Or([WhenFieldMatchesRegex("field1", ["a"]), WhenFieldMatchesRegex("field2", ["b"])])
+        obj1.adaptive = AdaptiveOrder(1, True)
+        evaluate = compile_when(obj1, get_slots(FIELDS))
+        self.assertTrue(evaluate(["a", "b", "c"], get_row_ctxt(None)))
+        output1 = pickle.loads(pickle.dumps(obj1))
+        self.assertEqual((1, True, 0, None), (
+            output1.adaptive.sample_size, output1.adaptive.stops_on, output1.adaptive.rows, output1.adaptive.order
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()